@@ -3,11 +3,12 @@ Policy Navigator Agent - Multi-Agent Version
 Uses aiXplain Team Agent for autonomous decision-making and tool selection
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from datetime import datetime
 import sys
 import os
+import json
 import tempfile
 
 # Add parent directory to path
@@ -17,6 +18,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 from src.data.faiss_vector_store import FAISSVectorStore
+from src.data.embedding_service import EmbeddingService
 from src.tools.document_processor import DocumentProcessor
 from src.tools.federal_register_tool import FederalRegisterTool
 from src.tools.url_scraper_tool import URLScraperTool
@@ -40,9 +42,14 @@ FAISS_DB_PATH = os.path.join(PROJECT_ROOT, "faiss_db")
 
 # Initialize FAISS vector store
 print("Initializing FAISS vector store...")
-vector_store = FAISSVectorStore(persist_directory=FAISS_DB_PATH)
+# Concurrent requests share batched forward passes of the embedding model
+embedding_service = EmbeddingService(max_wait_ms=float(os.getenv('EMBEDDING_BATCH_WAIT_MS', '5')))
+vector_store = FAISSVectorStore(persist_directory=FAISS_DB_PATH, embedding_provider=embedding_service)
 print("✓ FAISS vector store ready")
 
+# Load the embedding model in the background so startup does not wait for it
+vector_store.embedding_provider.preload()
+
 # Initialize Agent Manager
 print("\nInitializing aiXplain Agent Manager...")
 try:
@@ -56,6 +63,26 @@ except Exception as e:
     agent_manager = None
 
 
+def sse_event(event, data):
+    """Format a Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def format_sources(results):
+    """Summarize retrieved documents for streaming to the client"""
+    return [
+        {
+            'id': r.get('id'),
+            'title': r['metadata'].get('title', 'Unknown'),
+            'section_number': r['metadata'].get('section_number'),
+            'source': r['metadata'].get('source'),
+            'score': round(r['score'], 4),
+            'preview': r['content'][:300]
+        }
+        for r in results
+    ]
+
+
 @app.route('/')
 def index():
     """Main page"""
@@ -89,13 +116,19 @@ def query():
         return jsonify({'error': 'Query cannot be empty'}), 400
     
     try:
-        # Step 1: Search vector database for relevant documents
-        results = vector_store.search(user_query, n_results=3)
+        # Step 1: Retrieve context - vector database, Federal Register and
+        # CourtListener are searched in parallel when the agent is available
+        context = None
+        if agent_manager:
+            context = agent_manager.gather_context(user_query, vector_store=vector_store, n_results=3)
+            results = context['documents']
+        else:
+            results = vector_store.search(user_query, n_results=3)
         
         if not results:
             # No documents found, let agent handle it
             if agent_manager:
-                agent_response = agent_manager.query(user_query)
+                agent_response = agent_manager.query(user_query, context=context)
                 
                 if agent_response['success']:
                     return jsonify({
@@ -122,12 +155,6 @@ def query():
         # Step 2: Use Team Agent with retrieved context
         if agent_manager:
             try:
-                # Prepare context for agent
-                context = {
-                    'documents': results,
-                    'query': user_query
-                }
-                
                 # Query Team Agent
                 agent_response = agent_manager.query(user_query, context=context)
                 
@@ -140,7 +167,8 @@ def query():
                         'top_match': results[0]['metadata'].get('title', 'Unknown'),
                         'confidence': f"{results[0]['score']:.2f}",
                         'mode': 'multi_agent',
-                        'agent': agent_response.get('agent', 'Team Agent')
+                        'agent': agent_response.get('agent', 'Team Agent'),
+                        'retrieval': context['retrieval']
                     })
                 else:
                     # Agent failed, fall back to simple context
@@ -192,6 +220,79 @@ def query():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/query/stream', methods=['POST'])
+def query_stream():
+    """
+    Handle user queries as a Server-Sent Events stream
+    
+    The retrieved FAISS sources are sent as soon as the parallel retrieval
+    finishes, so they render while the Team Agent is still working on the answer.
+    
+    Events:
+        sources  retrieved FAISS documents
+        answer   answer text
+        done     response metadata (source, mode, confidence)
+        error    error message
+    """
+    data = request.json or {}
+    user_query = data.get('query', '').strip()
+    
+    if not user_query:
+        return jsonify({'error': 'Query cannot be empty'}), 400
+    
+    def generate():
+        try:
+            # Step 1: Retrieve context in parallel and send the sources right away
+            context = None
+            if agent_manager:
+                context = agent_manager.gather_context(user_query, vector_store=vector_store, n_results=3)
+                results = context['documents']
+            else:
+                results = vector_store.search(user_query, n_results=3)
+            yield sse_event('sources', {'query': user_query, 'sources': format_sources(results)})
+            
+            # Step 2: Use Team Agent with retrieved context
+            if agent_manager:
+                agent_response = agent_manager.query(user_query, context=context)
+                
+                if agent_response['success']:
+                    yield sse_event('answer', {'text': agent_response['answer']})
+                    yield sse_event('done', {
+                        'source': f"Multi-Agent RAG System ({len(results)} documents retrieved)",
+                        'query': user_query,
+                        'num_results': len(results),
+                        'confidence': f"{results[0]['score']:.2f}" if results else None,
+                        'mode': 'multi_agent' if results else 'agent_only',
+                        'agent': agent_response.get('agent', 'Team Agent'),
+                        'retrieval': context['retrieval']
+                    })
+                    return
+            
+            if not results:
+                yield sse_event('answer', {'text': 'No relevant information found in the database. Please try a different query or upload more documents.'})
+                yield sse_event('done', {'source': 'Vector Database', 'query': user_query, 'mode': 'no_results'})
+                return
+            
+            # No agent (or agent failed): return simple context
+            context_text = "\n\n".join([
+                f"Document {i+1} (from {r['metadata'].get('title', 'Unknown')}):\n{r['content'][:800]}"
+                for i, r in enumerate(results)
+            ])
+            yield sse_event('answer', {'text': f"Based on the policy documents:\n\n{context_text[:1000]}..."})
+            yield sse_event('done', {
+                'source': f"FAISS Vector Database ({len(results)} documents)",
+                'query': user_query,
+                'num_results': len(results),
+                'mode': 'fallback' if agent_manager else 'no_agent'
+            })
+        
+        except Exception as e:
+            yield sse_event('error', {'error': str(e)})
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
     """Handle file uploads"""
@@ -260,14 +361,19 @@ def upload_file():
                 }
             })
         
-        added = vector_store.add_documents(documents)
+        # Replace an earlier upload of the same file; only new or changed
+        # sections are embedded
+        result = vector_store.upsert(documents, source=file.filename)
+        added = result['added']
         
         # Clean up
         os.remove(temp_path)
         
         return jsonify({
             'message': f'Successfully processed and indexed {added} sections from {file.filename}',
-            'sections': added
+            'sections': added,
+            'unchanged': result['unchanged'],
+            'deleted': result['deleted']
         })
     
     except Exception as e:
@@ -486,6 +592,7 @@ def health():
     return jsonify({
         'status': 'healthy',
         'backend': 'FAISS',
+        'embedding_model': vector_store.embedding_provider.get_stats(),
         'agent_system': agent_manager is not None,
         'timestamp': datetime.now().isoformat()
     })
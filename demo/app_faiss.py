@@ -3,11 +3,12 @@ Policy Navigator Agent - Web Demo (FAISS Version)
 Stable version for Windows + Python 3.9
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from datetime import datetime
 import sys
 import os
+import json
 import tempfile
 import PyPDF2
 
@@ -18,11 +19,13 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 from src.data.faiss_vector_store import FAISSVectorStore
+from src.data.embedding_service import EmbeddingService
+from src.data.answer_cache import AnswerCache
 from src.tools.document_processor import DocumentProcessor
 from src.tools.federal_register_tool import FederalRegisterTool
 from src.tools.url_scraper_tool import URLScraperTool
+from src.agents.model_registry import ModelRegistry
 from dotenv import load_dotenv
-from aixplain.factories import ModelFactory
 
 # Load environment variables
 load_dotenv(os.path.join(PROJECT_ROOT, '.env'))
@@ -39,11 +42,41 @@ url_scraper = URLScraperTool()
 # FAISS database path
 FAISS_DB_PATH = os.path.join(PROJECT_ROOT, "faiss_db")
 
+# Maximum number of queries accepted by /api/search-batch
+MAX_BATCH_QUERIES = 1000
+
+# Retrieval mode for queries: 'dense', 'lexical' or 'hybrid' (BM25 + embeddings)
+SEARCH_MODE = os.getenv('SEARCH_MODE', 'hybrid')
+
+# Minimum cosine similarity of a retrieved document; queries with no document
+# above it are answered without calling the LLM (ignored in lexical mode)
+MIN_SCORE = float(os.getenv('MIN_SCORE', '0.3'))
+
 # Initialize FAISS vector store
 print("Initializing FAISS vector store...")
-vector_store = FAISSVectorStore(persist_directory=FAISS_DB_PATH)
+# Concurrent requests share batched forward passes of the embedding model
+embedding_service = EmbeddingService(max_wait_ms=float(os.getenv('EMBEDDING_BATCH_WAIT_MS', '5')))
+vector_store = FAISSVectorStore(persist_directory=FAISS_DB_PATH, embedding_provider=embedding_service)
 print("✓ FAISS vector store ready")
 
+# Load the embedding model in the background so startup does not wait for it
+vector_store.embedding_provider.preload()
+
+# MIN_SCORE is a cosine similarity: stores built with the L2 metric only
+# apply a min_score given explicitly in the request
+DEFAULT_MIN_SCORE = MIN_SCORE if vector_store.index_config['metric'] == 'cosine' else None
+if DEFAULT_MIN_SCORE is None:
+    print(f"⚠ MIN_SCORE cutoff disabled: the vector store uses the "
+          f"'{vector_store.index_config['metric']}' metric (re-ingest with --reset --metric cosine to enable it)")
+
+# Cache of generated answers, invalidated whenever the vector store changes
+answer_cache = AnswerCache()
+
+# Resolve LLM handles once at startup (refreshed in the background)
+print("Resolving aiXplain models...")
+model_registry = ModelRegistry()
+model_registry.start()
+
 
 def generate_simple_answer(query, results):
     """
@@ -73,6 +106,66 @@ def generate_simple_answer(query, results):
     return "\n".join(answer_parts)
 
 
+def build_prompt(user_query, results):
+    """Build the LLM prompt from the user query and the retrieved documents"""
+    # Build context from top results with more content
+    context = "\n\n".join([
+        f"Document {i+1} (from {r['metadata'].get('title', 'Unknown')}):\n{r['content'][:2000]}"
+        for i, r in enumerate(results)
+    ])
+    
+    return f"""You are an expert assistant specializing in US government policies and regulations.
+
+IMPORTANT INSTRUCTIONS:
+- Read the ENTIRE document content carefully, including disclaimers and restrictions
+- Look for specific details, warnings, prohibitions, and requirements
+- Quote relevant sections when available
+- If information is found in the documents, provide a detailed answer
+- Only say "information not found" if you've thoroughly checked all documents
+
+Question: {user_query}
+
+Relevant policy documents:
+{context}
+
+Provide a comprehensive answer based on the documents above. Include specific details, quotes, and citations when available.
+
+Answer:"""
+
+
+def relevance_threshold(data, mode):
+    """Minimum similarity for a request (the 'min_score' field overrides DEFAULT_MIN_SCORE)"""
+    if mode == 'lexical':
+        return None
+    min_score = data.get('min_score', DEFAULT_MIN_SCORE)
+    return float(min_score) if min_score is not None else None
+
+
+def confidence(result):
+    """Embedding similarity of a result (hybrid scores are rank-based)"""
+    return result.get('dense_score', result['score'])
+
+
+def sse_event(event, data):
+    """Format a Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def format_sources(results):
+    """Summarize retrieved documents for streaming to the client"""
+    return [
+        {
+            'id': r['id'],
+            'title': r['metadata'].get('title', 'Unknown'),
+            'section_number': r['metadata'].get('section_number'),
+            'source': r['metadata'].get('source'),
+            'score': round(r['score'], 4),
+            'preview': r['content'][:300]
+        }
+        for r in results
+    ]
+
+
 @app.route('/')
 def index():
     """Main page"""
@@ -92,13 +185,16 @@ def query():
     """Handle user queries"""
     data = request.json
     user_query = data.get('query', '').strip()
+    filters = data.get('filters') or None
+    mode = data.get('mode', SEARCH_MODE)
     
     if not user_query:
         return jsonify({'error': 'Query cannot be empty'}), 400
     
     try:
-        # Search vector database
-        results = vector_store.search(user_query, n_results=3)
+        # Search vector database (optionally restricted by metadata filters)
+        results = vector_store.search(user_query, n_results=3, filter_metadata=filters,
+                                      mode=mode, min_score=relevance_threshold(data, mode))
         
         if not results:
             return jsonify({
@@ -107,64 +203,28 @@ def query():
                 'query': user_query
             })
         
-        # Build context from top results with more content
-        context = "\n\n".join([
-            f"Document {i+1} (from {r['metadata'].get('title', 'Unknown')}):\n{r['content'][:2000]}"
-            for i, r in enumerate(results)
-        ])
+        # Identical question over an unchanged corpus: reuse the generated answer
+        doc_ids = [r['id'] for r in results]
+        cached_response = answer_cache.get(user_query, doc_ids, vector_store.generation)
+        if cached_response:
+            cached_response['query'] = user_query
+            cached_response['cached'] = True
+            return jsonify(cached_response)
         
         # Use aiXplain LLM to generate answer
+        llm_answered = False
         try:
             # Create improved prompt for LLM
-            prompt = f"""You are an expert assistant specializing in US government policies and regulations.
-
-IMPORTANT INSTRUCTIONS:
-- Read the ENTIRE document content carefully, including disclaimers and restrictions
-- Look for specific details, warnings, prohibitions, and requirements
-- Quote relevant sections when available
-- If information is found in the documents, provide a detailed answer
-- Only say "information not found" if you've thoroughly checked all documents
-
-Question: {user_query}
-
-Relevant policy documents:
-{context}
-
-Provide a comprehensive answer based on the documents above. Include specific details, quotes, and citations when available.
-
-Answer:"""
-            
-            # Use GPT-4o-mini via aiXplain
-            from aixplain.factories import ModelFactory
+            prompt = build_prompt(user_query, results)
             
-            # Try to get GPT-4o-mini model
+            # Use the first healthy model of the fallback chain (GPT-4o-mini, then GPT-3.5-turbo)
             try:
-                model = ModelFactory.get('6646261c6eb563165658bbb1')  # GPT-4o-mini
-                response = model.run(prompt)
-                
-                # Extract answer from response
-                if hasattr(response, 'data'):
-                    answer = response.data
-                elif hasattr(response, 'text'):
-                    answer = response.text
-                elif isinstance(response, dict) and 'data' in response:
-                    answer = response['data']
-                elif isinstance(response, str):
-                    answer = response
-                else:
-                    raise Exception(f"Unexpected response format: {type(response)}")
-                    
+                answer = model_registry.run(prompt)['answer']
+                llm_answered = True
             except Exception as model_error:
                 print(f"Model error: {str(model_error)}")
-                # Try alternative: use text completion with different model ID
-                try:
-                    # Try GPT-3.5-turbo as fallback
-                    model = ModelFactory.get('openai/gpt-3.5-turbo')
-                    response = model.run(prompt)
-                    answer = response.data if hasattr(response, 'data') else str(response)
-                except:
-                    # If all else fails, generate a simple answer from context
-                    answer = generate_simple_answer(user_query, results)
+                # If all models fail, generate a simple answer from context
+                answer = generate_simple_answer(user_query, results)
         
         except Exception as llm_error:
             print(f"LLM error: {str(llm_error)}")
@@ -173,13 +233,140 @@ Answer:"""
             # Generate simple answer from context
             answer = generate_simple_answer(user_query, results)
         
-        return jsonify({
+        response_data = {
             'answer': answer,
             'source': f"FAISS Vector Database ({len(results)} documents) + aiXplain LLM",
             'query': user_query,
             'num_results': len(results),
             'top_match': results[0]['metadata'].get('title', 'Unknown'),
-            'confidence': f"{results[0]['score']:.2f}"
+            'confidence': f"{confidence(results[0]):.2f}"
+        }
+        
+        # Only cache real LLM answers, not the simple fallback
+        if llm_answered:
+            answer_cache.put(user_query, doc_ids, vector_store.generation, response_data)
+        
+        return jsonify(response_data)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/query/stream', methods=['POST'])
+def query_stream():
+    """
+    Handle user queries as a Server-Sent Events stream
+    
+    Events:
+        sources  retrieved FAISS documents, sent as soon as retrieval finishes
+        answer   answer text chunks, sent as the LLM produces them
+        done     response metadata (source, confidence, cached)
+        error    error message
+    """
+    data = request.json or {}
+    user_query = data.get('query', '').strip()
+    filters = data.get('filters') or None
+    mode = data.get('mode', SEARCH_MODE)
+    
+    if not user_query:
+        return jsonify({'error': 'Query cannot be empty'}), 400
+    
+    def generate():
+        try:
+            # Search vector database and send the sources right away
+            results = vector_store.search(user_query, n_results=3, filter_metadata=filters,
+                                          mode=mode, min_score=relevance_threshold(data, mode))
+            yield sse_event('sources', {'query': user_query, 'sources': format_sources(results)})
+            
+            if not results:
+                yield sse_event('answer', {'text': 'No relevant information found in the database. Please try a different query or upload more documents.'})
+                yield sse_event('done', {'source': 'Vector Database', 'query': user_query})
+                return
+            
+            done_data = {
+                'source': f"FAISS Vector Database ({len(results)} documents) + aiXplain LLM",
+                'query': user_query,
+                'num_results': len(results),
+                'top_match': results[0]['metadata'].get('title', 'Unknown'),
+                'confidence': f"{confidence(results[0]):.2f}"
+            }
+            
+            # Identical question over an unchanged corpus: reuse the generated answer
+            doc_ids = [r['id'] for r in results]
+            cached_response = answer_cache.get(user_query, doc_ids, vector_store.generation)
+            if cached_response:
+                yield sse_event('answer', {'text': cached_response['answer']})
+                yield sse_event('done', {**done_data, 'cached': True})
+                return
+            
+            # Stream the LLM answer as it is produced
+            answer_parts = []
+            try:
+                for chunk in model_registry.run_stream(build_prompt(user_query, results)):
+                    answer_parts.append(chunk)
+                    yield sse_event('answer', {'text': chunk})
+            except Exception as model_error:
+                print(f"Model error: {str(model_error)}")
+                if answer_parts:
+                    raise
+                # If all models fail, send a simple answer from context
+                yield sse_event('answer', {'text': generate_simple_answer(user_query, results)})
+                yield sse_event('done', done_data)
+                return
+            
+            answer_cache.put(user_query, doc_ids, vector_store.generation,
+                             {**done_data, 'answer': ''.join(answer_parts)})
+            yield sse_event('done', done_data)
+        
+        except Exception as e:
+            yield sse_event('error', {'error': str(e)})
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/search-batch', methods=['POST'])
+def search_batch():
+    """
+    Retrieve documents for a list of queries in one batch (offline evaluation)
+    
+    Request body:
+    {
+        "queries": ["What are EPA air quality standards?", ...],
+        "n_results": 5 (optional),
+        "filters": {"source": "CFR Title 40", "section_number": {"$prefix": "60."}} (optional),
+        "mode": "dense" | "lexical" | "hybrid" (optional, default: dense),
+        "min_score": 0.3 (optional, dense/hybrid only)
+    }
+    """
+    data = request.json or {}
+    queries = data.get('queries')
+    n_results = data.get('n_results', 5)
+    filters = data.get('filters') or None
+    mode = data.get('mode', 'dense')
+    min_score = data.get('min_score')
+    
+    if not isinstance(queries, list) or not queries:
+        return jsonify({'error': 'queries must be a non-empty list'}), 400
+    
+    if not all(isinstance(q, str) and q.strip() for q in queries):
+        return jsonify({'error': 'Every query must be a non-empty string'}), 400
+    
+    if len(queries) > MAX_BATCH_QUERIES:
+        return jsonify({'error': f'At most {MAX_BATCH_QUERIES} queries per request'}), 400
+    
+    try:
+        queries = [q.strip() for q in queries]
+        batch_results = vector_store.search_batch(queries, n_results=int(n_results),
+                                                  filter_metadata=filters, mode=mode,
+                                                  min_score=float(min_score) if min_score is not None else None)
+        
+        return jsonify({
+            'num_queries': len(queries),
+            'results': [
+                {'query': q, 'num_results': len(results), 'results': results}
+                for q, results in zip(queries, batch_results)
+            ]
         })
     
     except Exception as e:
@@ -253,14 +440,19 @@ def upload_file():
                 }
             })
         
-        added = vector_store.add_documents(documents)
+        # Replace an earlier upload of the same file; only new or changed
+        # sections are embedded
+        result = vector_store.upsert(documents, source=file.filename)
+        added = result['added']
         
         # Clean up
         os.remove(temp_path)
         
         return jsonify({
             'message': f'Successfully processed and indexed {added} sections from {file.filename}',
-            'sections': added
+            'sections': added,
+            'unchanged': result['unchanged'],
+            'deleted': result['deleted']
         })
     
     except Exception as e:
@@ -351,12 +543,35 @@ def clear_all_documents():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/delete-source', methods=['POST'])
+def delete_source():
+    """Delete the documents of one uploaded file or scraped URL"""
+    data = request.json
+    source = data.get('source', '').strip()
+    
+    if not source:
+        return jsonify({'error': 'Source cannot be empty'}), 400
+    
+    try:
+        deleted = vector_store.delete_by_source(source)
+        
+        return jsonify({
+            'message': f'Deleted {deleted} documents from {source}',
+            'deleted': deleted
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/health')
 def health():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
         'backend': 'FAISS',
+        'embedding_model': vector_store.embedding_provider.get_stats(),
+        'models': model_registry.get_status(),
         'timestamp': datetime.now().isoformat()
     })
 
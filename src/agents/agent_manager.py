@@ -14,6 +14,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 from src.tools.courtlistener_tool import CourtListenerTool
 from src.tools.federal_register_tool import FederalRegisterTool
+from src.agents.retrieval_orchestrator import RetrievalOrchestrator
 
 
 class AgentManager:
@@ -44,6 +45,9 @@ class AgentManager:
         self.courtlistener_tool = CourtListenerTool()  # Fallback mode (no API key)
         self.federal_register_tool = FederalRegisterTool()
         
+        # Runs retrieval sources in parallel with per-source deadlines
+        self.orchestrator = RetrievalOrchestrator()
+        
         self._load_agents()
     
     def _load_agents(self):
@@ -91,17 +95,31 @@ class AgentManager:
         """
         try:
             # Prepare the query with context if provided
+            sections = []
+            
             if context and context.get('documents'):
                 # Include retrieved documents in the query
                 docs_text = "\n\n".join([
                     f"Document {i+1} (from {doc['metadata'].get('title', 'Unknown')}):\n{doc['content'][:800]}"
                     for i, doc in enumerate(context['documents'])
                 ])
-                
+                sections.append(f"Retrieved Policy Documents:\n{docs_text}")
+            
+            if context and context.get('federal_register'):
+                fr_text = "\n\n".join([
+                    self.federal_register_tool.format_document_summary(doc)
+                    for doc in context['federal_register']
+                ])
+                sections.append(f"Recent Federal Register Documents:\n{fr_text}")
+            
+            if context and context.get('court_cases'):
+                sections.append(f"Related Court Cases:\n{context['court_cases']}")
+            
+            if sections:
+                context_text = "\n\n".join(sections)
                 enhanced_query = f"""User Question: {user_query}
 
-Retrieved Policy Documents:
-{docs_text}
+{context_text}
 
 Please answer the user's question based on the provided documents. If the documents don't contain sufficient information, indicate that and provide general guidance."""
             else:
@@ -135,6 +153,72 @@ Please answer the user's question based on the provided documents. If the docume
                 'agent_id': self.TEAM_AGENT_ID
             }
     
+    def gather_context(self, user_query: str, vector_store: Any = None, n_results: int = 3,
+                       deadlines: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        Retrieve context from all sources in parallel
+        
+        The vector store, Federal Register and CourtListener are queried
+        concurrently. Sources that miss their deadline or fail are left out,
+        so the context holds whatever returned in time.
+        
+        Args:
+            user_query: User's question
+            vector_store: Optional vector store to search for policy documents
+            n_results: Number of results to retrieve per source
+            deadlines: Optional per-source deadlines in seconds
+            
+        Returns:
+            Context dictionary with 'documents', 'federal_register',
+            'court_cases', 'query' and per-source 'retrieval' status
+        """
+        sources = {
+            'federal_register': lambda: self.federal_register_tool.search_documents(
+                user_query, per_page=n_results
+            ),
+            'court_cases': lambda: self.courtlistener_tool.search_opinions(
+                user_query, limit=n_results
+            )
+        }
+        prepare = {}
+        if vector_store is not None:
+            sources['vector_store'] = lambda: vector_store.search(user_query, n_results=n_results)
+            provider = getattr(vector_store, 'embedding_provider', None)
+            if provider is not None:
+                # A lazily loaded embedding model must not eat into the search deadline
+                prepare['vector_store'] = lambda: provider.preload(background=False)
+        
+        results = self.orchestrator.retrieve(sources, deadlines=deadlines, prepare=prepare)
+        
+        def data(name):
+            result = results.get(name)
+            if result and result['status'] == 'success':
+                return result['data']
+            return None
+        
+        documents = data('vector_store') or []
+        federal_register = (data('federal_register') or {}).get('results') or []
+        
+        court_results = data('court_cases')
+        court_cases = None
+        if court_results and court_results.get('status') == 'success' and court_results.get('cases'):
+            court_cases = self.courtlistener_tool.format_for_agent(court_results)
+        
+        for name, result in results.items():
+            if result['status'] != 'success':
+                print(f"⚠ Retrieval source {name} skipped ({result['status']}): {result['error']}")
+        
+        return {
+            'query': user_query,
+            'documents': documents,
+            'federal_register': federal_register[:n_results],
+            'court_cases': court_cases,
+            'retrieval': {
+                name: {'status': result['status'], 'elapsed': round(result['elapsed'], 3)}
+                for name, result in results.items()
+            }
+        }
+    
     def query_rag_agent(self, query: str, documents: list) -> Dict[str, Any]:
         """
         Query RAG agent directly
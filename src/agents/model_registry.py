@@ -0,0 +1,260 @@
+"""
+Model Registry for Policy Navigator
+Resolves aiXplain LLM handles once and keeps a health-aware fallback chain
+"""
+
+import inspect
+import threading
+import time
+from typing import Dict, Any, Optional, List, Callable, Iterator
+
+from aixplain.factories import ModelFactory
+
+
+# Default LLM fallback chain: (name, aiXplain model id)
+DEFAULT_MODEL_CHAIN = [
+    ('GPT-4o-mini', '6646261c6eb563165658bbb1'),
+    ('GPT-3.5-turbo', 'openai/gpt-3.5-turbo'),
+]
+
+
+class ModelRegistry:
+    """
+    Holds resolved aiXplain model handles and routes prompts to a healthy one
+    
+    Handles are resolved once (at startup and by a background refresh thread)
+    instead of calling ModelFactory.get() per request. A model whose call
+    fails is marked unhealthy and skipped for retry_after seconds, so requests
+    go straight to the model that is currently working instead of paying for
+    a failed call before every fallback.
+    """
+    
+    def __init__(self, models: Optional[List[tuple]] = None, refresh_interval: float = 600,
+                 retry_after: float = 60, resolver: Callable = ModelFactory.get):
+        """
+        Initialize model registry
+        
+        Args:
+            models: Fallback chain of (name, model id) tuples, in order of preference
+            refresh_interval: Seconds between background re-resolution of handles
+            retry_after: Seconds an unhealthy model is skipped before it is tried again
+            resolver: Function resolving a model id to a handle (ModelFactory.get)
+        """
+        self.refresh_interval = refresh_interval
+        self.retry_after = retry_after
+        self.resolver = resolver
+        
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._refresh_thread = None
+        
+        self.models = []
+        for name, model_id in (models or DEFAULT_MODEL_CHAIN):
+            self.models.append({
+                'name': name,
+                'model_id': model_id,
+                'handle': None,
+                'healthy': True,
+                'unhealthy_since': None,
+                'last_error': None,
+                'last_success': None,
+                'calls': 0,
+                'failures': 0
+            })
+    
+    def start(self):
+        """Resolve all handles now and keep them fresh in a background thread"""
+        self.resolve_all()
+        
+        if self.refresh_interval and self._refresh_thread is None:
+            self._refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
+            self._refresh_thread.start()
+    
+    def stop(self):
+        """Stop the background refresh thread"""
+        self._stop_event.set()
+    
+    def _refresh_loop(self):
+        """Periodically re-resolve model handles"""
+        while not self._stop_event.wait(self.refresh_interval):
+            self.resolve_all(force=True)
+    
+    def resolve_all(self, force: bool = False):
+        """
+        Resolve model handles
+        
+        Args:
+            force: Re-resolve handles that are already resolved
+        """
+        for model in self.models:
+            if model['handle'] is not None and not force:
+                continue
+            try:
+                handle = self.resolver(model['model_id'])
+                with self._lock:
+                    model['handle'] = handle
+                print(f"✓ Model resolved: {model['name']} ({model['model_id']})")
+            except Exception as e:
+                with self._lock:
+                    model['last_error'] = str(e)
+                print(f"⚠ Could not resolve model {model['name']}: {str(e)}")
+    
+    def _candidates(self) -> List[Dict[str, Any]]:
+        """Models to try, healthy ones first, in order of preference"""
+        now = time.time()
+        healthy, cooling_down = [], []
+        with self._lock:
+            for model in self.models:
+                if model['healthy'] or now - model['unhealthy_since'] >= self.retry_after:
+                    healthy.append(model)
+                else:
+                    cooling_down.append(model)
+        # When every model is cooling down, still try them rather than fail outright
+        return healthy or cooling_down
+    
+    def _get_handle(self, model: Dict[str, Any]) -> Any:
+        """Return the resolved handle of a model, resolving it if needed"""
+        handle = model['handle']
+        if handle is None:
+            # Not resolved yet (e.g. platform unreachable at startup)
+            handle = self.resolver(model['model_id'])
+            with self._lock:
+                model['handle'] = handle
+        return handle
+    
+    def run(self, prompt: str) -> Dict[str, Any]:
+        """
+        Run a prompt on the first healthy model of the chain
+        
+        Args:
+            prompt: Prompt text
+            
+        Returns:
+            Dictionary with 'answer', 'model' and 'model_id'
+            
+        Raises:
+            RuntimeError: If no model could answer
+        """
+        errors = []
+        for model in self._candidates():
+            try:
+                answer = self._extract_answer(self._get_handle(model).run(prompt))
+            except Exception as e:
+                print(f"Model error ({model['name']}): {str(e)}")
+                self._mark_failure(model, e)
+                errors.append(f"{model['name']}: {str(e)}")
+                continue
+            
+            self._mark_success(model)
+            return {
+                'answer': answer,
+                'model': model['name'],
+                'model_id': model['model_id']
+            }
+        
+        raise RuntimeError("No LLM available: " + "; ".join(errors))
+    
+    def run_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Run a prompt on the first healthy model, yielding the answer as it is produced
+        
+        Models whose SDK handle supports streaming (run(..., stream=True)) yield
+        text chunks as they arrive; other models yield the full answer at once.
+        Falling back to the next model is only possible before the first chunk.
+        
+        Args:
+            prompt: Prompt text
+            
+        Yields:
+            Answer text chunks
+            
+        Raises:
+            RuntimeError: If no model could answer
+        """
+        errors = []
+        for model in self._candidates():
+            started = False
+            try:
+                handle = self._get_handle(model)
+                if self._supports_streaming(handle):
+                    for chunk in handle.run(prompt, stream=True):
+                        text = self._extract_answer(chunk)
+                        if text:
+                            started = True
+                            yield text
+                else:
+                    answer = self._extract_answer(handle.run(prompt))
+                    started = True
+                    yield answer
+            except Exception as e:
+                print(f"Model error ({model['name']}): {str(e)}")
+                self._mark_failure(model, e)
+                if started:
+                    raise
+                errors.append(f"{model['name']}: {str(e)}")
+                continue
+            
+            self._mark_success(model)
+            return
+        
+        raise RuntimeError("No LLM available: " + "; ".join(errors))
+    
+    @staticmethod
+    def _supports_streaming(handle: Any) -> bool:
+        """Whether a model handle accepts run(..., stream=True)"""
+        try:
+            return 'stream' in inspect.signature(handle.run).parameters
+        except (TypeError, ValueError):
+            return False
+    
+    @staticmethod
+    def _extract_answer(response: Any) -> str:
+        """Extract the answer text from a model response"""
+        if hasattr(response, 'data'):
+            return response.data
+        elif hasattr(response, 'text'):
+            return response.text
+        elif isinstance(response, dict) and 'data' in response:
+            return response['data']
+        elif isinstance(response, str):
+            return response
+        raise Exception(f"Unexpected response format: {type(response)}")
+    
+    def _mark_success(self, model: Dict[str, Any]):
+        """Record a successful call"""
+        with self._lock:
+            model['calls'] += 1
+            model['healthy'] = True
+            model['unhealthy_since'] = None
+            model['last_success'] = time.time()
+    
+    def _mark_failure(self, model: Dict[str, Any], error: Exception):
+        """Record a failed call and take the model out of rotation for retry_after seconds"""
+        with self._lock:
+            model['calls'] += 1
+            model['failures'] += 1
+            model['healthy'] = False
+            model['unhealthy_since'] = time.time()
+            model['last_error'] = str(error)
+    
+    def get_status(self) -> List[Dict[str, Any]]:
+        """
+        Get the state of every model in the chain
+        
+        Returns:
+            List of model status dictionaries, in order of preference
+        """
+        with self._lock:
+            return [
+                {
+                    'name': model['name'],
+                    'model_id': model['model_id'],
+                    'resolved': model['handle'] is not None,
+                    'healthy': model['healthy'],
+                    'last_error': model['last_error'],
+                    'last_success': model['last_success'],
+                    'calls': model['calls'],
+                    'failures': model['failures']
+                }
+                for model in self.models
+            ]
@@ -0,0 +1,130 @@
+"""
+Retrieval Orchestrator for Policy Navigator
+Runs retrieval sources (vector store, Federal Register, CourtListener) concurrently
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, Callable, Optional
+
+
+class RetrievalOrchestrator:
+    """
+    Fan out retrieval calls to a thread pool with per-source deadlines
+    
+    Every source is started at once, so a composite question costs the
+    slowest source (bounded by its deadline) instead of the sum of all of
+    them. Results that arrive after their deadline are dropped; the rest are
+    returned for merging into the agent context.
+    
+    A source can have a one-time preparation step (loading the embedding
+    model of the vector store) that runs first and is not counted against
+    its deadline, so the first queries after startup do not time out while
+    the model loads.
+    """
+    
+    # Default per-source deadlines in seconds
+    DEFAULT_DEADLINES = {
+        'vector_store': 3.0,
+        'federal_register': 6.0,
+        'court_cases': 6.0,
+    }
+    
+    def __init__(self, max_workers: int = 8, deadlines: Optional[Dict[str, float]] = None,
+                 default_deadline: float = 5.0, prepare_timeout: float = 120.0):
+        """
+        Initialize retrieval orchestrator
+        
+        Args:
+            max_workers: Size of the shared thread pool
+            deadlines: Per-source deadlines in seconds (merged with DEFAULT_DEADLINES)
+            default_deadline: Deadline for sources without a specific one
+            prepare_timeout: Longest wait for a source's preparation before its
+                             deadline starts counting anyway
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='retrieval')
+        self.deadlines = {**self.DEFAULT_DEADLINES, **(deadlines or {})}
+        self.default_deadline = default_deadline
+        self.prepare_timeout = prepare_timeout
+    
+    def retrieve(self, sources: Dict[str, Callable[[], Any]],
+                 deadlines: Optional[Dict[str, float]] = None,
+                 prepare: Optional[Dict[str, Callable[[], Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Run retrieval sources concurrently
+        
+        Args:
+            sources: Mapping of source name to a zero-argument callable
+            deadlines: Optional per-call deadline overrides in seconds
+            prepare: Optional mapping of source name to a zero-argument callable
+                     run before the source (e.g. waiting for the embedding model
+                     to load); a source's deadline starts when it returns
+            
+        Returns:
+            Mapping of source name to a dictionary with 'status'
+            ('success', 'timeout' or 'error'), 'data', 'error' and 'elapsed'
+        """
+        deadlines = {**self.deadlines, **(deadlines or {})}
+        prepare = prepare or {}
+        started = time.monotonic()
+        
+        ready = {name: threading.Event() for name in sources if name in prepare}
+        prepared_at = {}
+        
+        def run(name, fn):
+            if name in ready:
+                try:
+                    prepare[name]()
+                finally:
+                    prepared_at[name] = time.monotonic()
+                    ready[name].set()
+            return self._timed(fn)
+        
+        futures = {
+            name: self.executor.submit(run, name, fn)
+            for name, fn in sources.items()
+        }
+        
+        results = {}
+        # Wait for the sources with the earliest deadlines first; all of them
+        # are already running, so the total wait is the largest deadline
+        for name in sorted(futures, key=lambda n: deadlines.get(n, self.default_deadline)):
+            deadline = deadlines.get(name, self.default_deadline)
+            start = started
+            if name in ready:
+                # The deadline starts once the source is prepared
+                ready[name].wait(timeout=self.prepare_timeout)
+                start = prepared_at.get(name, time.monotonic())
+            remaining = max(0.0, deadline - (time.monotonic() - start))
+            try:
+                data, elapsed = futures[name].result(timeout=remaining)
+                results[name] = {'status': 'success', 'data': data, 'error': None, 'elapsed': elapsed}
+            except FutureTimeoutError:
+                futures[name].cancel()
+                results[name] = {
+                    'status': 'timeout',
+                    'data': None,
+                    'error': f"No response within {deadline:.1f}s",
+                    'elapsed': time.monotonic() - started
+                }
+            except Exception as e:
+                results[name] = {
+                    'status': 'error',
+                    'data': None,
+                    'error': str(e),
+                    'elapsed': time.monotonic() - started
+                }
+        
+        return results
+    
+    @staticmethod
+    def _timed(fn: Callable[[], Any]):
+        """Run a source and measure how long it took"""
+        start = time.monotonic()
+        data = fn()
+        return data, time.monotonic() - start
+    
+    def shutdown(self):
+        """Stop the thread pool (running calls are not interrupted)"""
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,132 @@
+"""
+Answer Cache for Policy Navigator Agent
+Caches generated RAG answers keyed on the query and the retrieved chunks
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+from src.data.embedding_cache import EmbeddingCache
+
+
+class AnswerCache:
+    """
+    LRU cache of generated answers
+    
+    Entries are keyed on the normalized query and the set of retrieved chunk
+    ids. Every entry also records the vector store generation it was computed
+    for: when documents are added or cleared the generation changes and the
+    whole cache is dropped, so answers are never served for a stale corpus.
+    """
+    
+    def __init__(self, max_entries: int = 1000, ttl_seconds: Optional[float] = 24 * 3600):
+        """
+        Initialize answer cache
+        
+        Args:
+            max_entries: Maximum number of cached answers
+            ttl_seconds: Time-to-live of an answer (None for no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def _key(query: str, doc_ids: List[Any]) -> str:
+        """Cache key of a query and its retrieved chunk ids"""
+        normalized = EmbeddingCache.normalize_query(query)
+        ids = ",".join(str(doc_id) for doc_id in sorted(doc_ids, key=str))
+        return hashlib.sha1(f"{normalized}\x00{ids}".encode('utf-8')).hexdigest()
+    
+    def _check_generation(self, generation: int):
+        """Drop every entry if the vector store changed since they were cached"""
+        if generation != self._generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._generation = generation
+    
+    def get(self, query: str, doc_ids: List[Any], generation: int) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached answer
+        
+        Args:
+            query: User query
+            doc_ids: Ids of the retrieved chunks
+            generation: Current vector store generation
+            
+        Returns:
+            Cached response dictionary, or None on a miss
+        """
+        key = self._key(query, doc_ids)
+        
+        with self._lock:
+            self._check_generation(generation)
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, response = entry
+                if self.ttl_seconds is None or time.time() - created <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(response)
+                del self._entries[key]
+            
+            self.misses += 1
+            return None
+    
+    def put(self, query: str, doc_ids: List[Any], generation: int, response: Dict[str, Any]):
+        """
+        Cache an answer
+        
+        Args:
+            query: User query
+            doc_ids: Ids of the retrieved chunks
+            generation: Vector store generation the answer was computed for
+            response: Response dictionary to cache
+        """
+        if self.max_entries <= 0:
+            return
+        
+        key = self._key(query, doc_ids)
+        
+        with self._lock:
+            # Answer computed before the store changed again: never cache it
+            if self._generation is not None and generation < self._generation:
+                return
+            self._check_generation(generation)
+            self._entries[key] = (time.time(), dict(response))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hit/miss counters and size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'invalidations': self.invalidations,
+                'size': len(self._entries),
+                'max_entries': self.max_entries
+            }
+    
+    def clear(self):
+        """Remove all cached answers"""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,183 @@
+"""
+Embedding backend benchmark for Policy Navigator Agent
+Checks parity of the ONNX backends with PyTorch and compares their throughput on CFR sections
+"""
+
+import sys
+import os
+import argparse
+import time
+import numpy as np
+from typing import List, Dict, Any
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data.embedding_backends import EMBEDDING_BACKENDS, EmbeddingBackend, make_embedding_backend
+from src.tools.document_processor import DocumentProcessor
+
+
+# Minimum cosine similarity between a backend's embedding and the PyTorch one
+PARITY_THRESHOLDS = {
+    'onnx': 0.999,
+    'onnx_int8': 0.98,
+}
+
+
+def load_sections(cfr_path: str, limit: int) -> List[str]:
+    """
+    Read section texts from a CFR XML file
+    
+    Args:
+        cfr_path: Path to CFR XML file
+        limit: Maximum number of sections
+        
+    Returns:
+        Section texts
+    """
+    texts = []
+    for section in DocumentProcessor().iter_cfr_sections(cfr_path):
+        if section.get('content'):
+            texts.append(section['content'])
+        if len(texts) >= limit:
+            break
+    return texts
+
+
+def check_parity(reference: np.ndarray, candidate: np.ndarray, threshold: float) -> Dict[str, Any]:
+    """
+    Compare two sets of embeddings of the same texts
+    
+    Args:
+        reference: Reference embeddings (PyTorch backend)
+        candidate: Embeddings of the backend under test
+        threshold: Minimum per-text cosine similarity
+        
+    Returns:
+        Dictionary with mean/min cosine similarity, the fraction of texts
+        whose nearest neighbour is unchanged, and whether the check passed
+    """
+    def normalize(vectors):
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    
+    reference, candidate = normalize(reference), normalize(candidate)
+    cosine = (reference * candidate).sum(axis=1)
+    
+    # Nearest other text under each backend (retrieval-level agreement)
+    def neighbours(vectors):
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, -np.inf)
+        return similarity.argmax(axis=1)
+    
+    return {
+        'mean_cosine': float(cosine.mean()),
+        'min_cosine': float(cosine.min()),
+        'neighbour_agreement': float((neighbours(reference) == neighbours(candidate)).mean()),
+        'passed': bool(cosine.min() >= threshold)
+    }
+
+
+def measure_throughput(backend: EmbeddingBackend, texts: List[str], batch_size: int) -> Dict[str, Any]:
+    """
+    Embed all texts once (after a warm-up batch) and time it
+    
+    Args:
+        backend: Loaded embedding backend
+        texts: Texts to embed
+        batch_size: Texts per forward pass
+        
+    Returns:
+        Dictionary with the embeddings, elapsed seconds and texts per second
+    """
+    backend.encode(texts[:batch_size], batch_size=batch_size)
+    
+    start = time.perf_counter()
+    embeddings = backend.encode(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return {
+        'embeddings': np.asarray(embeddings, dtype='float32'),
+        'seconds': elapsed,
+        'texts_per_sec': len(texts) / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def benchmark_embeddings(cfr_path: str = None, n_sections: int = 1000, batch_size: int = 32,
+                         backends: List[str] = None, model_name: str = 'all-MiniLM-L6-v2') -> bool:
+    """
+    Benchmark embedding backends on CFR sections
+    
+    Args:
+        cfr_path: CFR XML file (default: sample Title 40 file)
+        n_sections: Number of sections to embed
+        batch_size: Texts per forward pass
+        backends: Backends to compare (default: all); 'torch' is always run as the reference
+        model_name: SentenceTransformer model name
+        
+    Returns:
+        True if every backend passed the parity check
+    """
+    print("="*60)
+    print("Embedding Backend Benchmark - Policy Navigator Agent")
+    print("="*60)
+    print()
+    
+    cfr_path = cfr_path or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "data", "sample", "CFR-2024-title40.xml"
+    )
+    if not os.path.exists(cfr_path):
+        print(f"✗ CFR file not found: {cfr_path}")
+        return False
+    
+    texts = load_sections(cfr_path, n_sections)
+    if not texts:
+        print(f"✗ No sections found in {cfr_path}")
+        return False
+    print(f"Embedding {len(texts)} CFR sections (batch size {batch_size})...")
+    print()
+    
+    names = ['torch'] + [name for name in (backends or EMBEDDING_BACKENDS) if name != 'torch']
+    results = {}
+    for name in names:
+        backend = make_embedding_backend(name, model_name)
+        start = time.perf_counter()
+        backend.load()
+        load_seconds = time.perf_counter() - start
+        results[name] = {'load_seconds': load_seconds, **measure_throughput(backend, texts, batch_size)}
+    
+    reference = results['torch']['embeddings']
+    passed = True
+    print(f"{'backend':<10} {'load s':>7} {'texts/s':>9} {'speedup':>8} {'mean cos':>9} {'min cos':>8} {'nn agree':>9}")
+    for name in names:
+        result = results[name]
+        speedup = result['texts_per_sec'] / results['torch']['texts_per_sec']
+        if name == 'torch':
+            parity = {'mean_cosine': 1.0, 'min_cosine': 1.0, 'neighbour_agreement': 1.0, 'passed': True}
+        else:
+            parity = check_parity(reference, result['embeddings'], PARITY_THRESHOLDS[name])
+        passed = passed and parity['passed']
+        print(f"{name:<10} {result['load_seconds']:>7.2f} {result['texts_per_sec']:>9.1f} {speedup:>7.2f}x "
+              f"{parity['mean_cosine']:>9.4f} {parity['min_cosine']:>8.4f} {parity['neighbour_agreement']:>9.3f}"
+              f"{'' if parity['passed'] else '  ✗ parity'}")
+    
+    print()
+    print("✓ All backends match the PyTorch embeddings" if passed else "✗ Parity check failed")
+    print("="*60)
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark embedding backends on CFR sections')
+    parser.add_argument('--input', type=str, default=None,
+                        help='CFR XML file (default: sample Title 40 file)')
+    parser.add_argument('--sections', type=int, default=1000, help='Number of sections to embed')
+    parser.add_argument('--batch-size', type=int, default=32, help='Texts per forward pass')
+    parser.add_argument('--backend', dest='backends', action='append', default=None,
+                        choices=list(EMBEDDING_BACKENDS),
+                        help='Backend to compare with torch (repeatable, default: all)')
+    
+    args = parser.parse_args()
+    
+    ok = benchmark_embeddings(cfr_path=args.input, n_sections=args.sections,
+                              batch_size=args.batch_size, backends=args.backends)
+    sys.exit(0 if ok else 1)
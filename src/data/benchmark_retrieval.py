@@ -0,0 +1,183 @@
+"""
+Retrieval benchmark for FAISS vector store
+Compares latency and recall of dense, lexical (BM25) and hybrid search and citation routing
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+import numpy as np
+from typing import List, Dict, Any
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data.faiss_vector_store import FAISSVectorStore
+
+
+def build_queries(vs: FAISSVectorStore, n_queries: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Build labelled queries from the stored sections
+    
+    Every sampled section yields a citation query ("40 CFR 60.1", "§ 60.1")
+    and, if its title has a subject, a topic query made of that subject.
+    The sampled section is the relevant document of both.
+    
+    Args:
+        vs: FAISS vector store
+        n_queries: Number of sections to sample
+        seed: Random seed
+        
+    Returns:
+        List of dictionaries with 'kind', 'query' and 'relevant' (row id)
+    """
+    rows = [row for row in range(len(vs.metadata)) if row not in vs.hashes.dead_rows]
+    random.Random(seed).shuffle(rows)
+    
+    queries = []
+    for row in rows:
+        if len(queries) >= n_queries * 2:
+            break
+        metadata = vs.metadata.get_metadata(row)
+        section = metadata.get('section_number')
+        title = metadata.get('title') or ''
+        if not section or section == 'N/A' or metadata.get('chunk_num', 0):
+            continue
+        
+        citation = title.split(' - ')[0] if ' CFR ' in title else f"§ {section}"
+        queries.append({'kind': 'citation', 'query': f"What does {citation} require?", 'relevant': row})
+        if ' - ' in title:
+            queries.append({'kind': 'topic', 'query': title.split(' - ', 1)[1], 'relevant': row})
+    
+    return queries
+
+
+def evaluate(vs: FAISSVectorStore, queries: List[Dict[str, Any]], k: int, mode: str,
+             route_citations: bool, label: str = None) -> List[Dict[str, Any]]:
+    """
+    Run every query once in one configuration
+    
+    Args:
+        vs: FAISS vector store
+        queries: Labelled queries from build_queries
+        k: Number of results per query
+        mode: Search mode
+        route_citations: Answer citation queries from the citation index
+        label: Name of the configuration in the results (default: the mode)
+        
+    Returns:
+        One result row per query kind with recall@k, MRR and latency percentiles
+    """
+    # Warm up (loads memory maps and the embedding model)
+    vs.search(queries[0]['query'], n_results=k, mode=mode, route_citations=route_citations)
+    
+    by_kind = {}
+    for item in queries:
+        start = time.perf_counter()
+        results = vs.search(item['query'], n_results=k, mode=mode, route_citations=route_citations)
+        latency = (time.perf_counter() - start) * 1000
+        
+        ids = [result['id'] for result in results]
+        rank = ids.index(item['relevant']) + 1 if item['relevant'] in ids else None
+        stats = by_kind.setdefault(item['kind'], {'hits': 0, 'rr': 0.0, 'latencies': []})
+        stats['hits'] += rank is not None
+        stats['rr'] += 1.0 / rank if rank else 0.0
+        stats['latencies'].append(latency)
+    
+    rows = []
+    for kind, stats in sorted(by_kind.items()):
+        n = len(stats['latencies'])
+        rows.append({
+            'mode': label or mode,
+            'kind': kind,
+            'queries': n,
+            'recall': stats['hits'] / n,
+            'mrr': stats['rr'] / n,
+            'p50_ms': float(np.percentile(stats['latencies'], 50)),
+            'p95_ms': float(np.percentile(stats['latencies'], 95))
+        })
+    return rows
+
+
+def run_benchmark(vs: FAISSVectorStore, queries: List[Dict[str, Any]], k: int,
+                  modes: List[str], routing: bool = True) -> List[Dict[str, Any]]:
+    """
+    Run every query in every mode, and the citation queries through citation routing
+    
+    The modes are measured with citation routing off, so their citation
+    rows show what the retriever itself finds. Routing is reported as its
+    own 'routed' row.
+    
+    Args:
+        vs: FAISS vector store
+        queries: Labelled queries from build_queries
+        k: Number of results per query
+        modes: Search modes to compare
+        routing: Also measure citation routing on the citation queries
+        
+    Returns:
+        One result row per (mode, query kind) with recall@k, MRR and latency percentiles
+    """
+    rows = []
+    for mode in modes:
+        rows.extend(evaluate(vs, queries, k, mode, route_citations=False))
+    
+    citation_queries = [item for item in queries if item['kind'] == 'citation']
+    if routing and citation_queries:
+        rows.extend(evaluate(vs, citation_queries, k, 'dense', route_citations=True, label='routed'))
+    return rows
+
+
+def benchmark_retrieval(vector_store_path: str = "./faiss_db", n_queries: int = 200, k: int = 5,
+                        modes: List[str] = None, seed: int = 0, routing: bool = True):
+    """
+    Benchmark dense, lexical and hybrid retrieval on a FAISS database
+    
+    Args:
+        vector_store_path: Path to FAISS database
+        n_queries: Number of sections to build queries from
+        k: Number of results per query (recall@k)
+        modes: Search modes to compare (default: all)
+        seed: Random seed for sampling sections
+        routing: Also measure citation routing on the citation queries
+    """
+    print("="*60)
+    print("Retrieval Benchmark - Policy Navigator Agent")
+    print("="*60)
+    print()
+    
+    vs = FAISSVectorStore(persist_directory=vector_store_path)
+    queries = build_queries(vs, n_queries, seed=seed)
+    if not queries:
+        print("✗ No sections with section numbers found; ingest CFR data first.")
+        return
+    
+    print(f"Running {len(queries)} queries against {vs.count()} documents...")
+    results = run_benchmark(vs, queries, k, modes or list(FAISSVectorStore.SEARCH_MODES), routing=routing)
+    
+    print()
+    print(f"{'mode':<9} {'queries':<9} {'n':>5} {f'recall@{k}':>10} {'MRR':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for row in results:
+        print(f"{row['mode']:<9} {row['kind']:<9} {row['queries']:>5} {row['recall']:>10.3f} "
+              f"{row['mrr']:>7.3f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark dense, lexical and hybrid retrieval and citation routing')
+    parser.add_argument('--path', type=str, default='./faiss_db', help='Path to FAISS database')
+    parser.add_argument('--queries', type=int, default=200, help='Number of sections to build queries from')
+    parser.add_argument('--k', type=int, default=5, help='Number of results per query')
+    parser.add_argument('--mode', dest='modes', action='append', default=None,
+                        choices=list(FAISSVectorStore.SEARCH_MODES),
+                        help='Search mode to benchmark (repeatable, default: all)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for sampling sections')
+    parser.add_argument('--no-routing', action='store_true',
+                        help='Do not measure citation routing separately')
+    
+    args = parser.parse_args()
+    
+    benchmark_retrieval(vector_store_path=args.path, n_queries=args.queries, k=args.k,
+                        modes=args.modes, seed=args.seed, routing=not args.no_routing)
@@ -0,0 +1,342 @@
+"""
+BM25 Index for Policy Navigator Agent
+On-disk inverted index for lexical (keyword and citation) search next to FAISSVectorStore
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+import numpy as np
+from typing import List, Dict, Optional, Tuple
+
+
+# Words, numbers and dotted/hyphenated identifiers such as "60.1", "52.21" or "2024-01234"
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+STOPWORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it',
+    'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what', 'which', 'with'
+])
+
+# Checkpoint header: number of terms, number of postings, number of rows folded in
+HEADER = np.dtype([('terms', '<i8'), ('postings', '<i8'), ('rows', '<i8')])
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase index terms
+    
+    Citations keep their section numbers intact, so "40 CFR 60.1" becomes
+    ['40', 'cfr', '60.1'] and "§ 52.21" becomes ['52.21'].
+    
+    Args:
+        text: Text to tokenize
+        
+    Returns:
+        List of terms
+    """
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Append-only BM25 inverted index, one document per row of the MetadataStore
+    
+    Layout:
+        terms.vocab     one JSON-encoded term per line (term id = line number)
+        doclen.u32      token count of every row
+        postings.log    (term id, row, term frequency) int32 triples appended
+                        since the last checkpoint
+        postings.bin    checkpoint: header, int64 offsets per term, int32 rows
+                        grouped by term and uint16 term frequencies
+    
+    New rows go to the log; compact() merges the log into the memory-mapped
+    checkpoint, mirroring the FAISS index and its vector log. Postings of a
+    row are only ever written once, so log entries for rows already in the
+    checkpoint are ignored when loading.
+    """
+    
+    def __init__(self, directory: str, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize BM25 index
+        
+        Args:
+            directory: Directory holding the index files
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.directory = directory
+        self.k1 = k1
+        self.b = b
+        os.makedirs(directory, exist_ok=True)
+        
+        self.vocab_path = os.path.join(directory, "terms.vocab")
+        self.doclen_path = os.path.join(directory, "doclen.u32")
+        self.log_path = os.path.join(directory, "postings.log")
+        self.checkpoint_path = os.path.join(directory, "postings.bin")
+        
+        self._load()
+    
+    def __len__(self) -> int:
+        return self._rows
+    
+    def _load(self):
+        """Load the vocabulary, document lengths, checkpoint and log tail"""
+        self._doclen_map = None
+        self.terms = []
+        self.term_ids = {}
+        if os.path.exists(self.vocab_path):
+            valid_bytes = 0
+            with open(self.vocab_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    term = json.loads(line.decode('utf-8'))
+                    self.term_ids[term] = len(self.terms)
+                    self.terms.append(term)
+                    valid_bytes += len(line)
+            self._truncate_file(self.vocab_path, valid_bytes)
+        
+        self._rows = 0
+        self._total_length = 0
+        if os.path.exists(self.doclen_path):
+            self._rows = os.path.getsize(self.doclen_path) // 4
+            self._truncate_file(self.doclen_path, self._rows * 4)
+            self._total_length = int(self._doclen().sum(dtype=np.int64))
+        
+        self._load_checkpoint()
+        
+        # Postings appended after the checkpoint
+        self._tail = {}
+        if os.path.exists(self.log_path):
+            triples = np.fromfile(self.log_path, dtype=np.int32)
+            triples = triples[:len(triples) // 3 * 3].reshape(-1, 3)
+            self._truncate_file(self.log_path, triples.nbytes)
+            triples = triples[(triples[:, 1] >= self.checkpoint_rows) & (triples[:, 1] < self._rows)]
+            self._add_to_tail(triples)
+    
+    def _load_checkpoint(self):
+        """Memory-map the checkpoint"""
+        self.checkpoint_terms = 0
+        self.checkpoint_rows = 0
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._posting_rows = np.zeros(0, dtype=np.int32)
+        self._posting_tfs = np.zeros(0, dtype=np.uint16)
+        
+        if not os.path.exists(self.checkpoint_path):
+            return
+        
+        header = np.fromfile(self.checkpoint_path, dtype=HEADER, count=1)[0]
+        terms, postings = int(header['terms']), int(header['postings'])
+        offset = HEADER.itemsize
+        self._offsets = np.memmap(self.checkpoint_path, dtype=np.int64, mode='r',
+                                  offset=offset, shape=(terms + 1,))
+        offset += (terms + 1) * 8
+        if postings > 0:
+            self._posting_rows = np.memmap(self.checkpoint_path, dtype=np.int32, mode='r',
+                                           offset=offset, shape=(postings,))
+            self._posting_tfs = np.memmap(self.checkpoint_path, dtype=np.uint16, mode='r',
+                                          offset=offset + postings * 4, shape=(postings,))
+        self.checkpoint_terms = terms
+        self.checkpoint_rows = int(header['rows'])
+    
+    @staticmethod
+    def _truncate_file(path: str, size: int):
+        """Drop bytes left behind by an interrupted append"""
+        if os.path.getsize(path) > size:
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+    
+    def _doclen(self) -> np.ndarray:
+        """Memory-mapped document lengths"""
+        if self._rows == 0:
+            return np.zeros(0, dtype=np.uint32)
+        if self._doclen_map is None or len(self._doclen_map) != self._rows:
+            self._doclen_map = np.memmap(self.doclen_path, dtype=np.uint32, mode='r', shape=(self._rows,))
+        return self._doclen_map
+    
+    def _add_to_tail(self, triples: np.ndarray):
+        """Group (term, row, tf) triples by term into the in-memory tail"""
+        if len(triples) == 0:
+            return
+        triples = triples[np.argsort(triples[:, 0], kind='stable')]
+        term_ids, starts = np.unique(triples[:, 0], return_index=True)
+        ends = np.append(starts[1:], len(triples))
+        for term_id, start, end in zip(term_ids, starts, ends):
+            self._tail.setdefault(int(term_id), []).append(triples[start:end, 1:].copy())
+    
+    def append(self, first_row: int, texts: List[str]):
+        """
+        Index the texts of newly stored rows
+        
+        Args:
+            first_row: Row id of the first text (must equal len(self))
+            texts: Text of every new row, in row order
+        """
+        if first_row != self._rows:
+            raise ValueError(f"Expected rows starting at {self._rows}, got {first_row}")
+        
+        new_terms = []
+        triples = []
+        lengths = []
+        for offset, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                term_id = self.term_ids.get(term)
+                if term_id is None:
+                    term_id = len(self.terms)
+                    self.term_ids[term] = term_id
+                    self.terms.append(term)
+                    new_terms.append(term)
+                triples.append((term_id, first_row + offset, min(tf, 65535)))
+        
+        triples = np.array(triples, dtype=np.int32).reshape(-1, 3)
+        
+        # Vocabulary and postings first, lengths last: rows past the end of
+        # doclen.u32 are ignored when loading
+        if new_terms:
+            with open(self.vocab_path, 'a', encoding='utf-8') as f:
+                f.write("".join(json.dumps(term, ensure_ascii=False) + "\n" for term in new_terms))
+        with open(self.log_path, 'ab') as f:
+            f.write(triples.tobytes())
+        with open(self.doclen_path, 'ab') as f:
+            f.write(np.array(lengths, dtype=np.uint32).tobytes())
+        
+        self._add_to_tail(triples)
+        self._rows += len(texts)
+        self._total_length += sum(lengths)
+    
+    def _postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows and term frequencies of a term (checkpoint and tail)"""
+        rows, tfs = [], []
+        if term_id < self.checkpoint_terms:
+            start, end = int(self._offsets[term_id]), int(self._offsets[term_id + 1])
+            rows.append(np.asarray(self._posting_rows[start:end], dtype=np.int64))
+            tfs.append(np.asarray(self._posting_tfs[start:end], dtype=np.float32))
+        for block in self._tail.get(term_id, []):
+            rows.append(block[:, 0].astype(np.int64))
+            tfs.append(block[:, 1].astype(np.float32))
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        return np.concatenate(rows), np.concatenate(tfs)
+    
+    def search(self, query: str, k: int = 10, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rank rows by BM25 score
+        
+        Only the postings of the query terms are read, so the cost grows with
+        the number of documents containing them, not with the corpus size.
+        
+        Args:
+            query: Query text
+            k: Number of rows to return
+            mask: Optional boolean array of searchable rows
+            
+        Returns:
+            Tuple of (row ids, scores), best first
+        """
+        if self._rows == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        
+        doclen = self._doclen()
+        avg_length = max(self._total_length / self._rows, 1.0)
+        
+        all_rows, all_scores = [], []
+        for term in set(tokenize(query)):
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                continue
+            rows, tfs = self._postings(term_id)
+            idf = math.log(1 + (self._rows - len(rows) + 0.5) / (len(rows) + 0.5))
+            if mask is not None:
+                keep = mask[rows]
+                rows, tfs = rows[keep], tfs[keep]
+            norm = self.k1 * (1 - self.b + self.b * doclen[rows] / avg_length)
+            all_rows.append(rows)
+            all_scores.append(idf * tfs * (self.k1 + 1) / (tfs + norm))
+        
+        if not all_rows or not sum(len(rows) for rows in all_rows):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        
+        rows, inverse = np.unique(np.concatenate(all_rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(all_scores)).astype(np.float32)
+        
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind='stable')
+        return rows[order], scores[order]
+    
+    def compact(self):
+        """Merge the log into the checkpoint (no-op if the log is empty)"""
+        if not self._tail and self.checkpoint_rows == self._rows:
+            return
+        
+        # Term ids of the checkpoint postings, followed by the tail
+        checkpoint_terms = np.repeat(np.arange(self.checkpoint_terms, dtype=np.int64),
+                                     np.diff(np.asarray(self._offsets)))
+        term_parts = [checkpoint_terms]
+        row_parts = [np.asarray(self._posting_rows, dtype=np.int32)]
+        tf_parts = [np.asarray(self._posting_tfs, dtype=np.uint16)]
+        for term_id, blocks in self._tail.items():
+            for block in blocks:
+                term_parts.append(np.full(len(block), term_id, dtype=np.int64))
+                row_parts.append(block[:, 0].astype(np.int32))
+                tf_parts.append(block[:, 1].astype(np.uint16))
+        
+        term_column = np.concatenate(term_parts)
+        row_column = np.concatenate(row_parts)
+        order = np.lexsort((row_column, term_column))
+        offsets = np.zeros(len(self.terms) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(term_column, minlength=len(self.terms)))
+        
+        header = np.array([(len(self.terms), len(order), self._rows)], dtype=HEADER)
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(header.tobytes())
+            f.write(offsets.tobytes())
+            f.write(row_column[order].tobytes())
+            f.write(np.concatenate(tf_parts)[order].tobytes())
+        
+        # Release the old memory maps before replacing the file
+        self._offsets = self._posting_rows = self._posting_tfs = None
+        os.replace(temp_path, self.checkpoint_path)
+        open(self.log_path, 'wb').close()
+        
+        self._tail = {}
+        self._load_checkpoint()
+    
+    def truncate(self, rows: int):
+        """Drop every row from rows onwards (recovery after an interrupted add)"""
+        if rows >= self._rows:
+            return
+        if rows < self.checkpoint_rows:
+            self.clear()
+            return
+        
+        self._truncate_file(self.doclen_path, rows * 4)
+        if os.path.exists(self.log_path):
+            triples = np.fromfile(self.log_path, dtype=np.int32).reshape(-1, 3)
+            triples[triples[:, 1] < rows].tofile(self.log_path)
+        self._load()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get index statistics"""
+        return {
+            'rows': self._rows,
+            'terms': len(self.terms),
+            'checkpoint_postings': len(self._posting_rows),
+            'pending_postings': sum(len(block) for blocks in self._tail.values() for block in blocks)
+        }
+    
+    def clear(self):
+        """Remove all entries"""
+        self._offsets = self._posting_rows = self._posting_tfs = None
+        self._doclen_map = None
+        for path in (self.vocab_path, self.doclen_path, self.log_path, self.checkpoint_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._load()
@@ -0,0 +1,121 @@
+"""
+Citation Index for Policy Navigator Agent
+Exact lookup of CFR section citations ("40 CFR 60.1", "§ 52.21") to stored chunks
+"""
+
+import re
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+
+
+# "40 CFR 60.1", "40 C.F.R. § 60.1", "40 CFR section 60.1", "§ 52.21", "§§ 52.21", "section 63.7"
+CITATION_PATTERN = re.compile(
+    r"(?:\b(?P<title>\d{1,2})\s*C\.?\s*F\.?\s*R\.?\s*(?:§+|sec(?:tion)?\.?)?\s*"
+    r"|§+\s*"
+    r"|\bsec(?:tion)?\.?\s+)"
+    r"(?P<section>\d{1,4}\.\d{1,5}[a-z]?(?:-\d+)?)",
+    re.IGNORECASE
+)
+
+
+def normalize_section(section: str) -> str:
+    """Normalize a section number the way DocumentProcessor stores it ("§ 60.1" -> "60.1")"""
+    return re.sub(r'[§\s]', '', str(section)).lower()
+
+
+def extract_citations(text: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Find CFR section citations in text
+    
+    Args:
+        text: Query or document text
+        
+    Returns:
+        List of (CFR title or None, normalized section number), in order of appearance
+    """
+    citations = []
+    for match in CITATION_PATTERN.finditer(text):
+        citation = (match.group('title'), normalize_section(match.group('section')))
+        if citation not in citations:
+            citations.append(citation)
+    return citations
+
+
+def cfr_title_of(metadata: Dict[str, Any]) -> Optional[str]:
+    """CFR title number of a stored section ("40 CFR 60.1 - ..." or "CFR Title 40"), if known"""
+    match = re.match(r'\s*(\d+)\s*CFR\b', str(metadata.get('title') or ''))
+    if not match:
+        match = re.search(r'CFR Title (\d+)', str(metadata.get('source') or ''))
+    return match.group(1) if match else None
+
+
+class CitationIndex:
+    """
+    In-memory dictionary from section number to the row ids of its chunks
+    
+    Built from the dictionary-encoded section_number column of the
+    MetadataStore when the store is loaded (one vectorized pass over the
+    column, no file of its own) and extended as rows are appended.
+    """
+    
+    def __init__(self):
+        """Initialize an empty citation index"""
+        self._rows = {}
+        self._count = 0
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def build(self, codes: np.ndarray, vocab: List[str]):
+        """
+        Index a dictionary-encoded section_number column
+        
+        Args:
+            codes: Code of every row (-1 for rows without a section number)
+            vocab: Section number of every code
+        """
+        self._rows = {}
+        self._count = 0
+        self.extend(0, codes, vocab)
+    
+    def extend(self, first_row: int, codes: np.ndarray, vocab: List[str]):
+        """
+        Index newly appended rows
+        
+        Args:
+            first_row: Row id of the first code
+            codes: Codes of the new rows
+            vocab: Section number of every code
+        """
+        codes = np.asarray(codes)
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        values, starts = np.unique(sorted_codes, return_index=True)
+        ends = np.append(starts[1:], len(sorted_codes))
+        
+        for code, start, end in zip(values, starts, ends):
+            if code < 0:
+                continue
+            key = normalize_section(vocab[code])
+            rows = (order[start:end] + first_row).astype(np.int64)
+            if key in self._rows:
+                rows = np.concatenate([self._rows[key], rows])
+            self._rows[key] = rows
+        
+        self._count = first_row + len(codes)
+    
+    def lookup(self, section: str) -> np.ndarray:
+        """
+        Row ids of the chunks of a section, in storage order
+        
+        Args:
+            section: Section number, e.g. "60.1" or "§ 60.1"
+            
+        Returns:
+            int64 array of row ids (empty if the section is not stored)
+        """
+        return self._rows.get(normalize_section(section), np.zeros(0, dtype=np.int64))
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get index statistics"""
+        return {'sections': len(self._rows), 'rows': self._count}
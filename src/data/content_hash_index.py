@@ -0,0 +1,523 @@
+"""
+Content Hash Index for Policy Navigator Agent
+Identity and content hashes of stored chunks, used to make re-ingests idempotent
+"""
+
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data.citation_index import cfr_title_of
+
+
+class ContentHashIndex:
+    """
+    Columnar, append-only index of (identity key, record hash, content hash) per row
+    
+    Row i of the index describes row i of the MetadataStore:
+    - the identity key names the chunk (source, CFR title, section and
+      chunk number), so a re-ingested chunk is recognised even if its text
+      changed;
+    - the record hash covers text and metadata, so an unchanged chunk is
+      skipped entirely;
+    - the content hash covers the text only, so a chunk whose metadata
+      changed can reuse its stored embedding instead of being re-embedded.
+    
+    When a key is stored again, its previous row becomes a tombstone: it
+    stays in the vector and metadata files but is excluded from search.
+    
+    Layout:
+        key.hashes / record.hashes / content.hashes
+                                    uint64 digests, one per row (append-only)
+        dead.rows                   int64 (row, cause) pairs of tombstoned rows;
+                                    cause is the row that replaced it, -1 if deleted
+        key.sorted / key.sorted_rows, content.sorted / content.sorted_rows
+                                    checkpoint: digests of the first rows sorted
+                                    for binary search, and their row ids
+        index.json                  key version and number of checkpointed rows
+    
+    Digest files are memory-mapped. Only rows appended after the checkpoint
+    are held in dictionaries, so opening a large store costs one pass over
+    that tail, not over every row.
+    """
+    
+    # Version of the identity key scheme; stores with an older version are re-keyed
+    KEY_VERSION = 2
+    
+    # Section numbers that stand for "no section number" (SECTNO-less CFR
+    # sections, uploads without sections)
+    PLACEHOLDER_SECTIONS = ('unknown', 'n/a')
+    
+    # Rows appended since the last checkpoint above which opening the index writes one
+    CHECKPOINT_ROWS = 50000
+    
+    COLUMNS = ('key', 'record', 'content')
+    
+    def __init__(self, directory: str, legacy_path: Optional[str] = None):
+        """
+        Initialize content hash index
+        
+        Args:
+            directory: Directory holding the index files
+            legacy_path: Text log written by older versions ("key record content"
+                         and "- key" lines); converted on first open
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        
+        self.dead_path = os.path.join(directory, "dead.rows")
+        self.info_path = os.path.join(directory, "index.json")
+        
+        if legacy_path and os.path.exists(legacy_path):
+            self._convert_legacy_log(legacy_path)
+        
+        self._load()
+    
+    def _column_path(self, column: str) -> str:
+        """Digest file path of a column"""
+        return os.path.join(self.directory, f"{column}.hashes")
+    
+    def _sorted_paths(self, column: str) -> Tuple[str, str]:
+        """(sorted digests, their row ids) file paths of a checkpointed column"""
+        return (
+            os.path.join(self.directory, f"{column}.sorted"),
+            os.path.join(self.directory, f"{column}.sorted_rows")
+        )
+    
+    @staticmethod
+    def _truncate(path: str, size: int):
+        """Truncate a file to size bytes if it is longer"""
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+    
+    @staticmethod
+    def _file_rows(path: str, dtype) -> int:
+        """Number of complete fixed-width rows in a file"""
+        if not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // np.dtype(dtype).itemsize
+    
+    @staticmethod
+    def _write_file(path: str, data: bytes, mode: str = 'ab'):
+        """Write bytes to a file and flush them to disk"""
+        with open(path, mode) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def _map(self, path: str, dtype) -> np.ndarray:
+        """Memory-map a file (cached until the file changes)"""
+        if path not in self._maps:
+            if os.path.exists(path) and os.path.getsize(path) > 0:
+                self._maps[path] = np.memmap(path, dtype=dtype, mode='r')
+            else:
+                self._maps[path] = np.zeros(0, dtype=dtype)
+        return self._maps[path]
+    
+    def _column(self, column: str) -> np.ndarray:
+        """uint64 digests of a column, one per row"""
+        return self._map(self._column_path(column), np.uint64)[:self._count]
+    
+    def _read_info(self) -> Dict[str, Any]:
+        """Key version and checkpoint size (empty for a new index)"""
+        if os.path.exists(self.info_path):
+            with open(self.info_path, 'r') as f:
+                return json.load(f)
+        return {}
+    
+    def _write_info(self):
+        """Atomically replace index.json"""
+        tmp_path = self.info_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'key_version': self.key_version, 'sorted_rows': self._sorted_rows}, f)
+        os.replace(tmp_path, self.info_path)
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    @staticmethod
+    def _hash(text: str) -> str:
+        """Short stable hash of a string"""
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+    
+    @staticmethod
+    def _digest(hash_value: str) -> np.uint64:
+        """Stored form of a hash"""
+        return np.uint64(int(hash_value, 16))
+    
+    @classmethod
+    def fingerprint(cls, document: Dict[str, Any]) -> Tuple[str, str, str]:
+        """
+        Hashes identifying a document
+        
+        Documents with a section number are identified by source, CFR title,
+        section and chunk number, so the same section number in two CFR
+        titles names two chunks. Documents without one (or with a placeholder
+        such as "Unknown") are identified by source and content.
+        
+        Args:
+            document: Document dictionary with 'content' and 'metadata'
+            
+        Returns:
+            Tuple of (identity key, record hash, content hash)
+        """
+        content = document.get('content', '')
+        metadata = document.get('metadata') or {}
+        
+        content_hash = cls._hash(content)
+        record_hash = cls._hash(content + "\x00" + json.dumps(metadata, sort_keys=True, default=str))
+        
+        source = str(metadata.get('source', ''))
+        section = str(metadata.get('section_number') or '').strip()
+        if section and section.lower() not in cls.PLACEHOLDER_SECTIONS:
+            key = cls._hash("\x00".join([
+                source, cfr_title_of(metadata) or '', section, str(metadata.get('chunk_num', ''))
+            ]))
+        else:
+            key = cls._hash("\x00".join([source, content_hash]))
+        
+        return key, record_hash, content_hash
+    
+    def _load(self):
+        """Open the index files, dropping partial appends and restoring missing tombstones"""
+        self._maps = {}
+        self._count = min(self._file_rows(self._column_path(column), np.uint64) for column in self.COLUMNS)
+        for column in self.COLUMNS:
+            self._truncate(self._column_path(column), self._count * 8)
+        
+        # Tombstones of rows (or by replacing rows) that were never fully written are dropped
+        dead = np.fromfile(self.dead_path, dtype=np.int64) if os.path.exists(self.dead_path) else np.zeros(0, np.int64)
+        dead = dead[:len(dead) // 2 * 2].reshape(-1, 2)
+        valid = (dead[:, 0] < self._count) & (dead[:, 1] < self._count)
+        if not valid.all() or os.path.exists(self.dead_path) and os.path.getsize(self.dead_path) != dead.nbytes:
+            dead = dead[valid]
+            self._write_file(self.dead_path, dead.tobytes(), 'wb')
+        self.dead_rows = set(dead[:, 0].tolist())
+        
+        info = self._read_info()
+        self.key_version = info.get('key_version', self.KEY_VERSION if self._count == 0 else 0)
+        self._sorted_rows = info.get('sorted_rows', 0)
+        if self._sorted_rows > self._count or any(
+            self._file_rows(path, np.uint64) != self._sorted_rows
+            for column in ('key', 'content') for path in self._sorted_paths(column)
+        ):
+            self._sorted_rows = 0
+        if not info and self._count == 0:
+            # New index: record the key version its rows will be written with
+            self._write_info()
+        
+        # Rows appended after the checkpoint are looked up in dictionaries
+        self.key_rows = {}
+        self.content_rows = {}
+        keys = self._column('key')
+        contents = self._column('content')
+        tombstones = []
+        for row in range(self._sorted_rows, self._count):
+            key = int(keys[row])
+            # A crash between writing a row and its predecessor's tombstone leaves two live rows
+            previous = self._live_row(key)
+            if previous is not None:
+                tombstones.append((previous, row))
+                self.dead_rows.add(previous)
+            self.key_rows[key] = row
+            self.content_rows[int(contents[row])] = row
+        if tombstones:
+            self._write_file(self.dead_path, np.array(tombstones, dtype=np.int64).tobytes())
+        
+        if self._count - self._sorted_rows > self.CHECKPOINT_ROWS and self.key_version == self.KEY_VERSION:
+            self.checkpoint()
+    
+    def _sorted_rows_of(self, column: str, digest: int) -> np.ndarray:
+        """Checkpointed rows holding a digest, in row order"""
+        if not self._sorted_rows:
+            return np.zeros(0, dtype=np.int64)
+        sorted_path, rows_path = self._sorted_paths(column)
+        digests = self._map(sorted_path, np.uint64)
+        value = np.uint64(digest)
+        start = int(np.searchsorted(digests, value, side='left'))
+        end = int(np.searchsorted(digests, value, side='right'))
+        return self._map(rows_path, np.int64)[start:end]
+    
+    def _latest_row(self, key: int) -> Optional[int]:
+        """Most recent row stored under a key (live or deleted)"""
+        row = self.key_rows.get(key)
+        if row is None:
+            rows = self._sorted_rows_of('key', key)
+            row = int(rows[-1]) if len(rows) else None
+        return row
+    
+    def _live_row(self, key: int) -> Optional[int]:
+        """Live row of a key, if any (earlier rows of a key are always tombstones)"""
+        row = self._latest_row(key)
+        return None if row is None or row in self.dead_rows else row
+    
+    def append(self, fingerprints: List[Tuple[str, str, str]]) -> int:
+        """
+        Record the fingerprints of newly stored rows
+        
+        The previous row of each key becomes a tombstone.
+        
+        Args:
+            fingerprints: (key, record hash, content hash) per row, in row order
+            
+        Returns:
+            Row id of the first recorded row
+        """
+        first_row = self._count
+        if not fingerprints:
+            return first_row
+        
+        digests = np.array(
+            [[int(value, 16) for value in fingerprint] for fingerprint in fingerprints], dtype=np.uint64
+        )
+        for i, column in enumerate(self.COLUMNS):
+            self._write_file(self._column_path(column), np.ascontiguousarray(digests[:, i]).tobytes())
+        
+        tombstones = []
+        for row, (key, _, content) in enumerate(digests.tolist(), start=first_row):
+            previous = self._live_row(key)
+            if previous is not None:
+                tombstones.append((previous, row))
+                self.dead_rows.add(previous)
+            self.key_rows[key] = row
+            self.content_rows[content] = row
+        if tombstones:
+            self._write_file(self.dead_path, np.array(tombstones, dtype=np.int64).tobytes())
+        
+        self._count += len(fingerprints)
+        self._maps = {}
+        return first_row
+    
+    def delete_rows(self, rows: List[int]) -> int:
+        """
+        Turn live rows into tombstones
+        
+        Args:
+            rows: Row ids to delete
+            
+        Returns:
+            Number of rows deleted (rows already deleted are ignored)
+        """
+        rows = [
+            row for row in dict.fromkeys(int(row) for row in rows)
+            if 0 <= row < self._count and row not in self.dead_rows
+        ]
+        if not rows:
+            return 0
+        
+        self._write_file(self.dead_path, np.array([(row, -1) for row in rows], dtype=np.int64).tobytes())
+        self.dead_rows.update(rows)
+        return len(rows)
+    
+    def key_of(self, row: int) -> str:
+        """Identity key of a row"""
+        return f"{int(self._column('key')[row]):016x}"
+    
+    def is_unchanged(self, key: str, record_hash: str) -> bool:
+        """Whether a document with this key and record hash is already stored"""
+        row = self._live_row(int(key, 16))
+        return row is not None and bool(self._column('record')[row] == self._digest(record_hash))
+    
+    def find_content(self, content_hash: str) -> Optional[int]:
+        """Live row holding the given content, if any"""
+        content = int(content_hash, 16)
+        row = self.content_rows.get(content)
+        if row is not None and row not in self.dead_rows:
+            return row
+        for row in self._sorted_rows_of('content', content)[::-1]:
+            if int(row) not in self.dead_rows:
+                return int(row)
+        return None
+    
+    def checkpoint(self):
+        """Sort the digests of all rows for binary search and empty the in-memory tail"""
+        if self._sorted_rows == self._count:
+            return
+        for column in ('key', 'content'):
+            digests = np.asarray(self._column(column))
+            order = np.argsort(digests, kind='stable')
+            sorted_path, rows_path = self._sorted_paths(column)
+            for path, data in ((sorted_path, digests[order]), (rows_path, order.astype(np.int64))):
+                self._write_file(path + ".tmp", data.tobytes(), 'wb')
+                os.replace(path + ".tmp", path)
+        
+        self._sorted_rows = self._count
+        self._write_info()
+        self.key_rows = {}
+        self.content_rows = {}
+        self._maps = {}
+    
+    def _dead_pairs(self) -> np.ndarray:
+        """(row, cause) pairs of the tombstone file"""
+        if not os.path.exists(self.dead_path):
+            return np.zeros((0, 2), dtype=np.int64)
+        return np.fromfile(self.dead_path, dtype=np.int64).reshape(-1, 2)
+    
+    def truncate(self, rows: int):
+        """
+        Drop rows from the end, keeping the tombstones of the remaining rows
+        
+        Rows replaced by a dropped row become live again; deletions are kept.
+        
+        Args:
+            rows: Number of rows to keep
+        """
+        rows = min(rows, self._count)
+        for column in self.COLUMNS:
+            self._truncate(self._column_path(column), rows * 8)
+        
+        dead = self._dead_pairs()
+        self._write_file(self.dead_path, dead[(dead[:, 0] < rows) & (dead[:, 1] < rows)].tobytes(), 'wb')
+        
+        if self._sorted_rows > rows:
+            self._sorted_rows = 0
+            for column in ('key', 'content'):
+                for path in self._sorted_paths(column):
+                    if os.path.exists(path):
+                        os.remove(path)
+        if rows == 0:
+            self.key_version = self.KEY_VERSION
+        self._write_info()
+        self._load()
+    
+    def rekey(self, fingerprints: List[Tuple[str, str, str]]):
+        """
+        Replace the hashes of all rows (after a change of the key scheme)
+        
+        Deletions are kept. A replacement tombstone is kept only if the row
+        and its replacement still share a key; rows that now share a key are
+        resolved in favour of the newest.
+        
+        Args:
+            fingerprints: (key, record hash, content hash) of every row, in row order
+        """
+        digests = np.array(
+            [[int(value, 16) for value in fingerprint] for fingerprint in fingerprints], dtype=np.uint64
+        ).reshape(-1, 3)
+        if len(digests) != self._count:
+            raise ValueError(f"Expected fingerprints of {self._count} rows, got {len(digests)}")
+        
+        dead = self._dead_pairs()
+        keys = digests[:, 0]
+        deleted = dead[:, 1] < 0
+        still_replaced = ~deleted
+        still_replaced[~deleted] = keys[dead[~deleted, 0]] == keys[dead[~deleted, 1]]
+        
+        for i, column in enumerate(self.COLUMNS):
+            self._write_file(self._column_path(column), np.ascontiguousarray(digests[:, i]).tobytes(), 'wb')
+        self._write_file(self.dead_path, dead[deleted | still_replaced].tobytes(), 'wb')
+        
+        self._sorted_rows = 0
+        self.key_version = self.KEY_VERSION
+        self._write_info()
+        self._load()
+        self.checkpoint()
+    
+    @property
+    def needs_rekey(self) -> bool:
+        """Whether the stored keys were computed by an older key scheme"""
+        return self.key_version != self.KEY_VERSION
+    
+    def _convert_legacy_log(self, legacy_path: str):
+        """Convert the text log of older versions (keys are re-computed afterwards)"""
+        keys, records, contents, dead = [], [], [], []
+        live = {}
+        with open(legacy_path, 'rb') as f:
+            for line in f:
+                parts = line.decode('utf-8', errors='replace').split()
+                if not line.endswith(b'\n'):
+                    break
+                if len(parts) == 2 and parts[0] == '-':
+                    if parts[1] in live:
+                        dead.append((live.pop(parts[1]), -1))
+                elif len(parts) == 3:
+                    row = len(keys)
+                    if parts[0] in live:
+                        dead.append((live[parts[0]], row))
+                    live[parts[0]] = row
+                    keys.append(parts[0])
+                    records.append(parts[1])
+                    contents.append(parts[2])
+                else:
+                    break
+        
+        for column, values in zip(self.COLUMNS, (keys, records, contents)):
+            digests = np.array([int(value, 16) for value in values], dtype=np.uint64)
+            self._write_file(self._column_path(column), digests.tobytes(), 'wb')
+        self._write_file(self.dead_path, np.array(dead, dtype=np.int64).reshape(-1, 2).tobytes(), 'wb')
+        
+        self.key_version = 0
+        self._sorted_rows = 0
+        self._write_info()
+        os.remove(legacy_path)
+        print(f"Converted content hash log of {len(keys)} documents")
+
+
+def test_content_hash_index():
+    """Test identity keys and tombstones of CFR sections from two titles"""
+    import tempfile
+    from src.data.ingest_pipeline import to_index_document
+    
+    print("=== Testing Content Hash Index ===\n")
+    
+    def section(title, number, content, subject=""):
+        # Ingested with the same source label, as older ingests did for every title
+        return to_index_document(
+            {'title': title, 'section': number, 'section_title': subject, 'content': content},
+            source='CFR Title 40'
+        )
+    
+    title7 = section('7', '1.1', 'Definitions for the Department of Agriculture.', 'Definitions')
+    title40 = section('40', '1.1', 'Definitions for the Environmental Protection Agency.', 'Definitions')
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        # 1. Same section number in one batch: both are new
+        index = ContentHashIndex(os.path.join(tmp, 'batch'))
+        fingerprints = [ContentHashIndex.fingerprint(doc) for doc in (title7, title40)]
+        assert fingerprints[0][0] != fingerprints[1][0]
+        assert not any(index.is_unchanged(key, record) for key, record, _ in fingerprints)
+        index.append(fingerprints)
+        assert len(index) == 2 and not index.dead_rows
+        print("1. 7 CFR 1.1 and 40 CFR 1.1 have different identity keys ✓")
+        
+        # 2. Across batches: the second title does not tombstone the first
+        index = ContentHashIndex(os.path.join(tmp, 'batches'))
+        index.append([ContentHashIndex.fingerprint(title7)])
+        index.append([ContentHashIndex.fingerprint(title40)])
+        assert not index.dead_rows
+        assert index.is_unchanged(*ContentHashIndex.fingerprint(title7)[:2])
+        print("2. Ingesting 40 CFR 1.1 after 7 CFR 1.1 keeps both live ✓")
+        
+        # 3. A changed section still replaces its previous version
+        index.append([ContentHashIndex.fingerprint(section('7', '1.1', 'Amended definitions.', 'Definitions'))])
+        assert index.dead_rows == {0}
+        print("3. Re-ingesting a changed 7 CFR 1.1 tombstones only its old row ✓")
+        
+        # 4. Sections without SECTNO fall back to their content
+        unknown = [section('40', 'Unknown', 'First reserved section.'),
+                   section('40', 'Unknown', 'Second reserved section.')]
+        keys = [ContentHashIndex.fingerprint(doc)[0] for doc in unknown]
+        assert keys[0] != keys[1]
+        index.append([ContentHashIndex.fingerprint(doc) for doc in unknown])
+        assert index.dead_rows == {0}
+        print("4. Sections numbered 'Unknown' are identified by content ✓")
+        
+        # 5. Tombstones survive reopening and truncating the index
+        index = ContentHashIndex(os.path.join(tmp, 'batches'))
+        assert index.dead_rows == {0} and len(index) == 5
+        index.truncate(2)
+        assert not index.dead_rows
+        print("5. Truncating a replacement revives the replaced row ✓")
+    
+    print("\n=== Test Complete ===")
+
+
+if __name__ == "__main__":
+    test_content_hash_index()
@@ -0,0 +1,294 @@
+"""
+Embedding Backends for Policy Navigator Agent
+Interchangeable CPU inference engines for sentence embedding models
+"""
+
+import json
+import os
+from typing import List, Optional, Union
+
+import numpy as np
+
+
+# Selectable backends: PyTorch SentenceTransformer, ONNX Runtime (float32)
+# and ONNX Runtime with dynamically int8-quantized weights
+EMBEDDING_BACKENDS = ('torch', 'onnx', 'onnx_int8')
+
+# Backend used when none is configured
+DEFAULT_BACKEND = os.getenv('EMBEDDING_BACKEND', 'torch')
+
+# Directory of exported ONNX models (one subdirectory per model)
+ONNX_CACHE_DIR = os.getenv(
+    'EMBEDDING_ONNX_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'policy_navigator', 'onnx')
+)
+
+
+class EmbeddingBackend:
+    """
+    Interface of an embedding backend
+    
+    A backend is created cheaply and loads its model in load(). encode()
+    returns float32 embeddings in the same space as the model's
+    SentenceTransformer pipeline, so backends can be swapped on an existing
+    store.
+    """
+    
+    name = None
+    
+    def __init__(self, model_name: str):
+        """
+        Initialize backend (does not load the model)
+        
+        Args:
+            model_name: SentenceTransformer model name
+        """
+        self.model_name = model_name
+    
+    @property
+    def dimension(self) -> int:
+        """Embedding dimension of the loaded model"""
+        raise NotImplementedError
+    
+    def load(self):
+        """Load the model"""
+        raise NotImplementedError
+    
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32,
+               show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        """
+        Embed texts
+        
+        Args:
+            texts: Text or list of texts
+            batch_size: Number of texts per forward pass
+            show_progress_bar: Show a progress bar (if the backend has one)
+            
+        Returns:
+            float32 array of shape (len(texts), dimension), or (dimension,) for a single text
+        """
+        raise NotImplementedError
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """PyTorch inference through SentenceTransformer.encode"""
+    
+    name = 'torch'
+    
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        self.model = None
+    
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+    
+    def load(self):
+        # Imported here: importing sentence_transformers pulls in torch
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(self.model_name)
+    
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32,
+               show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        embeddings = self.model.encode(texts, batch_size=batch_size,
+                                       show_progress_bar=show_progress_bar, **kwargs)
+        return np.asarray(embeddings, dtype='float32')
+
+
+def onnx_model_dir(model_name: str) -> str:
+    """Directory holding the exported ONNX files of a model"""
+    return os.path.join(ONNX_CACHE_DIR, model_name.replace('/', '__'))
+
+
+def export_onnx(model_name: str, directory: Optional[str] = None, opset: int = 14) -> str:
+    """
+    Export the transformer of a SentenceTransformer model to ONNX
+    
+    Writes model.onnx (token embeddings), the tokenizer (tokenizer.json) and
+    onnx_config.json with the pooling settings. Mean pooling and the optional
+    normalization layer are applied by ONNXBackend in numpy.
+    
+    Args:
+        model_name: SentenceTransformer model name
+        directory: Output directory (default: onnx_model_dir(model_name))
+        opset: ONNX opset version
+        
+    Returns:
+        Output directory
+        
+    Raises:
+        ValueError: If the model does not use mean pooling
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize
+    
+    directory = directory or onnx_model_dir(model_name)
+    model = SentenceTransformer(model_name, device='cpu')
+    transformer, pooling = model[0], model[1]
+    if not pooling.pooling_mode_mean_tokens:
+        raise ValueError(f"Only mean-pooling models can be exported, '{model_name}' is not one")
+    
+    os.makedirs(directory, exist_ok=True)
+    tokenizer = transformer.tokenizer
+    tokenizer.save_pretrained(directory)
+    
+    inputs = ['input_ids', 'attention_mask', 'token_type_ids']
+    sample = tokenizer(["Export sample"], return_tensors='pt')
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer.auto_model.eval(),
+            tuple(sample[name] for name in inputs),
+            os.path.join(directory, 'model.onnx'),
+            input_names=inputs,
+            output_names=['last_hidden_state'],
+            dynamic_axes={name: {0: 'batch', 1: 'sequence'} for name in inputs + ['last_hidden_state']},
+            opset_version=opset
+        )
+    
+    with open(os.path.join(directory, 'onnx_config.json'), 'w') as f:
+        json.dump({
+            'model_name': model_name,
+            'dimension': model.get_sentence_embedding_dimension(),
+            'max_seq_length': model.max_seq_length,
+            'pad_token': tokenizer.pad_token,
+            'normalize': any(isinstance(module, Normalize) for module in model)
+        }, f, indent=2)
+    
+    print(f"Exported {model_name} to {directory}")
+    return directory
+
+
+def quantize_onnx(directory: str) -> str:
+    """
+    Quantize the weights of an exported model to int8 (dynamic quantization)
+    
+    Args:
+        directory: Directory written by export_onnx
+        
+    Returns:
+        Path of model_int8.onnx
+    """
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    
+    path = os.path.join(directory, 'model_int8.onnx')
+    quantize_dynamic(os.path.join(directory, 'model.onnx'), path, weight_type=QuantType.QInt8)
+    print(f"Quantized {os.path.join(directory, 'model.onnx')} to int8")
+    return path
+
+
+class ONNXBackend(EmbeddingBackend):
+    """
+    ONNX Runtime CPU inference of a mean-pooling SentenceTransformer model
+    
+    The model is exported (and quantized) on first use and cached under
+    ONNX_CACHE_DIR. Tokenization uses the Rust tokenizers library, so
+    neither torch nor transformers is imported once the export exists.
+    """
+    
+    def __init__(self, model_name: str, quantize: bool = False, num_threads: Optional[int] = None,
+                 directory: Optional[str] = None):
+        """
+        Initialize ONNX backend (does not load the model)
+        
+        Args:
+            model_name: SentenceTransformer model name
+            quantize: Use int8-quantized weights (faster, small accuracy loss)
+            num_threads: ONNX Runtime intra-op threads (default: all cores)
+            directory: Directory of the exported model (default: onnx_model_dir(model_name))
+        """
+        super().__init__(model_name)
+        self.name = 'onnx_int8' if quantize else 'onnx'
+        self.quantize = quantize
+        self.num_threads = num_threads
+        self.directory = directory or onnx_model_dir(model_name)
+        
+        self.session = None
+        self.tokenizer = None
+        self.config = None
+    
+    @property
+    def dimension(self) -> int:
+        return self.config['dimension']
+    
+    def load(self):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+        
+        if not os.path.exists(os.path.join(self.directory, 'onnx_config.json')):
+            export_onnx(self.model_name, self.directory)
+        model_path = os.path.join(self.directory, 'model.onnx')
+        if self.quantize:
+            model_path = os.path.join(self.directory, 'model_int8.onnx')
+            if not os.path.exists(model_path):
+                quantize_onnx(self.directory)
+        
+        with open(os.path.join(self.directory, 'onnx_config.json'), 'r') as f:
+            self.config = json.load(f)
+        
+        self.tokenizer = Tokenizer.from_file(os.path.join(self.directory, 'tokenizer.json'))
+        self.tokenizer.enable_truncation(max_length=self.config['max_seq_length'])
+        pad_token = self.config['pad_token']
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token), pad_token=pad_token)
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self._input_names = {node.name for node in self.session.get_inputs()}
+    
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32,
+               show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        
+        embeddings = np.zeros((len(texts), self.dimension), dtype='float32')
+        
+        # Batch texts of similar length together to minimize padding
+        order = np.argsort([-len(text) for text in texts], kind='stable')
+        for start in range(0, len(texts), batch_size):
+            batch = order[start:start + batch_size]
+            encodings = self.tokenizer.encode_batch([texts[i] for i in batch])
+            feeds = {
+                'input_ids': np.array([e.ids for e in encodings], dtype='int64'),
+                'attention_mask': np.array([e.attention_mask for e in encodings], dtype='int64'),
+                'token_type_ids': np.array([e.type_ids for e in encodings], dtype='int64')
+            }
+            hidden = self.session.run(
+                ['last_hidden_state'],
+                {name: value for name, value in feeds.items() if name in self._input_names}
+            )[0]
+            
+            # Mean pooling over real tokens, as in the SentenceTransformer Pooling layer
+            mask = feeds['attention_mask'][:, :, None].astype('float32')
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            if self.config['normalize']:
+                pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            embeddings[batch] = pooled
+        
+        return embeddings[0] if single else embeddings
+
+
+def make_embedding_backend(name: Optional[str] = None,
+                           model_name: str = 'all-MiniLM-L6-v2') -> EmbeddingBackend:
+    """
+    Create an (unloaded) embedding backend
+    
+    Args:
+        name: One of EMBEDDING_BACKENDS (default: DEFAULT_BACKEND, from $EMBEDDING_BACKEND)
+        model_name: SentenceTransformer model name
+        
+    Returns:
+        Embedding backend
+        
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    name = name or DEFAULT_BACKEND
+    if name == 'torch':
+        return SentenceTransformerBackend(model_name)
+    if name in ('onnx', 'onnx_int8'):
+        return ONNXBackend(model_name, quantize=name == 'onnx_int8')
+    raise ValueError(f"Unknown embedding backend '{name}'. Choose one of: {', '.join(EMBEDDING_BACKENDS)}")
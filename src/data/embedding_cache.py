@@ -0,0 +1,183 @@
+"""
+Query Embedding Cache for Policy Navigator Agent
+Bounded LRU cache with TTL (and optional on-disk spill) in front of the embedding model
+"""
+
+import hashlib
+import os
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+class EmbeddingCache:
+    """LRU cache of query embeddings keyed on normalized query text"""
+    
+    def __init__(self, max_entries: int = 10000, ttl_seconds: Optional[float] = 3600,
+                 spill_directory: Optional[str] = None, namespace: str = ""):
+        """
+        Initialize embedding cache
+        
+        Args:
+            max_entries: Maximum number of embeddings kept in memory
+            ttl_seconds: Time-to-live of an entry (None for no expiry)
+            spill_directory: Optional directory where evicted entries are kept on disk
+            namespace: Key prefix (e.g. the model name) so different models never share entries
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.spill_directory = spill_directory
+        self.namespace = namespace
+        
+        if spill_directory:
+            os.makedirs(spill_directory, exist_ok=True)
+        
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.spill_hits = 0
+    
+    @staticmethod
+    def normalize_query(text: str) -> str:
+        """
+        Normalize query text for cache lookups
+        
+        all-MiniLM-L6-v2 is an uncased model, so case and repeated
+        whitespace do not change the embedding.
+        """
+        return " ".join(text.lower().split())
+    
+    def _key(self, text: str) -> str:
+        """Cache key of a query"""
+        normalized = self.normalize_query(text)
+        return hashlib.sha1(f"{self.namespace}\x00{normalized}".encode('utf-8')).hexdigest()
+    
+    def _expired(self, created: float) -> bool:
+        """Whether an entry created at the given time has expired"""
+        return self.ttl_seconds is not None and time.time() - created > self.ttl_seconds
+    
+    def _spill_path(self, key: str) -> str:
+        """On-disk location of a spilled entry"""
+        return os.path.join(self.spill_directory, f"{key}.npy")
+    
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        Look up the embedding of a query
+        
+        Args:
+            text: Query text
+            
+        Returns:
+            Cached embedding, or None on a miss
+        """
+        key = self._key(text)
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, embedding = entry
+                if not self._expired(created):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return embedding
+                del self._entries[key]
+        
+        spilled = self._load_spilled(key)
+        
+        with self._lock:
+            if spilled is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.spill_hits += 1
+        
+        created, embedding = spilled
+        self._store(key, embedding, created)
+        return embedding
+    
+    def put(self, text: str, embedding: np.ndarray):
+        """
+        Add the embedding of a query to the cache
+        
+        Args:
+            text: Query text
+            embedding: Query embedding
+        """
+        if self.max_entries <= 0:
+            return
+        self._store(self._key(text), np.asarray(embedding, dtype='float32'), time.time())
+    
+    def _store(self, key: str, embedding: np.ndarray, created: float):
+        """Insert an entry and evict (spill) the least recently used ones"""
+        evicted = []
+        with self._lock:
+            self._entries[key] = (created, embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False))
+        
+        if self.spill_directory:
+            for evicted_key, (evicted_created, evicted_embedding) in evicted:
+                self._spill(evicted_key, evicted_embedding, evicted_created)
+    
+    def _spill(self, key: str, embedding: np.ndarray, created: float):
+        """Write an evicted entry to disk, keeping its creation time as mtime"""
+        if self._expired(created):
+            return
+        try:
+            path = self._spill_path(key)
+            np.save(path, embedding)
+            os.utime(path, (created, created))
+        except Exception as e:
+            print(f"Error spilling embedding to disk: {str(e)}")
+    
+    def _load_spilled(self, key: str) -> Optional[tuple]:
+        """Read a spilled entry from disk as (created, embedding), None if missing or expired"""
+        if not self.spill_directory:
+            return None
+        
+        path = self._spill_path(key)
+        try:
+            if not os.path.exists(path):
+                return None
+            created = os.path.getmtime(path)
+            if self._expired(created):
+                os.remove(path)
+                return None
+            return created, np.load(path)
+        except Exception as e:
+            print(f"Error reading spilled embedding: {str(e)}")
+            return None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hit/miss counters and size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'spill_hits': self.spill_hits,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'spill_directory': self.spill_directory
+            }
+    
+    def clear(self):
+        """Remove all entries (including spilled ones)"""
+        with self._lock:
+            self._entries.clear()
+        
+        if self.spill_directory and os.path.isdir(self.spill_directory):
+            for name in os.listdir(self.spill_directory):
+                if name.endswith('.npy'):
+                    os.remove(os.path.join(self.spill_directory, name))
@@ -0,0 +1,174 @@
+"""
+Embedding Provider for Policy Navigator Agent
+Process-wide, lazily loaded embedding models shared by all vector stores
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Dict, Any, List, Optional, Union
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data.embedding_backends import EmbeddingBackend, make_embedding_backend, DEFAULT_BACKEND
+
+
+# Embedding model used by the FAISS vector store
+DEFAULT_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Output dimension of known models, so a store can open without loading its model
+MODEL_DIMENSIONS = {
+    'all-MiniLM-L6-v2': 384,
+}
+
+
+class EmbeddingProvider:
+    """
+    Lazily loaded embedding model
+    
+    The model is loaded on the first encode() call (or by preload(), which
+    can run in a background thread at server start), so processes that only
+    read stats, clear the store or answer health checks never load it.
+    Loading is guarded by a lock: concurrent first calls load the model once
+    and the others wait for it.
+    """
+    
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, backend: Optional[str] = None):
+        """
+        Initialize embedding provider (does not load the model)
+        
+        Args:
+            model_name: SentenceTransformer model name
+            backend: Inference backend, one of EMBEDDING_BACKENDS
+                     (default: $EMBEDDING_BACKEND or 'torch')
+        """
+        self.model_name = model_name
+        self.backend = backend or DEFAULT_BACKEND
+        
+        self._model = None
+        self._lock = threading.Lock()
+        self._preload_thread = None
+        self.load_seconds = None
+        self.load_error = None
+    
+    @property
+    def loaded(self) -> bool:
+        """Whether the model is in memory"""
+        return self._model is not None
+    
+    @property
+    def dimension(self) -> int:
+        """Embedding dimension (loads the model only for unknown model names)"""
+        if self.model_name in MODEL_DIMENSIONS:
+            return MODEL_DIMENSIONS[self.model_name]
+        return self.model.dimension
+    
+    @property
+    def model(self) -> EmbeddingBackend:
+        """The embedding backend, loaded on first access"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load()
+        return self._model
+    
+    def _load(self):
+        """Load the model (called once, under the lock)"""
+        print(f"Loading embedding model {self.model_name} ({self.backend})...")
+        start = time.time()
+        try:
+            # Backends import their inference libraries (torch, onnxruntime) in load()
+            model = make_embedding_backend(self.backend, self.model_name)
+            model.load()
+        except Exception as e:
+            self.load_error = str(e)
+            raise
+        self.load_seconds = time.time() - start
+        self.load_error = None
+        print(f"✓ Embedding model loaded in {self.load_seconds:.1f}s")
+        return model
+    
+    def encode(self, texts: Union[str, List[str]], **kwargs):
+        """
+        Embed texts, loading the model on first use
+        
+        Args:
+            texts: Text or list of texts
+            **kwargs: Passed to the backend's encode (batch_size, show_progress_bar)
+            
+        Returns:
+            float32 embeddings
+        """
+        return self.model.encode(texts, **kwargs)
+    
+    def preload(self, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Load the model ahead of the first query
+        
+        Args:
+            background: Load in a daemon thread and return immediately
+            
+        Returns:
+            The loading thread, or None if the model was loaded synchronously
+            or is already loaded
+        """
+        if self.loaded:
+            return None
+        if not background:
+            self.model
+            return None
+        
+        with self._lock:
+            if self._preload_thread is None:
+                self._preload_thread = threading.Thread(
+                    target=self._preload, name=f"preload-{self.model_name}", daemon=True
+                )
+                self._preload_thread.start()
+        return self._preload_thread
+    
+    def _preload(self):
+        """Background preload target (errors are reported, not raised)"""
+        try:
+            self.model
+        except Exception as e:
+            print(f"Error preloading embedding model: {str(e)}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get provider statistics"""
+        return {
+            'model': self.model_name,
+            'backend': self.backend,
+            'loaded': self.loaded,
+            'loading': not self.loaded and self._preload_thread is not None and self._preload_thread.is_alive(),
+            'load_seconds': self.load_seconds,
+            'load_error': self.load_error
+        }
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_embedding_provider(model_name: str = DEFAULT_MODEL_NAME,
+                           backend: Optional[str] = None) -> EmbeddingProvider:
+    """
+    Get the process-wide provider of a model
+    
+    Every vector store of the process shares one provider (and one copy of
+    the model) per model name and backend.
+    
+    Args:
+        model_name: SentenceTransformer model name
+        backend: Inference backend (default: $EMBEDDING_BACKEND or 'torch')
+        
+    Returns:
+        Shared EmbeddingProvider
+    """
+    key = (model_name, backend or DEFAULT_BACKEND)
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            provider = _providers[key] = EmbeddingProvider(*key)
+        return provider
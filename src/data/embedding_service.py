@@ -0,0 +1,318 @@
+"""
+Embedding Service for Policy Navigator Agent
+Micro-batches concurrent query embeddings into single forward passes
+"""
+
+import sys
+import os
+import argparse
+import queue
+import threading
+import time
+import numpy as np
+from collections import deque
+from typing import Dict, Any, List, Optional, Union
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data.embedding_provider import EmbeddingProvider, get_embedding_provider
+
+
+class _EncodeRequest:
+    """Texts of one caller waiting for their embeddings"""
+    
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class EmbeddingService:
+    """
+    Dynamic micro-batching in front of an embedding provider
+    
+    Concurrent request threads put their queries on a queue and wait. A
+    single worker thread takes the first waiting request, keeps collecting
+    requests for up to max_wait_ms (or until max_batch_size texts), encodes
+    them in one forward pass and hands each caller its rows. Under load this
+    replaces many single-query forward passes contending for the GIL and the
+    inference threads with a few batched ones. The batching window is only
+    used while batches hold several requests, so an idle service encodes a
+    lone query immediately.
+    
+    The service has the provider's interface (encode, preload, get_stats,
+    model_name, backend, dimension), so it can be passed to FAISSVectorStore
+    as its embedding_provider. Calls with many texts or encode options
+    (document ingestion) bypass the queue.
+    """
+    
+    def __init__(self, provider: Optional[EmbeddingProvider] = None, max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, latency_window: int = 10000):
+        """
+        Initialize embedding service (the worker starts on first use)
+        
+        Args:
+            provider: Embedding provider (default: the process-wide provider)
+            max_batch_size: Maximum number of texts encoded in one batch
+            max_wait_ms: How long the worker waits for more requests after the first one
+            latency_window: Number of recent request latencies kept for percentiles
+        """
+        self.provider = provider or get_embedding_provider()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._last_batch_requests = 0
+        
+        self._latencies = deque(maxlen=latency_window)
+        self.requests = 0
+        self.batches = 0
+        self.batched_texts = 0
+        self.direct_calls = 0
+    
+    @property
+    def model_name(self) -> str:
+        return self.provider.model_name
+    
+    @property
+    def backend(self) -> str:
+        return self.provider.backend
+    
+    @property
+    def dimension(self) -> int:
+        return self.provider.dimension
+    
+    @property
+    def loaded(self) -> bool:
+        return self.provider.loaded
+    
+    @property
+    def model(self):
+        return self.provider.model
+    
+    def preload(self, background: bool = True) -> Optional[threading.Thread]:
+        """Load the model ahead of the first query and start the worker"""
+        self.start()
+        return self.provider.preload(background=background)
+    
+    def start(self):
+        """Start the batching worker (no-op if running)"""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-service", daemon=True)
+                self._worker.start()
+    
+    def stop(self):
+        """Stop the worker after the requests already queued"""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                self._queue.put(None)
+                self._worker.join()
+            self._worker = None
+    
+    def encode(self, texts: Union[str, List[str]], **kwargs) -> np.ndarray:
+        """
+        Embed texts, batched with concurrent callers
+        
+        Args:
+            texts: Text or list of texts
+            **kwargs: Encode options (batch_size, show_progress_bar); calls
+                      with options are passed straight to the provider
+                      
+        Returns:
+            float32 embeddings, one row per text (a single vector for a string)
+        """
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        
+        if kwargs or not texts or len(texts) >= self.max_batch_size:
+            self.direct_calls += 1
+            embeddings = np.asarray(self.provider.encode(texts, **kwargs), dtype='float32')
+            return embeddings[0] if single else embeddings
+        
+        self.start()
+        request = _EncodeRequest(texts)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result[0] if single else request.result
+    
+    def _collect(self, first: _EncodeRequest) -> tuple:
+        """
+        Gather the requests already queued behind the first one and, if the
+        previous batch had several requests (the service is under load),
+        those arriving within max_wait of it
+        """
+        batch = [first]
+        size = len(first.texts)
+        stop = False
+        busy = self._last_batch_requests > 1
+        deadline = time.perf_counter() + self.max_wait
+        
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter() if busy else 0
+            try:
+                if remaining > 0:
+                    request = self._queue.get(timeout=remaining)
+                else:
+                    request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                stop = True
+                break
+            batch.append(request)
+            size += len(request.texts)
+        
+        return batch, stop
+    
+    def _run(self):
+        """Worker loop: collect a batch, encode it, hand back the rows"""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stop = self._collect(first)
+            
+            try:
+                embeddings = np.asarray(
+                    self.provider.encode([text for request in batch for text in request.texts]),
+                    dtype='float32'
+                )
+                error = None
+            except Exception as e:
+                embeddings, error = None, e
+            
+            finished = time.perf_counter()
+            start = 0
+            for request in batch:
+                if error is None:
+                    request.result = embeddings[start:start + len(request.texts)]
+                    start += len(request.texts)
+                else:
+                    request.error = error
+                self._latencies.append(finished - request.enqueued)
+                request.done.set()
+            
+            self._last_batch_requests = len(batch)
+            self.requests += len(batch)
+            self.batches += 1
+            self.batched_texts += sum(len(request.texts) for request in batch)
+            
+            if stop:
+                return
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get provider and batching statistics (latencies in milliseconds)"""
+        latencies = np.array(self._latencies) * 1000
+        return {
+            **self.provider.get_stats(),
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'requests': self.requests,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_texts / self.batches if self.batches else 0.0,
+            'direct_calls': self.direct_calls,
+            'p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+            'p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else None
+        }
+
+
+def load_test(encoder, queries: List[str], concurrency: int, requests_per_thread: int) -> Dict[str, Any]:
+    """
+    Encode single queries from many threads at once and measure latency
+    
+    Args:
+        encoder: Object with encode(list of texts) (provider or service)
+        queries: Query texts, cycled through
+        concurrency: Number of request threads
+        requests_per_thread: Queries encoded by each thread
+        
+    Returns:
+        Dictionary with p50/p99/max latency in ms and queries per second
+    """
+    latencies = []
+    latencies_lock = threading.Lock()
+    barrier = threading.Barrier(concurrency)
+    
+    def client(offset):
+        barrier.wait()
+        local = []
+        for i in range(requests_per_thread):
+            query = queries[(offset + i) % len(queries)]
+            start = time.perf_counter()
+            encoder.encode([query])
+            local.append(time.perf_counter() - start)
+        with latencies_lock:
+            latencies.extend(local)
+    
+    threads = [threading.Thread(target=client, args=(i * requests_per_thread,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    latencies = np.array(latencies) * 1000
+    return {
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'max_ms': float(latencies.max()),
+        'qps': len(latencies) / elapsed if elapsed > 0 else 0.0
+    }
+
+
+if __name__ == "__main__":
+    # Load test: per-thread encode calls vs. the micro-batching service
+    parser = argparse.ArgumentParser(description='Load test query embedding with and without micro-batching')
+    parser.add_argument('--concurrency', type=int, action='append', default=None,
+                        help='Number of concurrent request threads (repeatable, default: 1, 8, 32)')
+    parser.add_argument('--requests', type=int, default=50, help='Queries per thread')
+    parser.add_argument('--max-wait-ms', type=float, default=5.0, help='Batching window of the service')
+    parser.add_argument('--max-batch-size', type=int, default=64, help='Maximum batch size of the service')
+    parser.add_argument('--backend', type=str, default=None, help='Embedding backend (default: $EMBEDDING_BACKEND or torch)')
+    
+    args = parser.parse_args()
+    
+    queries = [
+        "What are the EPA air quality standards?",
+        "Reporting requirements for hazardous waste generators",
+        "What does 40 CFR 60.1 require?",
+        "Emission limits for new stationary sources",
+        "Who must obtain a Title V operating permit?",
+        "Definitions used in the National Emission Standards",
+        "Monitoring requirements for volatile organic compounds",
+        "Penalties for violating the Clean Water Act",
+    ]
+    
+    provider = get_embedding_provider(backend=args.backend)
+    provider.preload(background=False)
+    service = EmbeddingService(provider, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    service.start()
+    
+    print("="*60)
+    print("Embedding Service Load Test - Policy Navigator Agent")
+    print("="*60)
+    print(f"Model: {provider.model_name} ({provider.backend}), {args.requests} queries per thread")
+    print()
+    print(f"{'encoder':<10} {'threads':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'qps':>8}")
+    
+    for concurrency in args.concurrency or [1, 8, 32]:
+        for name, encoder in (('direct', provider), ('batched', service)):
+            encoder.encode(queries)
+            result = load_test(encoder, queries, concurrency, args.requests)
+            print(f"{name:<10} {concurrency:>7} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                  f"{result['max_ms']:>8.2f} {result['qps']:>8.1f}")
+    
+    stats = service.get_stats()
+    print()
+    print(f"Service: {stats['batches']} batches, mean batch size {stats['mean_batch_size']:.1f}")
+    print("="*60)
+    service.stop()
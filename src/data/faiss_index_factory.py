@@ -0,0 +1,236 @@
+"""
+FAISS Index Factory for Policy Navigator Agent
+Builds, trains and tunes the FAISS index types used by FAISSVectorStore
+"""
+
+import faiss
+import numpy as np
+from typing import Dict, Any, Optional
+
+
+# Supported index types and their faiss.index_factory descriptions
+INDEX_TYPES = {
+    'flat': 'Flat',
+    'sq_fp16': 'SQfp16',
+    'sq_int8': 'SQ8',
+    'pq': 'PQ{pq_m}x{pq_nbits}',
+    'ivf_flat': 'IVF{nlist},Flat',
+    'ivf_sq8': 'IVF{nlist},SQ8',
+    'ivf_pq': 'IVF{nlist},PQ{pq_m}x{pq_nbits}',
+    'hnsw': 'HNSW{hnsw_m}',
+}
+
+# Distance metrics: L2 on raw embeddings, or inner product on L2-normalized
+# embeddings, which is cosine similarity
+METRICS = {
+    'l2': faiss.METRIC_L2,
+    'cosine': faiss.METRIC_INNER_PRODUCT,
+}
+
+# Index types that partition vectors into IVF lists
+IVF_TYPES = ('ivf_flat', 'ivf_sq8', 'ivf_pq')
+
+# Index types whose codebooks must be trained before vectors are added
+TRAINED_TYPES = IVF_TYPES + ('sq_int8', 'pq')
+
+# Index types that store compressed (lossy) vectors
+COMPRESSED_TYPES = ('sq_fp16', 'sq_int8', 'pq', 'ivf_sq8', 'ivf_pq')
+
+# Default build and search parameters for every index type
+DEFAULT_INDEX_CONFIG = {
+    'index_type': 'flat',
+    'metric': 'cosine',
+    'nlist': 1024,
+    'pq_m': 48,
+    'pq_nbits': 8,
+    'hnsw_m': 32,
+    'ef_construction': 200,
+    'nprobe': 16,
+    'ef_search': 64,
+    'rerank': 0,
+}
+
+# FAISS recommends at least 39 training points per IVF list
+MIN_POINTS_PER_LIST = 39
+
+# Upper bound on the training sample, FAISS subsamples beyond 256 points per list
+MAX_POINTS_PER_LIST = 256
+
+# Training sample bounds for quantizers without IVF lists
+MIN_SQ_TRAINING_POINTS = 1000
+MAX_TRAINING_POINTS = 65536
+
+
+def make_index_config(index_type: Optional[str] = None, **overrides) -> Dict[str, Any]:
+    """
+    Build a complete index configuration from defaults and overrides
+
+    Args:
+        index_type: One of INDEX_TYPES (defaults to 'flat')
+        **overrides: Build/search parameters to override (None values are ignored)
+
+    Returns:
+        Index configuration dictionary
+    """
+    config = dict(DEFAULT_INDEX_CONFIG)
+    if index_type:
+        config['index_type'] = index_type
+    for key, value in overrides.items():
+        if value is not None:
+            config[key] = value
+
+    if config['index_type'] not in INDEX_TYPES:
+        raise ValueError(
+            f"Unknown index type '{config['index_type']}'. "
+            f"Choose one of: {', '.join(INDEX_TYPES)}"
+        )
+    if config['metric'] not in METRICS:
+        raise ValueError(
+            f"Unknown metric '{config['metric']}'. "
+            f"Choose one of: {', '.join(METRICS)}"
+        )
+
+    return config
+
+
+def metric_type(config: Dict[str, Any]) -> int:
+    """FAISS metric constant of the configured metric"""
+    return METRICS[config['metric']]
+
+
+def requires_training(config: Dict[str, Any]) -> bool:
+    """Whether the configured index type must be trained before vectors are added"""
+    return config['index_type'] in TRAINED_TYPES
+
+
+def is_compressed(config: Dict[str, Any]) -> bool:
+    """Whether the configured index type stores lossy vector codes"""
+    return config['index_type'] in COMPRESSED_TYPES
+
+
+def supports_selector(config: Dict[str, Any]) -> bool:
+    """Whether searches of the configured index type can be restricted with an IDSelector"""
+    # IndexPQ rejects search parameters altogether
+    return config['index_type'] != 'pq'
+
+
+def training_size(config: Dict[str, Any]) -> int:
+    """
+    Number of vectors needed before the configured index can be trained
+
+    Args:
+        config: Index configuration
+
+    Returns:
+        Minimum number of training vectors (0 if no training is needed)
+    """
+    if not requires_training(config):
+        return 0
+
+    size = MIN_SQ_TRAINING_POINTS
+    if config['index_type'] in IVF_TYPES:
+        size = config['nlist'] * MIN_POINTS_PER_LIST
+    if config['index_type'] in ('pq', 'ivf_pq'):
+        # Each PQ sub-quantizer learns 2^nbits centroids
+        size = max(size, 2 ** config['pq_nbits'] * MIN_POINTS_PER_LIST)
+    return size
+
+
+def build_index(config: Dict[str, Any], dim: int) -> faiss.Index:
+    """
+    Build an empty (untrained) FAISS index from a configuration
+
+    Args:
+        config: Index configuration
+        dim: Embedding dimension
+
+    Returns:
+        FAISS index
+    """
+    description = INDEX_TYPES[config['index_type']].format(**config)
+    index = faiss.index_factory(dim, description, metric_type(config))
+
+    if config['index_type'] == 'hnsw':
+        index.hnsw.efConstruction = config['ef_construction']
+
+    return index
+
+
+def train_index(index: faiss.Index, vectors: np.ndarray, config: Dict[str, Any]):
+    """
+    Train an index on a sample of vectors
+
+    Args:
+        index: Untrained FAISS index
+        vectors: Training vectors (float32, shape [n, dim])
+        config: Index configuration
+    """
+    if index.is_trained:
+        return
+
+    max_points = MAX_TRAINING_POINTS
+    if config['index_type'] in IVF_TYPES:
+        max_points = config['nlist'] * MAX_POINTS_PER_LIST
+    if config['index_type'] in ('pq', 'ivf_pq'):
+        max_points = max(max_points, 2 ** config['pq_nbits'] * MAX_POINTS_PER_LIST)
+    if len(vectors) > max_points:
+        sample = np.random.default_rng(0).choice(len(vectors), max_points, replace=False)
+        vectors = vectors[np.sort(sample)]
+
+    print(f"Training {config['index_type']} index on {len(vectors)} vectors...")
+    index.train(np.ascontiguousarray(vectors, dtype='float32'))
+
+
+def make_search_params(config: Dict[str, Any], nprobe: Optional[int] = None,
+                       ef_search: Optional[int] = None,
+                       selector: Optional[faiss.IDSelector] = None) -> Optional[faiss.SearchParameters]:
+    """
+    Build per-query search parameters for the configured index type
+
+    Args:
+        config: Index configuration
+        nprobe: Number of IVF lists to visit (IVF indexes only)
+        ef_search: HNSW search queue size (HNSW indexes only)
+        selector: Optional IDSelector restricting the search to a subset of ids
+
+    Returns:
+        FAISS search parameters, or None for exact indexes without a selector
+    """
+    if config['index_type'] in IVF_TYPES:
+        params = faiss.SearchParametersIVF(nprobe=nprobe or config['nprobe'])
+    elif config['index_type'] == 'hnsw':
+        params = faiss.SearchParametersHNSW(efSearch=ef_search or config['ef_search'])
+    elif selector is not None:
+        params = faiss.SearchParameters()
+    else:
+        return None
+
+    if selector is not None:
+        params.sel = selector
+    return params
+
+
+def memory_per_vector(index: faiss.Index) -> float:
+    """
+    Approximate resident bytes per stored vector of an index
+
+    Counts the vector code plus per-vector bookkeeping: the 64-bit id of
+    IndexIDMap and IVF lists, and the level-0 links of HNSW graphs.
+
+    Args:
+        index: FAISS index (optionally wrapped in IndexIDMap)
+
+    Returns:
+        Bytes per vector
+    """
+    index = faiss.downcast_index(index)
+    overhead = 0
+    if isinstance(index, faiss.IndexIDMap):
+        overhead += 8
+        index = faiss.downcast_index(index.index)
+    if isinstance(index, faiss.IndexHNSW):
+        overhead += index.hnsw.nb_neighbors(0) * 4
+        index = faiss.downcast_index(index.storage)
+    if isinstance(index, faiss.IndexIVF):
+        overhead += 8
+    return float(index.code_size + overhead)
@@ -6,138 +6,1084 @@ Alternative to ChromaDB - more stable on Windows
 import faiss
 import numpy as np
 import pickle
+import json
 import os
+import sys
 from typing import List, Dict, Any, Optional
-from sentence_transformers import SentenceTransformer
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data.faiss_index_factory import (
+    make_index_config, requires_training, training_size,
+    build_index, train_index, make_search_params, is_compressed,
+    supports_selector, memory_per_vector, metric_type, INDEX_TYPES, IVF_TYPES
+)
+from src.data.metadata_store import MetadataStore
+from src.data.vector_log import VectorLog
+from src.data.embedding_cache import EmbeddingCache
+from src.data.embedding_provider import EmbeddingProvider, get_embedding_provider
+from src.data.content_hash_index import ContentHashIndex
+from src.data.bm25_index import BM25Index
+from src.data.citation_index import CitationIndex, cfr_title_of, extract_citations
 
 
 class FAISSVectorStore:
     """Manage vector database for policy documents using FAISS"""
     
-    def __init__(self, persist_directory: str = "./faiss_db"):
+    # Filtered searches matching at most this many documents (and all
+    # filtered searches on exact indexes) scan only the matching vectors
+    EXACT_FILTER_ROWS = 50000
+    
+    # Retrieval modes: embeddings only, BM25 only, or both fused by rank
+    SEARCH_MODES = ('dense', 'lexical', 'hybrid')
+    
+    # Reciprocal rank fusion constant and minimum candidates per retriever
+    RRF_K = 60
+    HYBRID_CANDIDATES = 50
+    
+    def __init__(self, persist_directory: str = "./faiss_db", index_type: Optional[str] = None,
+                 metric: Optional[str] = None,
+                 nlist: Optional[int] = None, pq_m: Optional[int] = None,
+                 hnsw_m: Optional[int] = None, nprobe: Optional[int] = None,
+                 ef_search: Optional[int] = None, rerank: Optional[int] = None,
+                 compaction_threshold: int = 20000, tombstone_ratio: float = 0.1,
+                 embedding_cache_size: int = 10000, embedding_cache_ttl: Optional[float] = 3600,
+                 embedding_cache_dir: Optional[str] = None,
+                 embedding_provider: Optional[EmbeddingProvider] = None,
+                 embedding_backend: Optional[str] = None):
         """
         Initialize FAISS vector store
         
         Args:
             persist_directory: Directory to persist the database
+            index_type: Index type for a new store ('flat', 'sq_fp16', 'sq_int8', 'pq',
+                        'ivf_flat', 'ivf_sq8', 'ivf_pq', 'hnsw').
+                        Existing stores keep the index type they were built with.
+            metric: Similarity metric for a new store: 'cosine' (inner product over
+                    normalized embeddings, the default) or 'l2'. Existing stores keep
+                    the metric they were built with.
+            nlist: Number of IVF lists (IVF indexes)
+            pq_m: Number of PQ sub-quantizers (PQ indexes)
+            hnsw_m: Number of HNSW graph neighbors (HNSW index)
+            nprobe: Default number of IVF lists visited per query
+            ef_search: Default HNSW search queue size
+            rerank: Re-rank factor for compressed indexes: fetch n_results * rerank
+                    candidates and re-order them by exact distance (0 disables)
+            compaction_threshold: Number of appended vectors after which the
+                                  write-ahead segment is compacted into faiss.index
+                                  (also the largest number of unpurged tombstones)
+            tombstone_ratio: Fraction of the index that may be unpurged tombstones
+                             before they are purged, so small stores do not wait
+                             for compaction_threshold deletions
+            embedding_cache_size: Number of query embeddings cached in memory (0 disables)
+            embedding_cache_ttl: Lifetime of a cached query embedding in seconds
+            embedding_cache_dir: Optional directory for query embeddings evicted from memory
+            embedding_provider: Embedding model provider or EmbeddingService (default:
+                                the process-wide all-MiniLM-L6-v2 provider, loaded on first encode)
+            embedding_backend: Inference backend of the default provider ('torch',
+                               'onnx' or 'onnx_int8'; default: $EMBEDDING_BACKEND or 'torch')
         """
         self.persist_directory = persist_directory
         os.makedirs(persist_directory, exist_ok=True)
         
-        # Initialize embedding model
-        print("Loading embedding model...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.embedding_dim = 384  # Dimension for all-MiniLM-L6-v2
+        # Embedding model, shared by all stores of the process and loaded on first encode
+        self.embedding_provider = embedding_provider or get_embedding_provider(backend=embedding_backend)
+        self.embedding_dim = self.embedding_provider.dimension
+        self.embedding_cache = EmbeddingCache(
+            max_entries=embedding_cache_size,
+            ttl_seconds=embedding_cache_ttl,
+            spill_directory=embedding_cache_dir,
+            namespace=f"{self.embedding_provider.model_name}:{self.embedding_provider.backend}"
+        )
         
         # Initialize or load FAISS index
         self.index_path = os.path.join(persist_directory, "faiss.index")
-        self.metadata_path = os.path.join(persist_directory, "metadata.pkl")
+        self.metadata_dir = os.path.join(persist_directory, "metadata")
+        self.legacy_metadata_path = os.path.join(persist_directory, "metadata.pkl")
+        self.config_path = os.path.join(persist_directory, "index_config.json")
+        self.trained_index_path = os.path.join(persist_directory, "trained.index")
+        self.vectors_path = os.path.join(persist_directory, "vectors.f32")
+        self.manifest_path = os.path.join(persist_directory, "manifest.json")
+        self.hashes_path = os.path.join(persist_directory, "hashes")
+        self.legacy_hashes_path = os.path.join(persist_directory, "hashes.log")
+        self.compaction_threshold = compaction_threshold
+        self.tombstone_ratio = tombstone_ratio
+        
+        # Incremented whenever the indexed documents change (used to invalidate caches)
+        self.generation = 0
+        
+        # Selector excluding unpurged tombstones, keyed by index state
+        self._live_selector = (None, None)
+        
+        requested_config = make_index_config(
+            index_type, metric=metric, nlist=nlist, pq_m=pq_m, hnsw_m=hnsw_m,
+            nprobe=nprobe, ef_search=ef_search, rerank=rerank
+        )
+        self.index_config = self._load_index_config(requested_config, index_type is not None,
+                                                    metric is not None)
+        
+        # Search-time parameters can always be changed without rebuilding
+        if nprobe is not None:
+            self.index_config['nprobe'] = nprobe
+        if ef_search is not None:
+            self.index_config['ef_search'] = ef_search
+        if rerank is not None:
+            self.index_config['rerank'] = rerank
+        self.index_config.setdefault('rerank', 0)
+        
+        # Last recall@k estimate (see estimate_recall)
+        self.recall_estimate = None
+        
+        # Chunk text and metadata live in a memory-mapped columnar store
+        self.metadata = MetadataStore(self.metadata_dir)
+        if os.path.exists(self.legacy_metadata_path):
+            self._migrate_legacy_metadata()
+        
+        # Section number -> row ids, for exact citation lookups
+        self.citations = CitationIndex()
+        self.citations.build(self.metadata.get_column('section_number'), self.metadata.vocab['section_number'])
         
-        if os.path.exists(self.index_path) and os.path.exists(self.metadata_path):
+        # Identity/content hashes of stored rows, so re-ingests skip unchanged
+        # chunks; rows that were replaced or deleted are tombstones
+        self.hashes = ContentHashIndex(self.hashes_path, legacy_path=self.legacy_hashes_path)
+        self._sync_hash_index()
+        
+        # BM25 inverted index over title, section number and text of every row
+        self.lexical = BM25Index(os.path.join(persist_directory, "bm25"))
+        self._sync_lexical_index()
+        
+        # Raw embeddings are appended to a write-ahead log; faiss.index is a
+        # checkpoint of its first index_rows rows. Vectors are added to the
+        # index under their row id, so ids stay stable when rows are removed.
+        self.vectors = VectorLog(self.vectors_path, self.embedding_dim)
+        self.index_rows = 0
+        
+        if os.path.exists(self.index_path):
             self._load_index()
         else:
-            self.index = faiss.IndexFlatL2(self.embedding_dim)
-            self.metadata = []
-            self.id_counter = 0
+            self.index = self._new_index()
+        self._replay_log()
+    
+    @property
+    def embedding_model(self):
+        """The embedding backend (loads it if needed)"""
+        return self.embedding_provider.model
+    
+    def _load_index_config(self, requested_config: Dict[str, Any], explicit: bool,
+                           explicit_metric: bool = False) -> Dict[str, Any]:
+        """Load the persisted index configuration, falling back to the requested one"""
+        if not os.path.exists(self.config_path):
+            return requested_config
+        
+        try:
+            with open(self.config_path, 'r') as f:
+                # Stores saved before metrics were configurable use L2
+                persisted = make_index_config(**{'metric': 'l2', **json.load(f)})
+        except Exception as e:
+            print(f"Error loading index config: {str(e)}")
+            return requested_config
+        
+        if explicit and persisted['index_type'] != requested_config['index_type']:
+            print(f"Keeping existing '{persisted['index_type']}' index; "
+                  f"reset the store to switch to '{requested_config['index_type']}'")
+        if explicit_metric and persisted['metric'] != requested_config['metric']:
+            print(f"Keeping existing '{persisted['metric']}' metric; "
+                  f"reset the store to switch to '{requested_config['metric']}'")
+        
+        return persisted
+    
+    def _save_index_config(self):
+        """Save the index configuration next to the index"""
+        with open(self.config_path, 'w') as f:
+            json.dump(self.index_config, f, indent=2)
+    
+    def _new_index(self) -> faiss.Index:
+        """Create an empty index for the current configuration, keyed by row id"""
+        # Reuse a previously trained index so a reset does not retrain
+        if os.path.exists(self.trained_index_path):
+            self.staging = False
+            return self._with_row_ids(faiss.read_index(self.trained_index_path))
+        
+        # Indexes that need training stay on exact search until enough vectors arrive
+        self.staging = requires_training(self.index_config)
+        if self.staging:
+            return self._with_row_ids(faiss.IndexFlat(self.embedding_dim, metric_type(self.index_config)))
+        return self._with_row_ids(build_index(self.index_config, self.embedding_dim))
+    
+    @staticmethod
+    def _with_row_ids(index: faiss.Index) -> faiss.Index:
+        """
+        Make an empty index accept row ids through add_with_ids
+        
+        IVF indexes store the ids in their inverted lists. Other indexes are
+        wrapped in IndexIDMap, which must not wrap an IVF index: its
+        remove_ids() compacts the id map while the IVF lists keep their
+        positions, so every later hit maps to the wrong row.
+        """
+        if isinstance(faiss.downcast_index(index), faiss.IndexIVF):
+            return index
+        return faiss.IndexIDMap(index)
+    
+    @staticmethod
+    def _keyed_by_row_id(index: faiss.Index) -> bool:
+        """Whether a loaded index was built with row ids by _with_row_ids"""
+        index = faiss.downcast_index(index)
+        if isinstance(index, faiss.IndexIVF):
+            return True
+        return isinstance(index, faiss.IndexIDMap) and not isinstance(
+            faiss.downcast_index(index.index), faiss.IndexIVF
+        )
+    
+    def _live_mask(self, start: int, end: int) -> np.ndarray:
+        """Boolean mask of the rows in [start, end) that are not tombstones"""
+        ids = np.arange(start, end, dtype='int64')
+        if not self.hashes.dead_rows:
+            return np.ones(len(ids), dtype=bool)
+        return ~np.isin(ids, np.fromiter(self.hashes.dead_rows, dtype='int64'))
+    
+    def _add_rows(self, index: faiss.Index, start: int, end: int, batch_rows: int = 65536):
+        """Add the live vectors of rows [start, end) to an index under their row ids"""
+        for batch_start in range(start, end, batch_rows):
+            batch_end = min(batch_start + batch_rows, end)
+            mask = self._live_mask(batch_start, batch_end)
+            if mask.any():
+                ids = np.arange(batch_start, batch_end, dtype='int64')[mask]
+                index.add_with_ids(self.vectors.read(batch_start, batch_end)[mask], ids)
+    
+    def _rebuild_index(self, rows: int):
+        """Rebuild the index from the live vectors of the first rows of the log"""
+        index = self._new_index()
+        self._add_rows(index, 0, rows)
+        self.index = index
     
     def _load_index(self):
-        """Load existing FAISS index and metadata"""
+        """Load existing FAISS index"""
         try:
             self.index = faiss.read_index(self.index_path)
-            with open(self.metadata_path, 'rb') as f:
-                data = pickle.load(f)
-                self.metadata = data['metadata']
-                self.id_counter = data['id_counter']
-            print(f"Loaded FAISS index with {len(self.metadata)} documents")
+            if self.index.metric_type != metric_type(self.index_config):
+                # Index saved without its configuration; trust the index
+                self.index_config['metric'] = 'cosine' if self.index.metric_type == faiss.METRIC_INNER_PRODUCT else 'l2'
+            self.staging = (requires_training(self.index_config)
+                            and not os.path.exists(self.trained_index_path))
+            self.index_rows = self.index.ntotal
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path, 'r') as f:
+                    self.index_rows = json.load(f)['index_rows']
+            elif len(self.vectors) == 0 and self.index.ntotal > 0:
+                self._backfill_vector_log()
+            
+            if not self._keyed_by_row_id(self.index):
+                # Older stores used positional ids, or IVF lists wrapped in an
+                # IndexIDMap whose ids a compaction scrambled; re-add their
+                # vectors under row ids
+                self.index_rows = min(self.index_rows, len(self.vectors), len(self.metadata))
+                self._rebuild_index(self.index_rows)
+                print("Converted FAISS index to stable ids")
+            print(f"Loaded FAISS index with {self.index.ntotal} vectors")
         except Exception as e:
             print(f"Error loading index: {str(e)}")
-            self.index = faiss.IndexFlatL2(self.embedding_dim)
-            self.metadata = []
-            self.id_counter = 0
+            self.index = self._new_index()
+            self.index_rows = 0
+            self.generation += 1
+    
+    def _backfill_vector_log(self):
+        """Rebuild the vector log of an older store from its index"""
+        try:
+            self.vectors.append(self.index.reconstruct_n(0, self.index.ntotal))
+            print(f"Rebuilt vector log with {len(self.vectors)} vectors")
+        except Exception as e:
+            print(f"Error rebuilding vector log: {str(e)}")
+    
+    def _replay_log(self):
+        """Add vectors appended after the last checkpoint to the in-memory index"""
+        rows = min(len(self.vectors), len(self.metadata))
+        if len(self.vectors) > rows:
+            # Vectors of a batch whose metadata was never written
+            self.vectors.truncate(rows)
+        if len(self.metadata) > rows:
+            print(f"Warning: {len(self.metadata) - rows} documents have no stored vectors")
+        
+        if self.index_rows < rows:
+            self._add_rows(self.index, self.index_rows, rows)
+            print(f"Replayed {rows - self.index_rows} vectors from the write-ahead log")
+    
+    def _sync_hash_index(self):
+        """Fingerprint rows stored without hashes (older stores or an interrupted add)"""
+        rows = len(self.metadata)
+        if len(self.hashes) > rows:
+            # Hashes of a batch whose metadata was never written; tombstones
+            # of the remaining rows are kept
+            self.hashes.truncate(rows)
+        
+        if self.hashes.needs_rekey:
+            # Keys written by an older key scheme are recomputed from the metadata
+            self.hashes.rekey([
+                ContentHashIndex.fingerprint(self.metadata.get(row))
+                for row in range(len(self.hashes))
+            ])
+            print(f"Re-keyed content hashes of {len(self.hashes)} documents")
+        
+        start = len(self.hashes)
+        if start < rows:
+            self.hashes.append([
+                ContentHashIndex.fingerprint(self.metadata.get(row))
+                for row in range(start, rows)
+            ])
+            if start > 0 or rows > 1:
+                print(f"Indexed content hashes of {rows - start} documents")
+    
+    @staticmethod
+    def _lexical_text(document: Dict[str, Any]) -> str:
+        """Text indexed for lexical search: title, section number and content"""
+        metadata = document.get('metadata') or {}
+        return " ".join([
+            str(metadata.get('title') or ''),
+            str(metadata.get('section_number') or ''),
+            document.get('content', '')
+        ])
+    
+    def _sync_lexical_index(self, batch_rows: int = 10000):
+        """Index rows stored without BM25 postings (older stores or an interrupted add)"""
+        rows = len(self.metadata)
+        self.lexical.truncate(rows)
+        
+        start = len(self.lexical)
+        for batch_start in range(start, rows, batch_rows):
+            batch_end = min(batch_start + batch_rows, rows)
+            self.lexical.append(batch_start, [
+                self._lexical_text(self.metadata.get(row)) for row in range(batch_start, batch_end)
+            ])
+        if start < rows:
+            self.lexical.compact()
+            print(f"Built lexical index for {rows - start} documents")
+    
+    def _migrate_legacy_metadata(self):
+        """Convert a pickled metadata list (older stores) into the columnar store"""
+        try:
+            if len(self.metadata) == 0:
+                with open(self.legacy_metadata_path, 'rb') as f:
+                    data = pickle.load(f)
+                self.metadata.append(data['metadata'])
+                print(f"Migrated {len(self.metadata)} documents from metadata.pkl")
+            os.remove(self.legacy_metadata_path)
+        except Exception as e:
+            print(f"Error migrating legacy metadata: {str(e)}")
+    
+    def train_index(self) -> bool:
+        """
+        Train the configured IVF index on the vectors added so far
+        
+        Until the store holds enough vectors to train on, documents are kept
+        in an exact flat index. Once trained, the vectors are moved into the
+        configured index and the trained (empty) index is saved to
+        trained.index so restarts and resets do not retrain.
+        
+        Returns:
+            True if the configured index is trained and in use
+        """
+        if not self.staging:
+            return True
+        
+        required = training_size(self.index_config)
+        if self.count() < required:
+            print(f"Keeping exact search: {self.count()} vectors, "
+                  f"{required} needed to train {self.index_config['index_type']}")
+            return False
+        
+        rows = len(self.vectors)
+        index = build_index(self.index_config, self.embedding_dim)
+        train_index(index, self.vectors.read(0, rows)[self._live_mask(0, rows)], self.index_config)
+        faiss.write_index(index, self.trained_index_path)
+        
+        index = self._with_row_ids(index)
+        self._add_rows(index, 0, rows)
+        self.index = index
+        self.staging = False
+        print(f"Trained {self.index_config['index_type']} index with {index.ntotal} vectors")
+        
+        self._save_index()
+        return True
     
     def _save_index(self):
-        """Save FAISS index and metadata to disk"""
+        """Checkpoint the FAISS index to disk (vectors and metadata are appended as documents are added)"""
         try:
-            faiss.write_index(self.index, self.index_path)
-            with open(self.metadata_path, 'wb') as f:
-                pickle.dump({
-                    'metadata': self.metadata,
-                    'id_counter': self.id_counter
-                }, f)
-            print(f"Saved FAISS index with {len(self.metadata)} documents")
+            temp_path = self.index_path + ".tmp"
+            faiss.write_index(self.index, temp_path)
+            os.replace(temp_path, self.index_path)
+            
+            self.index_rows = len(self.vectors)
+            with open(self.manifest_path + ".tmp", 'w') as f:
+                json.dump({'index_rows': self.index_rows}, f)
+            os.replace(self.manifest_path + ".tmp", self.manifest_path)
+            
+            self._save_index_config()
+            print(f"Saved FAISS index with {self.count()} documents")
         except Exception as e:
             print(f"Error saving index: {str(e)}")
     
-    def add_documents(self, documents: List[Dict[str, Any]]) -> int:
+    def _purge_tombstones(self) -> int:
+        """Remove the vectors of deleted or replaced rows from the index"""
+        stale = self.index.ntotal - self.count()
+        if stale <= 0:
+            return 0
+        
+        try:
+            self.index.remove_ids(np.fromiter(self.hashes.dead_rows, dtype='int64'))
+        except RuntimeError:
+            # HNSW graphs do not support removal; rebuild from the live vectors
+            self._rebuild_index(len(self.vectors))
+        print(f"Purged {stale} tombstones from the index")
+        return stale
+    
+    def compact(self):
+        """
+        Purge tombstones from the index and fold the write-ahead segment into
+        faiss.index (no-op if nothing is pending)
+        
+        Tombstoned rows stay in the vector and metadata files, so row ids
+        never change; they are only removed from the FAISS index.
+        """
+        purged = self._purge_tombstones()
+        if purged or len(self.vectors) > self.index_rows or not os.path.exists(self.index_path):
+            self._save_index()
+        self.lexical.compact()
+        self.hashes.checkpoint()
+    
+    def _maybe_compact(self):
+        """Compact once the write-ahead segment or the tombstones grow large"""
+        pending = len(self.vectors) - self.index_rows
+        stale = self.index.ntotal - self.count()
+        max_stale = min(self.compaction_threshold, self.tombstone_ratio * self.index.ntotal)
+        if pending >= self.compaction_threshold or (stale > 0 and stale >= max_stale):
+            self.compact()
+    
+    def encode_documents(self, contents: List[str], show_progress_bar: bool = False) -> np.ndarray:
+        """
+        Embed document texts
+        
+        Args:
+            contents: Document texts
+            show_progress_bar: Show the encoder progress bar
+            
+        Returns:
+            float32 array of shape (len(contents), embedding_dim)
+        """
+        embeddings = self.embedding_provider.encode(contents, show_progress_bar=show_progress_bar)
+        return self._normalize(np.array(embeddings).astype('float32'))
+    
+    def _normalize(self, vectors: np.ndarray) -> np.ndarray:
+        """L2-normalize vectors (in place) if the store uses cosine similarity"""
+        if self.index_config['metric'] == 'cosine':
+            faiss.normalize_L2(vectors)
+        return vectors
+    
+    def _select_changed(self, documents: List[Dict[str, Any]]) -> List[tuple]:
+        """(position, fingerprint) of the documents that are new or changed"""
+        selected = []
+        seen_keys = set()
+        for i, doc in enumerate(documents):
+            fingerprint = ContentHashIndex.fingerprint(doc)
+            key, record_hash, _ = fingerprint
+            if key in seen_keys or self.hashes.is_unchanged(key, record_hash):
+                continue
+            seen_keys.add(key)
+            selected.append((i, fingerprint))
+        return selected
+    
+    def changed_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Filter out documents that are already stored unchanged
+        
+        Args:
+            documents: List of document dictionaries with 'content' and 'metadata'
+            
+        Returns:
+            The documents that add_documents() would actually store
+        """
+        return [documents[i] for i, _ in self._select_changed(documents)]
+    
+    def add_documents(self, documents: List[Dict[str, Any]],
+                      embeddings: Optional[np.ndarray] = None) -> int:
         """
         Add documents to the vector store
         
+        Re-ingesting is idempotent: documents already stored unchanged are
+        skipped, a changed document replaces its previous version (which
+        becomes a tombstone), and a document whose text is already stored
+        reuses that embedding instead of being embedded again.
+        
         Args:
             documents: List of document dictionaries with 'content' and 'metadata'
+            embeddings: Optional precomputed embeddings (from encode_documents),
+                one row per document; computed here if not given
             
         Returns:
-            Number of documents added
+            Number of documents added (new or changed)
         """
         if not documents:
             return 0
         
-        # Extract content and generate embeddings
-        contents = [doc['content'] for doc in documents]
-        embeddings = self.embedding_model.encode(contents, show_progress_bar=True)
+        if embeddings is not None:
+            embeddings = np.asarray(embeddings, dtype='float32')
+            if embeddings.shape != (len(documents), self.embedding_dim):
+                raise ValueError(f"Expected embeddings of shape {(len(documents), self.embedding_dim)}, "
+                                 f"got {embeddings.shape}")
+            embeddings = self._normalize(np.array(embeddings))
         
-        # Add to FAISS index
-        self.index.add(np.array(embeddings).astype('float32'))
+        selected = self._select_changed(documents)
+        if len(selected) < len(documents):
+            print(f"Skipped {len(documents) - len(selected)} unchanged documents")
+        if not selected:
+            return 0
         
-        # Store metadata
-        for doc in documents:
-            self.metadata.append({
-                'id': self.id_counter,
-                'content': doc['content'],
-                'metadata': doc.get('metadata', {})
-            })
-            self.id_counter += 1
+        # Use precomputed embeddings or stored vectors of identical text;
+        # only the remaining documents are embedded
+        vectors = np.zeros((len(selected), self.embedding_dim), dtype='float32')
+        to_encode = []
+        for j, (i, (_, _, content_hash)) in enumerate(selected):
+            if embeddings is not None:
+                vectors[j] = embeddings[i]
+                continue
+            row = self.hashes.find_content(content_hash)
+            if row is not None:
+                vectors[j] = self.vectors.read(row, row + 1)[0]
+            else:
+                to_encode.append(j)
         
-        # Save to disk
-        self._save_index()
+        if to_encode:
+            contents = [documents[selected[j][0]]['content'] for j in to_encode]
+            vectors[to_encode] = self.encode_documents(contents, show_progress_bar=True)
+        
+        # Append vectors, metadata and hashes to the write-ahead segment;
+        # only this batch is written, not the whole index
+        self.vectors.append(vectors)
+        first_row = self.metadata.append([
+            {'content': documents[i]['content'], 'metadata': documents[i].get('metadata', {})}
+            for i, _ in selected
+        ])
+        self.citations.extend(first_row, self.metadata.get_column('section_number')[first_row:],
+                              self.metadata.vocab['section_number'])
+        first_row = self.hashes.append([fingerprint for _, fingerprint in selected])
+        self.lexical.append(first_row, [self._lexical_text(documents[i]) for i, _ in selected])
+        
+        # Add to FAISS index under the new row ids
+        self.index.add_with_ids(vectors, np.arange(first_row, first_row + len(selected), dtype='int64'))
+        self.generation += 1
+        
+        # Train the configured index once enough vectors are available,
+        # otherwise checkpoint only when the segment or tombstones grow large
+        if self.staging and self.count() >= training_size(self.index_config):
+            self.train_index()
+        else:
+            self._maybe_compact()
+        
+        return len(selected)
+    
+    def _source_rows(self, source: str) -> np.ndarray:
+        """Live row ids of the documents with the given source"""
+        code = self.metadata.lookup_code('source', source)
+        if code is None:
+            return np.zeros(0, dtype='int64')
+        rows = np.flatnonzero(self.metadata.get_column('source') == code)
+        return rows[self._live_mask(0, len(self.metadata))[rows]]
+    
+    def delete_documents(self, ids: List[int]) -> int:
+        """
+        Delete documents by id
+        
+        Deleted rows become tombstones: they are excluded from search right
+        away and purged from the index on the next compaction.
+        
+        Args:
+            ids: Document ids (the 'id' field of search results)
+            
+        Returns:
+            Number of documents deleted
+        """
+        deleted = self.hashes.delete_rows(ids)
+        if deleted:
+            self.generation += 1
+            self._maybe_compact()
+        return deleted
+    
+    def delete_by_source(self, source: str) -> int:
+        """
+        Delete all documents of a source (e.g. an uploaded file name or URL)
+        
+        Args:
+            source: Value of the 'source' metadata field
+            
+        Returns:
+            Number of documents deleted
+        """
+        return self.delete_documents(self._source_rows(source).tolist())
+    
+    def upsert(self, documents: List[Dict[str, Any]], source: Optional[str] = None) -> Dict[str, int]:
+        """
+        Replace the documents of a source with a new version
+        
+        Only chunks that are new or changed are embedded; unchanged chunks
+        are kept and chunks missing from the new version are deleted.
+        
+        Args:
+            documents: The complete new set of documents of the source
+            source: Source being replaced (default: the sources of the documents)
+            
+        Returns:
+            Dictionary with the number of documents added, deleted and unchanged
+        """
+        if source is not None:
+            sources = [source]
+        else:
+            sources = list(dict.fromkeys(
+                (doc.get('metadata') or {}).get('source') for doc in documents
+            ))
+        
+        # Delete chunks the new version no longer has
+        keys = set(ContentHashIndex.fingerprint(doc)[0] for doc in documents)
+        stale = [
+            int(row)
+            for name in sources if name is not None
+            for row in self._source_rows(name)
+            if self.hashes.key_of(int(row)) not in keys
+        ]
+        deleted = self.delete_documents(stale)
         
-        return len(documents)
+        added = self.add_documents(documents)
+        return {
+            'added': added,
+            'deleted': deleted,
+            'unchanged': len(documents) - added
+        }
     
-    def search(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+    def search(self, query: str, n_results: int = 5, nprobe: Optional[int] = None,
+               ef_search: Optional[int] = None,
+               filter_metadata: Optional[Dict[str, Any]] = None,
+               mode: str = 'dense', route_citations: bool = True,
+               min_score: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Search for similar documents
         
         Args:
             query: Search query
             n_results: Number of results to return
+            nprobe: Number of IVF lists to visit (IVF indexes, higher is more accurate)
+            ef_search: HNSW search queue size (HNSW indexes, higher is more accurate)
+            filter_metadata: Optional metadata filter on title, section_number,
+                source or type (see MetadataStore.filter_mask)
+            mode: 'dense' (embeddings), 'lexical' (BM25) or 'hybrid' (both,
+                fused by reciprocal rank)
+            route_citations: Answer queries citing stored CFR sections from
+                the citation index (see search_batch)
+            min_score: Drop results whose embedding similarity is below this
+                (see search_batch)
             
         Returns:
             List of matching documents with scores
         """
-        if len(self.metadata) == 0:
+        return self.search_batch([query], n_results, nprobe=nprobe, ef_search=ef_search,
+                                 filter_metadata=filter_metadata, mode=mode,
+                                 route_citations=route_citations, min_score=min_score)[0]
+    
+    def search_batch(self, queries: List[str], n_results: int = 5, nprobe: Optional[int] = None,
+                     ef_search: Optional[int] = None,
+                     filter_metadata: Optional[Dict[str, Any]] = None,
+                     mode: str = 'dense', route_citations: bool = True,
+                     min_score: Optional[float] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Search for similar documents for several queries at once
+        
+        All queries are encoded in one forward pass and searched with a
+        single FAISS call, which is much faster than calling search() in a loop.
+        
+        Dense results are scored by cosine similarity (or 1 / (1 + L2 distance)
+        on L2 stores), lexical results by BM25. Hybrid results are scored by
+        reciprocal rank fusion, scaled so that a document ranked first by both
+        retrievers scores 1.0, and carry 'dense_rank' and 'lexical_rank' (None
+        if not retrieved) and 'dense_score', the embedding similarity.
+        
+        Queries citing CFR sections that are stored ("40 CFR 60.1", "§ 52.21")
+        are answered from the citation index without embedding the query;
+        those results have score 1.0 and 'match' set to 'citation'.
+        
+        Args:
+            queries: Search queries
+            n_results: Number of results to return per query
+            nprobe: Number of IVF lists to visit (IVF indexes, higher is more accurate)
+            ef_search: HNSW search queue size (HNSW indexes, higher is more accurate)
+            filter_metadata: Optional metadata filter on title, section_number,
+                source or type (see MetadataStore.filter_mask)
+            mode: 'dense' (embeddings), 'lexical' (BM25) or 'hybrid' (both,
+                fused by reciprocal rank)
+            route_citations: Answer queries citing stored CFR sections from
+                the citation index
+            min_score: Drop dense and hybrid results whose embedding similarity
+                ('score' or 'dense_score') is below this; citation matches are
+                always kept. A query can come back with no results.
+            
+        Returns:
+            One list of matching documents with scores per query
+            
+        Raises:
+            ValueError: If mode is unknown, or min_score is given in lexical mode
+        """
+        if mode not in self.SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}' (use {', '.join(self.SEARCH_MODES)})")
+        if min_score is not None and mode == 'lexical':
+            raise ValueError("min_score requires 'dense' or 'hybrid' mode (BM25 scores are not calibrated)")
+        if not queries:
             return []
+        if self.count() == 0:
+            return [[] for _ in queries]
         
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode([query])
+        mask = None
+        if filter_metadata:
+            mask = self.metadata.filter_mask(filter_metadata) & self._live_mask(0, len(self.metadata))
+            if not mask.any():
+                return [[] for _ in queries]
         
-        # Search FAISS index
-        distances, indices = self.index.search(
-            np.array(query_embedding).astype('float32'), 
-            min(n_results, len(self.metadata))
-        )
+        # Queries citing stored sections are answered from the citation index
+        batch_results = [
+            self._lookup_citations(query, n_results, mask) if route_citations else []
+            for query in queries
+        ]
+        pending = [i for i, results in enumerate(batch_results) if not results]
+        if pending:
+            searched = self._search_mode([queries[i] for i in pending], n_results, mask,
+                                         mode, nprobe, ef_search)
+            for i, results in zip(pending, searched):
+                if min_score is not None:
+                    results = [
+                        result for result in results
+                        if result.get('dense_score', result['score']) >= min_score
+                    ]
+                batch_results[i] = results
+        return batch_results
+    
+    def _search_mode(self, queries: List[str], n_results: int, mask: Optional[np.ndarray],
+                     mode: str, nprobe: Optional[int], ef_search: Optional[int]) -> List[List[Dict[str, Any]]]:
+        """Run dense, lexical or hybrid retrieval"""
+        if mode == 'dense':
+            return self._search_dense(queries, n_results, mask, nprobe, ef_search)
+        
+        if mask is None and self.hashes.dead_rows:
+            mask = self._live_mask(0, len(self.metadata))
+        if mode == 'lexical':
+            return self._search_lexical(queries, n_results, mask)
+        
+        # Each retriever contributes a deeper candidate list than n_results
+        candidates = max(n_results * 4, self.HYBRID_CANDIDATES)
+        dense = self._search_dense(queries, candidates, mask, nprobe, ef_search)
+        lexical = self._search_lexical(queries, candidates, mask)
+        fused = [
+            self._fuse(dense_results, lexical_results, n_results)
+            for dense_results, lexical_results in zip(dense, lexical)
+        ]
+        
+        # Score lexical-only hits against their stored vectors, so every
+        # hybrid result has a calibrated embedding similarity
+        query_embeddings = self._encode_queries(queries)
+        for query_embedding, results in zip(query_embeddings, fused):
+            missing = [result for result in results if result['dense_score'] is None]
+            if missing:
+                rows = np.array([result['id'] for result in missing], dtype='int64')
+                for result, dist in zip(missing, self._exact_distances(query_embedding, rows)):
+                    result['dense_score'] = self._score(dist)
+        return fused
+    
+    def _lookup_citations(self, query: str, n_results: int,
+                          mask: Optional[np.ndarray]) -> List[Dict[str, Any]]:
+        """Chunks of the stored sections cited in a query (empty if none)"""
+        results = []
+        for cfr_title, section in extract_citations(query):
+            rows = self.citations.lookup(section)
+            if mask is not None:
+                rows = rows[mask[rows]]
+            
+            docs = [self.metadata.get(int(row)) for row in rows if int(row) not in self.hashes.dead_rows]
+            if cfr_title:
+                # Drop sections of another CFR title with the same number
+                docs = [doc for doc in docs if cfr_title_of(doc['metadata']) in (None, cfr_title)]
+            
+            for doc in docs:
+                results.append({
+                    'id': doc['id'],
+                    'content': doc['content'],
+                    'metadata': doc['metadata'],
+                    'score': 1.0,
+                    'match': 'citation'
+                })
+                if len(results) >= n_results:
+                    return results
+        return results
+    
+    def _search_dense(self, queries: List[str], n_results: int, mask: Optional[np.ndarray],
+                      nprobe: Optional[int], ef_search: Optional[int]) -> List[List[Dict[str, Any]]]:
+        """Embedding search, restricted to a row mask if given"""
+        # Generate query embeddings
+        query_embeddings = self._encode_queries(queries)
+        
+        if mask is not None:
+            return self._search_filtered(query_embeddings, n_results, mask, nprobe, ef_search)
+        
+        distances, indices = self._search_index(query_embeddings, n_results, nprobe, ef_search)
         
         # Prepare results
+        return [
+            self._format_results(query_distances, query_indices, n_results)
+            for query_distances, query_indices in zip(distances, indices)
+        ]
+    
+    def _search_index(self, query_embeddings: np.ndarray, n_results: int, nprobe: Optional[int],
+                      ef_search: Optional[int], mask: Optional[np.ndarray] = None) -> tuple:
+        """
+        Search the FAISS index, re-ranking compressed candidates if configured
+        
+        Unpurged tombstones are excluded with an IDSelector, so only
+        n_results neighbours are fetched. Indexes without selector support
+        over-fetch by the number of tombstones instead, which are dropped
+        when the results are formatted.
+        
+        Args:
+            query_embeddings: Query vectors
+            n_results: Number of neighbours per query
+            nprobe: Number of IVF lists to visit (IVF indexes)
+            ef_search: HNSW search queue size (HNSW index)
+            mask: Optional boolean mask of the rows to search
+        
+        Returns:
+            Tuple of (distances, indices) arrays
+        """
+        # IndexIDMap rejects search parameters on older FAISS releases, so the
+        # wrapped index is searched and its positions mapped back to rows
+        index, id_map = self.index, None
+        if isinstance(self.index, faiss.IndexIDMap):
+            index = faiss.downcast_index(self.index.index)
+            id_map = faiss.rev_swig_ptr(self.index.id_map.data(), self.index.ntotal)
+        
+        selector, stale = None, 0
+        if mask is not None:
+            selected = mask if id_map is None else mask[id_map]
+            selector = faiss.IDSelectorBitmap(np.packbits(selected, bitorder='little'))
+        elif self.index.ntotal > self.count():
+            if self.staging or supports_selector(self.index_config):
+                selector = self._tombstone_selector(id_map)
+            else:
+                stale = self.index.ntotal - self.count()
+        k = min(n_results + stale, self.index.ntotal)
+        
+        if self.staging:
+            params = faiss.SearchParameters(sel=selector) if selector is not None else None
+        else:
+            params = make_search_params(self.index_config, nprobe, ef_search, selector=selector)
+        
+        rerank = self.index_config['rerank'] if is_compressed(self.index_config) and not self.staging else 0
+        fetch = min(k * rerank, self.index.ntotal) if rerank > 1 else k
+        distances, indices = index.search(query_embeddings, fetch, params=params)
+        if id_map is not None:
+            indices = np.where(indices >= 0, id_map[np.maximum(indices, 0)], -1)
+        
+        if rerank > 1:
+            return self._rerank(query_embeddings, indices, k)
+        return distances, indices
+    
+    def _tombstone_selector(self, id_map: Optional[np.ndarray]) -> faiss.IDSelector:
+        """
+        Selector over the index ids (or IndexIDMap positions) of live rows
+        
+        Rebuilt only when documents are added or deleted, or the index is compacted.
+        """
+        key = (id(self.index), self.index.ntotal, self.generation)
+        if self._live_selector[0] != key:
+            live = self._live_mask(0, len(self.metadata))
+            if id_map is not None:
+                live = live[id_map]
+            self._live_selector = (key, faiss.IDSelectorBitmap(np.packbits(live, bitorder='little')))
+        return self._live_selector[1]
+    
+    def _rerank(self, query_embeddings: np.ndarray, indices: np.ndarray, k: int) -> tuple:
+        """Re-order candidate rows by exact distance to their float32 vectors in the log"""
+        cosine = self.index_config['metric'] == 'cosine'
+        distances = np.full((len(indices), k), -np.inf if cosine else np.inf, dtype='float32')
+        reranked = np.full((len(indices), k), -1, dtype='int64')
+        
+        for i, candidates in enumerate(indices):
+            candidates = candidates[candidates >= 0]
+            if len(candidates) == 0:
+                continue
+            # Inner products rank from high to low, L2 distances from low to high
+            exact = self._exact_distances(query_embeddings[i], candidates)
+            order = np.argsort(-exact if cosine else exact, kind='stable')[:k]
+            distances[i, :len(order)] = exact[order]
+            reranked[i, :len(order)] = candidates[order]
+        
+        return distances, reranked
+    
+    def _search_lexical(self, queries: List[str], n_results: int,
+                        mask: Optional[np.ndarray]) -> List[List[Dict[str, Any]]]:
+        """BM25 search, restricted to a row mask if given"""
+        batch_results = []
+        for query in queries:
+            rows, scores = self.lexical.search(query, n_results, mask=mask)
+            results = []
+            for row, score in zip(rows, scores):
+                doc = self.metadata.get(int(row))
+                results.append({
+                    'id': doc['id'],
+                    'content': doc['content'],
+                    'metadata': doc['metadata'],
+                    'score': float(score)
+                })
+            batch_results.append(results)
+        return batch_results
+    
+    def _fuse(self, dense: List[Dict[str, Any]], lexical: List[Dict[str, Any]],
+              n_results: int) -> List[Dict[str, Any]]:
+        """Combine dense and lexical rankings with reciprocal rank fusion"""
+        fused = {}
+        for field, results in (('dense_rank', dense), ('lexical_rank', lexical)):
+            for rank, result in enumerate(results, 1):
+                entry = fused.setdefault(result['id'], {
+                    **result, 'score': 0.0, 'dense_rank': None, 'lexical_rank': None, 'dense_score': None
+                })
+                entry[field] = rank
+                if field == 'dense_rank':
+                    entry['dense_score'] = result['score']
+                entry['score'] += 1.0 / (self.RRF_K + rank)
+        
+        best = 2.0 / (self.RRF_K + 1)
+        ranked = sorted(fused.values(), key=lambda entry: entry['score'], reverse=True)[:n_results]
+        for entry in ranked:
+            entry['score'] /= best
+        return ranked
+    
+    def _search_filtered(self, query_embeddings: np.ndarray, n_results: int, mask: np.ndarray,
+                         nprobe: Optional[int], ef_search: Optional[int]) -> List[List[Dict[str, Any]]]:
+        """
+        Search only the rows selected by a filter mask
+        
+        Small subsets (or any subset of a flat or PQ index) are searched exactly
+        over their own vectors, so the cost is proportional to the subset.
+        Larger subsets of other indexes are searched through the index
+        with an IDSelector bitmap, so a full top-k still comes back.
+        """
+        rows = np.flatnonzero(mask)
+        k = min(n_results, len(rows))
+        
+        exact = self.index_config['index_type'] == 'flat' or not supports_selector(self.index_config)
+        if self.staging or exact or len(rows) <= self.EXACT_FILTER_ROWS:
+            distances, positions = faiss.knn(query_embeddings, self.vectors.read_rows(rows), k,
+                                             metric=metric_type(self.index_config))
+            indices = np.where(positions >= 0, rows[np.maximum(positions, 0)], -1)
+        else:
+            distances, indices = self._search_index(query_embeddings, k, nprobe, ef_search, mask)
+        
+        return [
+            self._format_results(query_distances, query_indices)
+            for query_distances, query_indices in zip(distances, indices)
+        ]
+    
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed queries, encoding only those missing from the embedding cache"""
+        embeddings = [self.embedding_cache.get(query) for query in queries]
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            encoded = self.embedding_provider.encode([queries[i] for i in missing])
+            for i, embedding in zip(missing, np.array(encoded).astype('float32')):
+                self.embedding_cache.put(queries[i], embedding)
+                embeddings[i] = embedding
+        
+        return self._normalize(np.array(embeddings).astype('float32'))
+    
+    def _format_results(self, distances: np.ndarray, indices: np.ndarray,
+                        n_results: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Turn one row of FAISS search output into (at most n_results) result dictionaries"""
         results = []
-        for i, (dist, idx) in enumerate(zip(distances[0], indices[0])):
-            if idx < len(self.metadata):
-                doc = self.metadata[idx]
+        for dist, idx in zip(distances, indices):
+            if n_results is not None and len(results) >= n_results:
+                break
+            if 0 <= idx < len(self.metadata) and idx not in self.hashes.dead_rows:
+                doc = self.metadata.get(int(idx))
                 results.append({
+                    'id': doc['id'],
                     'content': doc['content'],
                     'metadata': doc['metadata'],
-                    'score': float(1 / (1 + dist))  # Convert distance to similarity score
+                    'score': self._score(dist)
                 })
         
         return results
     
+    def estimate_recall(self, k: int = 10, n_queries: int = 100, nprobe: Optional[int] = None,
+                        ef_search: Optional[int] = None, batch_rows: int = 65536) -> Optional[float]:
+        """
+        Estimate recall@k of the index against exact search
+        
+        Stored vectors are sampled as queries; their exact neighbours are
+        computed by scanning the float32 vector log block by block, so the
+        estimate works for indexes that do not keep the original vectors.
+        
+        Args:
+            k: Number of neighbours compared per query
+            n_queries: Number of sampled queries
+            nprobe: Number of IVF lists to visit (IVF indexes)
+            ef_search: HNSW search queue size (HNSW index)
+            batch_rows: Number of vectors read per block of the exact scan
+            
+        Returns:
+            Mean fraction of the exact top-k found by the index, or None if the store is empty
+        """
+        rows = len(self.vectors)
+        live = np.flatnonzero(self._live_mask(0, rows))
+        if len(live) == 0:
+            return None
+        
+        sample = np.random.default_rng(0).choice(live, min(n_queries, len(live)), replace=False)
+        queries = self.vectors.read_rows(np.sort(sample))
+        k = min(k, len(live))
+        
+        # Exact top-k over the live rows of the vector log
+        metric = metric_type(self.index_config)
+        heap = faiss.ResultHeap(len(queries), k, keep_max=metric == faiss.METRIC_INNER_PRODUCT)
+        for start in range(0, rows, batch_rows):
+            end = min(start + batch_rows, rows)
+            mask = self._live_mask(start, end)
+            if not mask.any():
+                continue
+            ids = np.arange(start, end, dtype='int64')[mask]
+            distances, positions = faiss.knn(queries, self.vectors.read(start, end)[mask], min(k, len(ids)),
+                                             metric=metric)
+            heap.add_result(distances, ids[positions])
+        heap.finalize()
+        
+        _, indices = self._search_index(queries, k, nprobe, ef_search)
+        hits = 0
+        for exact, found in zip(heap.I, indices):
+            found = [idx for idx in found if idx >= 0 and idx not in self.hashes.dead_rows][:k]
+            hits += len(set(exact.tolist()) & set(found))
+        
+        recall = hits / (len(queries) * k)
+        self.recall_estimate = {'k': k, 'queries': len(queries), 'recall': recall}
+        return recall
+    
+    def _score(self, dist: float) -> float:
+        """Convert a FAISS distance to a similarity score (cosine similarity, or 1 / (1 + L2 distance))"""
+        if self.index_config['metric'] == 'cosine':
+            return float(dist)
+        return float(1 / (1 + dist))
+    
+    def _exact_distances(self, query_embedding: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Exact distances (inner product for cosine stores) from a query to stored rows"""
+        vectors = self.vectors.read_rows(rows)
+        if self.index_config['metric'] == 'cosine':
+            return vectors @ query_embedding
+        return ((vectors - query_embedding) ** 2).sum(axis=1)
+    
+    def count(self) -> int:
+        """Number of live (searchable) documents"""
+        return len(self.metadata) - len(self.hashes.dead_rows)
+    
     def get_collection_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the collection
@@ -146,19 +1092,38 @@ class FAISSVectorStore:
             Dictionary with collection statistics
         """
         return {
-            'total_documents': len(self.metadata),
+            'total_documents': self.count(),
+            'tombstones': len(self.hashes.dead_rows),
+            'unpurged_tombstones': self.index.ntotal - self.count(),
             'collection_name': 'policy_documents',
             'persist_directory': self.persist_directory,
-            'backend': 'FAISS'
+            'backend': 'FAISS',
+            'index_type': self.index_config['index_type'],
+            'metric': self.index_config['metric'],
+            'index_trained': not self.staging,
+            'bytes_per_vector': memory_per_vector(self.index),
+            'float32_bytes_per_vector': self.embedding_dim * 4,
+            'rerank': self.index_config['rerank'] if is_compressed(self.index_config) else 0,
+            'recall_estimate': self.recall_estimate,
+            'pending_vectors': len(self.vectors) - self.index_rows,
+            'embedding_model': self.embedding_provider.get_stats(),
+            'embedding_cache': self.embedding_cache.get_stats(),
+            'lexical_index': self.lexical.get_stats(),
+            'citation_index': self.citations.get_stats()
         }
     
     def clear_all(self):
         """Clear all documents from the vector store"""
         try:
-            # Reset index and metadata
-            self.index = faiss.IndexFlatL2(self.embedding_dim)
-            self.metadata = []
-            self.id_counter = 0
+            # Reset index and metadata (keeps the trained index, if any)
+            self.index = self._new_index()
+            self.metadata.clear()
+            self.vectors.clear()
+            self.hashes.truncate(0)
+            self.lexical.clear()
+            self.citations = CitationIndex()
+            self.recall_estimate = None
+            self.generation += 1
             
             # Save empty state to disk
             self._save_index()
@@ -174,17 +1139,75 @@ class FAISSVectorStore:
         try:
             if os.path.exists(self.index_path):
                 os.remove(self.index_path)
-            if os.path.exists(self.metadata_path):
-                os.remove(self.metadata_path)
-            self.index = faiss.IndexFlatL2(self.embedding_dim)
-            self.metadata = []
-            self.id_counter = 0
+            if os.path.exists(self.config_path):
+                os.remove(self.config_path)
+            if os.path.exists(self.trained_index_path):
+                os.remove(self.trained_index_path)
+            if os.path.exists(self.manifest_path):
+                os.remove(self.manifest_path)
+            self.metadata.clear()
+            self.vectors.clear()
+            self.hashes.truncate(0)
+            self.lexical.clear()
+            self.citations = CitationIndex()
+            self.recall_estimate = None
+            self.index = self._new_index()
+            self.index_rows = 0
+            self.generation += 1
             print("Collection deleted successfully")
         except Exception as e:
             print(f"Error deleting collection: {str(e)}")
 
 
+
+def test_compaction_recall(n_rows: int = 10000, n_queries: int = 200, min_recall: float = 0.9):
+    """
+    Test self-query recall of every index type after deleting a source and compacting
+    
+    Uses random Gaussian vectors as precomputed embeddings, so no embedding
+    model is loaded.
+    """
+    import tempfile
+    
+    print("=== Testing Recall After Compaction ===\n")
+    
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((n_rows, 384)).astype('float32')
+    documents = [
+        {'content': f"Document {row}", 'metadata': {'source': 'b' if row % 3 == 0 else 'a'}}
+        for row in range(n_rows)
+    ]
+    
+    for index_type in INDEX_TYPES:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = FAISSVectorStore(persist_directory=tmp, index_type=index_type, nlist=16)
+            store.add_documents(documents, embeddings=vectors)
+            store.train_index()
+            store.compact()
+            
+            deleted = store.delete_by_source('b')
+            store.compact()
+            assert store.index.ntotal == n_rows - deleted
+            
+            # Every live row queried with its own vector should find itself
+            live = np.flatnonzero(store._live_mask(0, n_rows))
+            rows = rng.choice(live, n_queries, replace=False)
+            distances, indices = store._search_index(store.vectors.read_rows(rows), 10, None, None)
+            found = [
+                [result['id'] for result in store._format_results(row_distances, row_indices)]
+                for row_distances, row_indices in zip(distances, indices)
+            ]
+            recall = np.mean([row in ids for row, ids in zip(rows, found)])
+            assert not any(id_ % 3 == 0 for ids in found for id_ in ids), "deleted rows returned"
+            assert recall >= min_recall, f"{index_type}: recall@10 {recall:.3f} after compaction"
+            print(f"{index_type}: self-query recall@10 {recall:.3f} after deleting {deleted} rows ✓")
+    
+    print("\n=== Test Complete ===")
+
+
 if __name__ == "__main__":
+    test_compaction_recall()
+    
     # Test the FAISS vector store
     print("Testing FAISS Vector Store...")
     
@@ -5,12 +5,15 @@ Processes CFR data and populates the vector database
 
 import os
 import sys
+import time
+import argparse
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from tools.document_processor import DocumentProcessor
 from data.vector_store import VectorStore
+from data.ingest_pipeline import IngestPipeline, parse_file
 from typing import List, Dict, Any
 
 
@@ -49,13 +52,15 @@ class DataIngestion:
         
         return added
     
-    def ingest_directory(self, directory: str, pattern: str = "*.xml") -> int:
+    def ingest_directory(self, directory: str, pattern: str = "*.xml", workers: int = 1) -> int:
         """
         Ingest all files matching pattern from a directory
         
         Args:
             directory: Directory path
             pattern: File pattern to match
+            workers: Number of parsing processes; more than one runs the
+                parallel ingestion pipeline
             
         Returns:
             Total number of documents added
@@ -70,11 +75,28 @@ class DataIngestion:
         
         print(f"Found {len(files)} files to process")
         
-        total_added = 0
+        start = time.time()
         
-        for file_path in files:
-            added = self.ingest_cfr_file(file_path, chunk=True)
-            total_added += added
+        if workers > 1:
+            # Parse/chunk in a process pool while the writer adds batches
+            result = IngestPipeline(self.vector_store, workers=workers).run(files)
+            total_added = result['documents']
+            total_sections = result['sections']
+        else:
+            total_added = 0
+            total_sections = 0
+            
+            for file_path in files:
+                print(f"Processing {file_path}...")
+                sections, documents = parse_file(file_path, chunk=True)
+                added = self.vector_store.add_documents(documents)
+                print(f"Added {added} documents from {sections} sections")
+                total_added += added
+                total_sections += sections
+        
+        elapsed = time.time() - start
+        print(f"Ingested {total_sections} sections ({total_added} documents) in {elapsed:.1f}s "
+              f"({total_sections / elapsed if elapsed > 0 else 0:.1f} sections/sec)")
         
         return total_added
     
@@ -118,13 +140,18 @@ class DataIngestion:
 
 def main():
     """Main ingestion process"""
+    parser = argparse.ArgumentParser(description='Ingest policy data into the ChromaDB vector store')
+    parser.add_argument('--reset', action='store_true', help='Reset the vector database before ingestion')
+    parser.add_argument('--workers', type=int, default=1, help='Number of parsing processes (default: 1)')
+    args = parser.parse_args()
+    
     print("=== Policy Navigator Data Ingestion ===\n")
     
     # Initialize ingestion
     ingestion = DataIngestion(vector_store_path="/home/ubuntu/policy-navigator-agent/chroma_db")
     
     # Check if we should reset
-    if len(sys.argv) > 1 and sys.argv[1] == "--reset":
+    if args.reset:
         print("Resetting vector database...")
         ingestion.reset_database()
         print()
@@ -134,7 +161,7 @@ def main():
     
     if os.path.exists(sample_data_dir):
         print(f"Ingesting data from {sample_data_dir}...")
-        total = ingestion.ingest_directory(sample_data_dir, "*.xml")
+        total = ingestion.ingest_directory(sample_data_dir, "*.xml", workers=args.workers)
         print(f"\nTotal documents ingested: {total}")
     else:
         print(f"Sample data directory not found: {sample_data_dir}")
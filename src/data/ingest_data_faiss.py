@@ -5,21 +5,94 @@ Data ingestion script for FAISS vector store
 import sys
 import os
 import argparse
+import glob
+import time
+from typing import Dict, Any, Optional
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from src.data.faiss_vector_store import FAISSVectorStore
+from src.data.faiss_index_factory import INDEX_TYPES, METRICS
+from src.data.embedding_backends import EMBEDDING_BACKENDS
+from src.data.ingest_pipeline import IngestPipeline, to_index_document
 from src.tools.document_processor import DocumentProcessor
 
 
-def ingest_cfr_data(vector_store_path: str = "./faiss_db", reset: bool = False):
+def cfr_source(section: Dict[str, Any]) -> str:
+    """Source label of a parsed CFR section ("CFR Title 40"), from its own title number"""
+    title = section.get('title')
+    return f"CFR Title {title}" if title and title != "Unknown" else "CFR"
+
+
+def to_cfr_document(section: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a parsed CFR section into a vector store document labelled with its title"""
+    return to_index_document(section, source=cfr_source(section))
+
+
+def ingest_cfr_file(vs: FAISSVectorStore, processor: DocumentProcessor, cfr_file: str,
+                    batch_size: int = 100) -> int:
+    """
+    Stream the sections of one CFR XML file into the vector store
+    
+    Sections are added in batches as they are parsed, so embedding starts
+    before the whole file is read.
+    
+    Args:
+        vs: FAISS vector store
+        processor: Document processor
+        cfr_file: Path to CFR XML file
+        batch_size: Number of sections added at once
+        
+    Returns:
+        Number of sections added
+    """
+    total_added = 0
+    batch_num = 0
+    batch = []
+    
+    print(f"Ingesting sections in batches of {batch_size}...")
+    print()
+    
+    def add_batch():
+        nonlocal total_added, batch_num
+        added = vs.add_documents(batch)
+        total_added += added
+        batch_num += 1
+        print(f"  Batch {batch_num}: Added {added} documents (Total: {total_added})")
+        batch.clear()
+    
+    for section in processor.iter_cfr_sections(cfr_file):
+        batch.append(to_cfr_document(section))
+        if len(batch) >= batch_size:
+            add_batch()
+    
+    if batch:
+        add_batch()
+    
+    return total_added
+
+
+def ingest_cfr_data(vector_store_path: str = "./faiss_db", reset: bool = False,
+                    index_type: Optional[str] = None, metric: Optional[str] = None,
+                    nlist: Optional[int] = None,
+                    input_path: Optional[str] = None, workers: int = 1,
+                    rerank: Optional[int] = None, embedding_backend: Optional[str] = None):
     """
     Ingest CFR data into FAISS vector store
     
     Args:
         vector_store_path: Path to FAISS database
         reset: Whether to reset the database
+        index_type: FAISS index type for a new database ('flat', 'sq_fp16', 'sq_int8', 'pq',
+            'ivf_flat', 'ivf_sq8', 'ivf_pq', 'hnsw')
+        metric: Similarity metric for a new database ('cosine' or 'l2')
+        nlist: Number of IVF lists for IVF index types
+        input_path: CFR XML file or directory of XML files (default: sample Title 40 file)
+        workers: Number of parsing processes; with more than one worker (or a
+            directory) files go through the parallel ingestion pipeline
+        rerank: Re-rank factor for compressed index types (0 disables)
+        embedding_backend: Embedding inference backend ('torch', 'onnx', 'onnx_int8')
     """
     print("="*60)
     print("FAISS Data Ingestion - Policy Navigator Agent")
@@ -27,60 +100,61 @@ def ingest_cfr_data(vector_store_path: str = "./faiss_db", reset: bool = False):
     print()
     
     # Initialize vector store
-    vs = FAISSVectorStore(persist_directory=vector_store_path)
+    vs = FAISSVectorStore(persist_directory=vector_store_path, index_type=index_type, metric=metric,
+                          nlist=nlist, rerank=rerank, embedding_backend=embedding_backend)
     
     if reset:
         print("Resetting vector store...")
         vs.delete_collection()
-        vs = FAISSVectorStore(persist_directory=vector_store_path)
+        vs = FAISSVectorStore(persist_directory=vector_store_path, index_type=index_type, metric=metric,
+                              nlist=nlist, rerank=rerank, embedding_backend=embedding_backend)
     
     # Initialize document processor
     processor = DocumentProcessor()
     
-    # Process CFR XML file
-    cfr_file = os.path.join(
+    # Process CFR XML files
+    cfr_path = input_path or os.path.join(
         os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
         "data", "sample", "CFR-2024-title40.xml"
     )
     
-    if not os.path.exists(cfr_file):
-        print(f"✗ CFR file not found: {cfr_file}")
+    if not os.path.exists(cfr_path):
+        print(f"✗ CFR file not found: {cfr_path}")
         print("  Please ensure the sample data is downloaded.")
         return
     
-    print(f"Processing: {cfr_file}")
-    print()
+    files = sorted(glob.glob(os.path.join(cfr_path, "*.xml"))) if os.path.isdir(cfr_path) else [cfr_path]
+    if not files:
+        print(f"✗ No XML files found in {cfr_path}")
+        return
     
-    # Extract sections
-    sections = processor.extract_cfr_sections(cfr_file)
-    print(f"✓ Extracted {len(sections)} sections from CFR")
+    start = time.time()
+    
+    if workers > 1 or len(files) > 1:
+        # Parse in a process pool, embed in batches, single writer
+        print(f"Processing {len(files)} files with {workers} workers...")
+        print()
+        
+        pipeline = IngestPipeline(vs, workers=workers, chunk=False,
+                                  transform=to_cfr_document)
+        result = pipeline.run(files)
+        total_sections = result['sections']
+        total_added = result['documents']
+    else:
+        print(f"Processing: {files[0]}")
+        print()
+        total_sections = total_added = ingest_cfr_file(vs, processor, files[0])
+    
+    elapsed = time.time() - start
     print()
+    print(f"✓ Extracted and ingested {total_sections} sections from CFR in {elapsed:.1f}s "
+          f"({total_sections / elapsed if elapsed > 0 else 0:.1f} sections/sec)")
     
-    # Prepare documents for ingestion
-    documents = []
-    for section in sections:
-        documents.append({
-            'content': section['content'],
-            'metadata': {
-                'title': section['title'],
-                'section_number': section['section_number'],
-                'source': 'CFR Title 40',
-                'type': 'regulation'
-            }
-        })
-    
-    # Add to vector store in batches
-    batch_size = 100
-    total_added = 0
-    
-    print(f"Ingesting {len(documents)} documents in batches of {batch_size}...")
+    # Train the configured index (no-op for flat/HNSW or if already trained)
+    # and fold the write-ahead segment into faiss.index
     print()
-    
-    for i in range(0, len(documents), batch_size):
-        batch = documents[i:i+batch_size]
-        added = vs.add_documents(batch)
-        total_added += added
-        print(f"  Batch {i//batch_size + 1}: Added {added} documents (Total: {total_added})")
+    vs.train_index()
+    vs.compact()
     
     print()
     print("="*60)
@@ -88,8 +162,13 @@ def ingest_cfr_data(vector_store_path: str = "./faiss_db", reset: bool = False):
     
     # Show stats
     stats = vs.get_collection_stats()
-    print(f"✓ Backend: {stats['backend']}")
+    print(f"✓ Backend: {stats['backend']} ({stats['index_type']} index, {stats['metric']} metric)")
     print(f"✓ Total documents in database: {stats['total_documents']}")
+    print(f"✓ Memory per vector: {stats['bytes_per_vector']:.0f} bytes "
+          f"(float32: {stats['float32_bytes_per_vector']} bytes)")
+    recall = vs.estimate_recall()
+    if recall is not None:
+        print(f"✓ Estimated recall@{vs.recall_estimate['k']}: {recall:.3f}")
     print("="*60)
 
 
@@ -97,7 +176,24 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Ingest policy data into FAISS vector store')
     parser.add_argument('--reset', action='store_true', help='Reset the vector store before ingestion')
     parser.add_argument('--path', type=str, default='./faiss_db', help='Path to FAISS database')
+    parser.add_argument('--index-type', type=str, default=None,
+                        choices=list(INDEX_TYPES),
+                        help='FAISS index type for a new database (default: flat)')
+    parser.add_argument('--metric', type=str, default=None, choices=list(METRICS),
+                        help='Similarity metric for a new database (default: cosine)')
+    parser.add_argument('--nlist', type=int, default=None, help='Number of IVF lists for IVF index types')
+    parser.add_argument('--rerank', type=int, default=None,
+                        help='Re-rank n_results * RERANK candidates by exact distance (compressed index types)')
+    parser.add_argument('--embedding-backend', type=str, default=None, choices=list(EMBEDDING_BACKENDS),
+                        help='Embedding inference backend (default: $EMBEDDING_BACKEND or torch)')
+    parser.add_argument('--input', type=str, default=None,
+                        help='CFR XML file or directory of XML files (default: sample Title 40 file)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of parsing processes (default: 1, streaming single-file ingest)')
     
     args = parser.parse_args()
     
-    ingest_cfr_data(vector_store_path=args.path, reset=args.reset)
+    ingest_cfr_data(vector_store_path=args.path, reset=args.reset,
+                    index_type=args.index_type, metric=args.metric, nlist=args.nlist,
+                    input_path=args.input, workers=args.workers, rerank=args.rerank,
+                    embedding_backend=args.embedding_backend)
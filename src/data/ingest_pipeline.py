@@ -0,0 +1,250 @@
+"""
+Parallel Ingestion Pipeline for Policy Navigator Agent
+Parses and chunks files in a process pool, embeds in batches and writes from a single thread
+"""
+
+import os
+import sys
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional, Callable
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.tools.document_processor import DocumentProcessor
+
+
+def parse_file(file_path: str, chunk: bool = True, transform: Optional[Callable] = None) -> tuple:
+    """
+    Parse and chunk one file (runs in a worker process)
+    
+    Args:
+        file_path: Path to document
+        chunk: Whether to chunk documents
+        transform: Optional function applied to every document/chunk
+        
+    Returns:
+        Tuple of (number of sections, list of documents)
+    """
+    processor = DocumentProcessor()
+    sections = processor.process_document(file_path, chunk=False)
+    documents = processor.chunk_documents(sections) if chunk else sections
+    
+    if transform is not None:
+        documents = [transform(doc) for doc in documents]
+    
+    return len(sections), documents
+
+
+def to_index_document(doc: Dict[str, Any], source: Optional[str] = None,
+                      doc_type: str = 'regulation') -> Dict[str, Any]:
+    """
+    Convert a processed section or chunk into a FAISS vector store document
+    
+    Args:
+        doc: Section or chunk from DocumentProcessor
+        source: Source label (defaults to the document's source)
+        doc_type: Document type stored in metadata
+        
+    Returns:
+        Dictionary with 'content' and 'metadata'
+    """
+    record = DocumentProcessor.cfr_section_record(doc)
+    metadata = {
+        'title': record['title'],
+        'section_number': record['section_number'],
+        'source': source or doc.get('source', 'unknown'),
+        'type': doc_type
+    }
+    if 'chunk_num' in doc:
+        metadata['chunk_num'] = doc['chunk_num']
+    
+    return {'content': doc['content'], 'metadata': metadata}
+
+
+class IngestPipeline:
+    """
+    Pipelined ingestion: parse/chunk -> embed -> write
+    
+    Files are parsed and chunked in a process pool. Parsed documents are
+    regrouped into fixed-size batches and go through a bounded queue to an
+    embedding thread, whose output goes through a second bounded queue to a
+    single writer (the calling thread). Parsing, embedding and writing
+    overlap, and the bounded queues keep memory flat when one stage is slower.
+    
+    Stores exposing encode_documents() (FAISSVectorStore) get precomputed
+    embeddings; other stores (ChromaDB VectorStore) embed on write. Stores
+    exposing changed_documents() only get documents that are new or changed,
+    so re-ingesting unchanged files embeds nothing.
+    """
+    
+    def __init__(self, vector_store: Any, workers: Optional[int] = None, batch_size: int = 256,
+                 queue_size: int = 4, chunk: bool = True, transform: Optional[Callable] = None):
+        """
+        Initialize ingestion pipeline
+        
+        Args:
+            vector_store: Vector store with add_documents()
+            workers: Number of parsing processes (default: CPU count)
+            batch_size: Number of documents embedded and written at once
+            queue_size: Number of batches buffered between stages
+            chunk: Whether to chunk documents
+            transform: Optional picklable (module-level) function applied to
+                every document in the worker, e.g. to_index_document
+        """
+        self.vector_store = vector_store
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.chunk = chunk
+        self.transform = transform
+        self.embed = hasattr(vector_store, 'encode_documents')
+    
+    @staticmethod
+    def _put(q: queue.Queue, item: Any, stop: threading.Event):
+        """Put an item on a bounded queue unless the pipeline is stopping"""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+    
+    @staticmethod
+    def _get(q: queue.Queue, stop: threading.Event) -> Any:
+        """Get an item from a queue, None once the pipeline is stopping and the queue is empty"""
+        while True:
+            try:
+                return q.get(timeout=0.5)
+            except queue.Empty:
+                if stop.is_set():
+                    return None
+    
+    def run(self, files: List[str]) -> Dict[str, Any]:
+        """
+        Ingest files
+        
+        Args:
+            files: Paths of the files to ingest
+            
+        Returns:
+            Dictionary with counts, elapsed time and throughput
+        """
+        start = time.time()
+        parsed = queue.Queue(maxsize=self.queue_size)
+        embedded = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        errors = []
+        stats = {'files': 0, 'failed_files': 0, 'sections': 0, 'documents': 0}
+        
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        file_iter = iter(files)
+        pending = set()
+        
+        def submit_next():
+            file_path = next(file_iter, None)
+            if file_path is not None:
+                future = pool.submit(parse_file, file_path, self.chunk, self.transform)
+                future.file_path = file_path
+                pending.add(future)
+        
+        # Submit the first window from this thread, so worker processes are
+        # started before the pipeline threads exist
+        for _ in range(self.workers * 2):
+            submit_next()
+        
+        def parse_stage():
+            nonlocal pending
+            buffer = []
+            try:
+                while pending and not stop.is_set():
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        submit_next()
+                        try:
+                            n_sections, documents = future.result()
+                        except Exception as e:
+                            print(f"✗ Error processing {future.file_path}: {str(e)}")
+                            stats['failed_files'] += 1
+                            continue
+                        
+                        stats['files'] += 1
+                        stats['sections'] += n_sections
+                        print(f"  Parsed {os.path.basename(future.file_path)}: "
+                              f"{n_sections} sections, {len(documents)} documents")
+                        
+                        buffer.extend(documents)
+                        while len(buffer) >= self.batch_size:
+                            self._put(parsed, buffer[:self.batch_size], stop)
+                            buffer = buffer[self.batch_size:]
+                
+                if buffer:
+                    self._put(parsed, buffer, stop)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                self._put(parsed, None, stop)
+        
+        def embed_stage():
+            try:
+                while True:
+                    batch = self._get(parsed, stop)
+                    if batch is None:
+                        break
+                    # Skip documents already stored unchanged before embedding them
+                    if hasattr(self.vector_store, 'changed_documents'):
+                        batch = self.vector_store.changed_documents(batch)
+                        if not batch:
+                            continue
+                    embeddings = None
+                    if self.embed:
+                        embeddings = self.vector_store.encode_documents([doc['content'] for doc in batch])
+                    self._put(embedded, (batch, embeddings), stop)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                self._put(embedded, None, stop)
+        
+        threads = [
+            threading.Thread(target=parse_stage, daemon=True),
+            threading.Thread(target=embed_stage, daemon=True)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        # Single writer
+        try:
+            while True:
+                item = self._get(embedded, stop)
+                if item is None:
+                    break
+                batch, embeddings = item
+                if embeddings is not None:
+                    added = self.vector_store.add_documents(batch, embeddings=embeddings)
+                else:
+                    added = self.vector_store.add_documents(batch)
+                stats['documents'] += added
+                print(f"  Wrote {added} documents (Total: {stats['documents']})")
+        finally:
+            stop.set()
+            # Unblock stages waiting on a full queue
+            for q in (parsed, embedded):
+                while not q.empty():
+                    q.get_nowait()
+            pool.shutdown(wait=True, cancel_futures=True)
+            for thread in threads:
+                thread.join(timeout=5)
+        
+        if errors:
+            raise errors[0]
+        
+        elapsed = time.time() - start
+        stats['elapsed'] = elapsed
+        stats['sections_per_sec'] = stats['sections'] / elapsed if elapsed > 0 else 0.0
+        stats['documents_per_sec'] = stats['documents'] / elapsed if elapsed > 0 else 0.0
+        return stats
@@ -0,0 +1,327 @@
+"""
+Columnar Metadata Store for Policy Navigator Agent
+Memory-mapped, append-only storage for chunk text and metadata of FAISSVectorStore
+"""
+
+import json
+import os
+from collections import OrderedDict
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+
+class MetadataStore:
+    """
+    Columnar on-disk store for document chunks, addressed by row id
+    
+    Layout (all files are append-only):
+        text.bin / text.offsets     UTF-8 chunk text blob and int64 end offsets
+        meta.bin / meta.offsets     JSON-encoded metadata blob and int64 end offsets
+        col.<field>.codes           int32 dictionary codes for small typed columns
+        col.<field>.vocab           one JSON-encoded value per line (code = line number)
+    
+    Files are memory-mapped and only the rows returned by a search are decoded,
+    so startup cost and resident memory do not grow with the corpus size.
+    """
+    
+    # Metadata fields stored as typed (dictionary-encoded) columns
+    COLUMNS = ('title', 'section_number', 'source', 'type')
+    
+    # Number of per-value row bitmaps kept in memory for filtering
+    MAX_BITMAPS = 256
+    
+    def __init__(self, directory: str):
+        """
+        Initialize metadata store
+        
+        Args:
+            directory: Directory holding the store files
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        
+        self.text_path = os.path.join(directory, "text.bin")
+        self.text_offsets_path = os.path.join(directory, "text.offsets")
+        self.meta_path = os.path.join(directory, "meta.bin")
+        self.meta_offsets_path = os.path.join(directory, "meta.offsets")
+        
+        self._maps = {}
+        self._bitmaps = OrderedDict()
+        self._load_vocabularies()
+        self._count = self._consistent_count()
+        self._truncate_to_count()
+    
+    def _column_paths(self, field: str):
+        """Return the (codes, vocab) file paths of a typed column"""
+        return (
+            os.path.join(self.directory, f"col.{field}.codes"),
+            os.path.join(self.directory, f"col.{field}.vocab")
+        )
+    
+    def _load_vocabularies(self):
+        """Load the (small) column vocabularies into memory"""
+        self.vocab = {}
+        self.vocab_index = {}
+        for field in self.COLUMNS:
+            _, vocab_path = self._column_paths(field)
+            values = []
+            if os.path.exists(vocab_path):
+                with open(vocab_path, 'r', encoding='utf-8') as f:
+                    values = [json.loads(line) for line in f if line.strip()]
+            self.vocab[field] = values
+            self.vocab_index[field] = {value: code for code, value in enumerate(values)}
+    
+    def _consistent_count(self) -> int:
+        """Number of rows fully written to every file (guards against partial appends)"""
+        return min(self._file_rows(path, dtype) for path, dtype in self._fixed_width_files())
+    
+    def _truncate_to_count(self):
+        """Drop bytes left behind by an interrupted append"""
+        for path, dtype in self._fixed_width_files():
+            self._truncate(path, self._count * np.dtype(dtype).itemsize)
+        self._truncate(self.text_path, self._blob_size(self.text_offsets_path))
+        self._truncate(self.meta_path, self._blob_size(self.meta_offsets_path))
+        self._maps = {}
+    
+    def _fixed_width_files(self):
+        """(path, dtype) of every fixed-width column file"""
+        files = [(self.text_offsets_path, np.int64), (self.meta_offsets_path, np.int64)]
+        for field in self.COLUMNS:
+            files.append((self._column_paths(field)[0], np.int32))
+        return files
+    
+    @staticmethod
+    def _truncate(path: str, size: int):
+        """Truncate a file to size bytes if it is longer"""
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+    
+    @staticmethod
+    def _file_rows(path: str, dtype) -> int:
+        """Number of complete fixed-width rows in a file"""
+        if not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // np.dtype(dtype).itemsize
+    
+    def _map(self, path: str, dtype) -> np.ndarray:
+        """Memory-map a file (cached until the next append)"""
+        if path not in self._maps:
+            if os.path.exists(path) and os.path.getsize(path) > 0:
+                self._maps[path] = np.memmap(path, dtype=dtype, mode='r')
+            else:
+                self._maps[path] = np.zeros(0, dtype=dtype)
+        return self._maps[path]
+    
+    def _read_blob(self, blob_path: str, offsets_path: str, row: int) -> bytes:
+        """Read one row of a blob using its end-offset column"""
+        offsets = self._map(offsets_path, np.int64)
+        start = int(offsets[row - 1]) if row > 0 else 0
+        end = int(offsets[row])
+        return bytes(self._map(blob_path, np.uint8)[start:end])
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def append(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Append records to the store
+        
+        Args:
+            records: List of dictionaries with 'content' and 'metadata'
+            
+        Returns:
+            Row id of the first appended record
+        """
+        first_row = self._count
+        if not records:
+            return first_row
+        
+        text_end = self._blob_size(self.text_offsets_path)
+        meta_end = self._blob_size(self.meta_offsets_path)
+        
+        texts, text_offsets = [], []
+        metas, meta_offsets = [], []
+        codes = {field: [] for field in self.COLUMNS}
+        new_values = {field: [] for field in self.COLUMNS}
+        
+        for record in records:
+            text = record['content'].encode('utf-8')
+            text_end += len(text)
+            texts.append(text)
+            text_offsets.append(text_end)
+            
+            metadata = record.get('metadata', {})
+            meta = json.dumps(metadata, ensure_ascii=False).encode('utf-8')
+            meta_end += len(meta)
+            metas.append(meta)
+            meta_offsets.append(meta_end)
+            
+            for field in self.COLUMNS:
+                codes[field].append(self._encode_value(field, metadata.get(field), new_values[field]))
+        
+        # Blobs and vocabularies first, offsets/codes last: a partial append
+        # never exposes a row whose data is missing
+        self._append_bytes(self.text_path, b''.join(texts))
+        self._append_bytes(self.meta_path, b''.join(metas))
+        for field in self.COLUMNS:
+            if new_values[field]:
+                _, vocab_path = self._column_paths(field)
+                with open(vocab_path, 'a', encoding='utf-8') as f:
+                    for value in new_values[field]:
+                        f.write(json.dumps(value, ensure_ascii=False) + "\n")
+        
+        self._append_bytes(self.text_offsets_path, np.array(text_offsets, dtype=np.int64).tobytes())
+        self._append_bytes(self.meta_offsets_path, np.array(meta_offsets, dtype=np.int64).tobytes())
+        for field in self.COLUMNS:
+            codes_path, _ = self._column_paths(field)
+            self._append_bytes(codes_path, np.array(codes[field], dtype=np.int32).tobytes())
+        
+        self._count += len(records)
+        self._maps = {}
+        return first_row
+    
+    def _blob_size(self, offsets_path: str) -> int:
+        """End offset of the last complete row of a blob"""
+        if self._count == 0:
+            return 0
+        return int(self._map(offsets_path, np.int64)[self._count - 1])
+    
+    def _append_bytes(self, path: str, data: bytes):
+        """Append raw bytes to a file"""
+        with open(path, 'ab') as f:
+            f.write(data)
+    
+    def _encode_value(self, field: str, value: Any, new_values: List[str]) -> int:
+        """Dictionary-encode a column value (-1 for missing values)"""
+        if value is None:
+            return -1
+        value = str(value)
+        code = self.vocab_index[field].get(value)
+        if code is None:
+            code = len(self.vocab[field])
+            self.vocab[field].append(value)
+            self.vocab_index[field][value] = code
+            new_values.append(value)
+        return code
+    
+    def get_content(self, row: int) -> str:
+        """Get the chunk text of a row"""
+        return self._read_blob(self.text_path, self.text_offsets_path, row).decode('utf-8')
+    
+    def get_metadata(self, row: int) -> Dict[str, Any]:
+        """Get the metadata dictionary of a row"""
+        return json.loads(self._read_blob(self.meta_path, self.meta_offsets_path, row).decode('utf-8'))
+    
+    def get(self, row: int) -> Dict[str, Any]:
+        """
+        Get a stored record
+        
+        Args:
+            row: Row id
+            
+        Returns:
+            Dictionary with 'id', 'content' and 'metadata'
+        """
+        return {
+            'id': row,
+            'content': self.get_content(row),
+            'metadata': self.get_metadata(row)
+        }
+    
+    def get_column(self, field: str) -> np.ndarray:
+        """
+        Get the dictionary codes of a typed column (memory-mapped)
+        
+        Args:
+            field: One of COLUMNS
+            
+        Returns:
+            int32 array of codes, one per row (-1 for missing values)
+        """
+        codes_path, _ = self._column_paths(field)
+        return self._map(codes_path, np.int32)[:self._count]
+    
+    def lookup_code(self, field: str, value: Any) -> Optional[int]:
+        """Get the dictionary code of a column value, or None if it never occurs"""
+        return self.vocab_index[field].get(str(value))
+    
+    def _condition_codes(self, field: str, condition: Any) -> List[int]:
+        """Dictionary codes of the column values matching a filter condition"""
+        if isinstance(condition, dict):
+            if len(condition) != 1:
+                raise ValueError(f"Filter on '{field}' must have exactly one operator")
+            operator, operand = next(iter(condition.items()))
+        elif isinstance(condition, (list, tuple, set)):
+            operator, operand = '$in', condition
+        else:
+            operator, operand = '$eq', condition
+        
+        if operator == '$eq':
+            operand = [operand]
+        elif operator == '$prefix':
+            prefix = str(operand)
+            return [code for code, value in enumerate(self.vocab[field]) if value.startswith(prefix)]
+        elif operator != '$in':
+            raise ValueError(f"Unsupported filter operator '{operator}' (use $eq, $in or $prefix)")
+        
+        codes = [self.lookup_code(field, value) for value in operand]
+        return [code for code in codes if code is not None]
+    
+    def _bitmap(self, field: str, condition: Any) -> np.ndarray:
+        """
+        Row bitmap of one filter condition
+        
+        Bitmaps are cached per condition and, since rows are only ever
+        appended, extended to new rows instead of being recomputed.
+        """
+        key = (field, json.dumps(condition, sort_keys=True, default=str))
+        cached = self._bitmaps.pop(key, None)
+        start = 0 if cached is None else len(cached)
+        
+        if start < self._count:
+            codes = self._condition_codes(field, condition)
+            new_rows = np.isin(self.get_column(field)[start:], codes)
+            cached = new_rows if cached is None else np.concatenate([cached, new_rows])
+        
+        self._bitmaps[key] = cached
+        while len(self._bitmaps) > self.MAX_BITMAPS:
+            self._bitmaps.popitem(last=False)
+        return cached
+    
+    def filter_mask(self, filter_metadata: Dict[str, Any]) -> np.ndarray:
+        """
+        Rows matching a metadata filter
+        
+        Conditions on different fields are combined with AND. A condition is
+        a value, a list of values (any of), or a dictionary with one of the
+        operators $eq, $in or $prefix (e.g. {'section_number': {'$prefix': '60.'}}).
+        
+        Args:
+            filter_metadata: Mapping of column name (one of COLUMNS) to condition
+            
+        Returns:
+            Boolean array with one entry per row
+            
+        Raises:
+            ValueError: If a field is not a typed column or an operator is unknown
+        """
+        mask = np.ones(self._count, dtype=bool)
+        for field, condition in filter_metadata.items():
+            if field not in self.COLUMNS:
+                raise ValueError(f"Cannot filter on '{field}'; filterable fields are {', '.join(self.COLUMNS)}")
+            mask &= self._bitmap(field, condition)[:self._count]
+        return mask
+    
+    def clear(self):
+        """Remove all rows from the store"""
+        self._maps = {}
+        self._bitmaps = OrderedDict()
+        paths = [self.text_path, self.meta_path]
+        paths.extend(path for path, _ in self._fixed_width_files())
+        paths.extend(self._column_paths(field)[1] for field in self.COLUMNS)
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+        self._load_vocabularies()
+        self._count = 0
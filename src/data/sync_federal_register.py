@@ -0,0 +1,284 @@
+"""
+Incremental Federal Register sync for FAISS vector store
+Indexes newly published Federal Register documents, tracking a high-water mark
+"""
+
+import sys
+import os
+import json
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data.faiss_vector_store import FAISSVectorStore
+from src.tools.document_processor import DocumentProcessor
+from src.tools.federal_register_tool import FederalRegisterTool
+
+
+# Listing fields needed to index a document
+SYNC_FIELDS = [
+    'document_number', 'publication_date', 'title', 'type', 'action', 'abstract',
+    'agencies', 'html_url', 'raw_text_url', 'cfr_references', 'effective_on'
+]
+
+
+class FederalRegisterSync:
+    """
+    Appends new Federal Register documents to the vector store
+    
+    The sync state is a high-water mark: the latest publication_date indexed
+    and the document numbers already indexed for that date. Each run lists
+    documents from that date onwards (oldest first), skips the ones already
+    indexed, and saves the state after every batch written to the store, so
+    an interrupted run resumes where it stopped.
+    """
+    
+    def __init__(self, vector_store: FAISSVectorStore, state_path: str,
+                 tool: Optional[FederalRegisterTool] = None,
+                 processor: Optional[DocumentProcessor] = None):
+        """
+        Initialize sync job
+        
+        Args:
+            vector_store: Vector store to append documents to
+            state_path: JSON file holding the high-water mark
+            tool: Federal Register API tool
+            processor: Document processor used for chunking
+        """
+        self.vector_store = vector_store
+        self.state_path = state_path
+        self.tool = tool or FederalRegisterTool()
+        self.processor = processor or DocumentProcessor()
+        self.state = self._load_state()
+    
+    def _load_state(self) -> Dict[str, Any]:
+        """Load the high-water mark"""
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"⚠ Could not read sync state, starting over: {str(e)}")
+        return {'last_publication_date': None, 'last_document_numbers': [], 'total_documents': 0}
+    
+    def _save_state(self):
+        """Save the high-water mark atomically"""
+        self.state['updated_at'] = datetime.now().isoformat()
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+    
+    def _is_new(self, document: Dict[str, Any]) -> bool:
+        """Whether a document is past the high-water mark"""
+        last_date = self.state['last_publication_date']
+        date = document.get('publication_date')
+        if not last_date or not date or date > last_date:
+            return True
+        return date == last_date and document.get('document_number') not in self.state['last_document_numbers']
+    
+    def _advance(self, document: Dict[str, Any]):
+        """Move the high-water mark past a document"""
+        date = document.get('publication_date')
+        if not date:
+            return
+        if date != self.state['last_publication_date']:
+            self.state['last_publication_date'] = date
+            self.state['last_document_numbers'] = []
+        self.state['last_document_numbers'].append(document.get('document_number'))
+        self.state['total_documents'] += 1
+    
+    def _document_text(self, document: Dict[str, Any], full_text: bool) -> str:
+        """Text to index for a document (abstract, or the full text if requested)"""
+        parts = [document.get('title') or '', document.get('action') or '']
+        
+        if full_text and document.get('raw_text_url'):
+            try:
+                from bs4 import BeautifulSoup
+                response = self.tool.session.get(document['raw_text_url'], timeout=30)
+                response.raise_for_status()
+                parts.append(BeautifulSoup(response.text, 'html.parser').get_text())
+            except Exception as e:
+                print(f"⚠ Full text unavailable for {document.get('document_number')}: {str(e)}")
+                parts.append(document.get('abstract') or '')
+        else:
+            parts.append(document.get('abstract') or '')
+        
+        return "\n\n".join(part.strip() for part in parts if part and part.strip())
+    
+    def _to_chunks(self, document: Dict[str, Any], full_text: bool) -> List[Dict[str, Any]]:
+        """Convert a Federal Register document into vector store documents"""
+        content = self._document_text(document, full_text)
+        if not content:
+            return []
+        
+        agencies = [a.get('name', '') for a in document.get('agencies') or []]
+        cfr_references = [
+            f"{ref.get('title')} CFR {ref.get('part')}"
+            for ref in document.get('cfr_references') or []
+            if ref.get('title') and ref.get('part')
+        ]
+        
+        chunks = self.processor.chunk_document({
+            'title': document.get('title', 'Untitled'),
+            'section': document.get('document_number'),
+            'section_title': document.get('title', ''),
+            'content': content,
+            'source': 'Federal Register',
+            'metadata': {}
+        })
+        
+        return [
+            {
+                'content': chunk['content'],
+                'metadata': {
+                    'title': document.get('title', 'Untitled'),
+                    'section_number': document.get('document_number'),
+                    'source': 'Federal Register',
+                    'type': 'federal_register',
+                    'document_type': document.get('type'),
+                    'publication_date': document.get('publication_date'),
+                    'effective_on': document.get('effective_on'),
+                    'agencies': ", ".join(agencies),
+                    'cfr_references': ", ".join(cfr_references),
+                    'url': document.get('html_url'),
+                    'chunk_num': chunk['chunk_num']
+                }
+            }
+            for chunk in chunks
+        ]
+    
+    def run(self, since: Optional[str] = None, document_types: Optional[List[str]] = None,
+            agencies: Optional[List[str]] = None, batch_size: int = 100,
+            full_text: bool = False) -> Dict[str, Any]:
+        """
+        Index documents published since the high-water mark
+        
+        Args:
+            since: Start date (YYYY-MM-DD) when there is no high-water mark yet
+            document_types: Document types to sync (default: final and proposed rules)
+            agencies: Optional agency slugs to restrict the sync to
+            batch_size: Number of chunks appended to the store at once
+            full_text: Index the full text instead of title and abstract
+            
+        Returns:
+            Dictionary with the number of documents and chunks added
+        """
+        start_date = self.state['last_publication_date'] or since or \
+            (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        
+        params = FederalRegisterTool.listing_params(
+            document_types=document_types or ['RULE', 'PRORULE'],
+            agencies=agencies,
+            start_date=start_date,
+            order='oldest'
+        )
+        params['fields[]'] = SYNC_FIELDS
+        
+        print(f"Syncing Federal Register documents published since {start_date}...")
+        
+        batch, batch_documents = [], []
+        documents_added = chunks_added = skipped = 0
+        
+        def flush():
+            nonlocal documents_added, chunks_added
+            if batch:
+                chunks_added += self.vector_store.add_documents(batch)
+            for document in batch_documents:
+                self._advance(document)
+            documents_added += len(batch_documents)
+            self._save_state()
+            print(f"  Added {documents_added} documents ({chunks_added} chunks), "
+                  f"up to {self.state['last_publication_date']}")
+            batch.clear()
+            batch_documents.clear()
+        
+        for document in self.tool.iter_documents(params=params):
+            if not self._is_new(document):
+                skipped += 1
+                continue
+            
+            batch.extend(self._to_chunks(document, full_text))
+            batch_documents.append(document)
+            
+            if len(batch) >= batch_size:
+                flush()
+        
+        if batch_documents:
+            flush()
+        
+        return {
+            'documents_added': documents_added,
+            'chunks_added': chunks_added,
+            'skipped': skipped,
+            'last_publication_date': self.state['last_publication_date']
+        }
+
+
+def sync_federal_register(vector_store_path: str = "./faiss_db", since: Optional[str] = None,
+                          document_types: Optional[List[str]] = None,
+                          agencies: Optional[List[str]] = None, batch_size: int = 100,
+                          full_text: bool = False, state_path: Optional[str] = None):
+    """
+    Sync new Federal Register documents into FAISS vector store
+    
+    Args:
+        vector_store_path: Path to FAISS database
+        since: Start date (YYYY-MM-DD) for the first sync
+        document_types: Document types to sync
+        agencies: Optional agency slugs to restrict the sync to
+        batch_size: Number of chunks appended to the store at once
+        full_text: Index the full text instead of title and abstract
+        state_path: Sync state file (default: inside the database directory)
+    """
+    print("="*60)
+    print("Federal Register Sync - Policy Navigator Agent")
+    print("="*60)
+    print()
+    
+    vs = FAISSVectorStore(persist_directory=vector_store_path)
+    state_path = state_path or os.path.join(vector_store_path, 'federal_register_sync.json')
+    
+    sync = FederalRegisterSync(vs, state_path)
+    result = sync.run(since=since, document_types=document_types, agencies=agencies,
+                      batch_size=batch_size, full_text=full_text)
+    
+    # Train the configured index if it reached its training size and
+    # fold the write-ahead segment into faiss.index
+    if result['chunks_added']:
+        print()
+        vs.train_index()
+        vs.compact()
+    
+    print()
+    print("="*60)
+    print(f"✓ Sync complete! New documents: {result['documents_added']} "
+          f"({result['chunks_added']} chunks, {result['skipped']} already indexed)")
+    print(f"✓ High-water mark: {result['last_publication_date']}")
+    print(f"✓ Total documents in database: {vs.get_collection_stats()['total_documents']}")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Sync new Federal Register documents into FAISS vector store')
+    parser.add_argument('--path', type=str, default='./faiss_db', help='Path to FAISS database')
+    parser.add_argument('--since', type=str, default=None,
+                        help='Start date (YYYY-MM-DD) for the first sync (default: 30 days ago)')
+    parser.add_argument('--type', dest='document_types', action='append', default=None,
+                        choices=['RULE', 'PRORULE', 'NOTICE', 'PRESDOCU'],
+                        help='Document type to sync (repeatable, default: RULE and PRORULE)')
+    parser.add_argument('--agency', dest='agencies', action='append', default=None,
+                        help='Agency slug to sync (repeatable), e.g. environmental-protection-agency')
+    parser.add_argument('--batch-size', type=int, default=100, help='Chunks appended to the store at once')
+    parser.add_argument('--full-text', action='store_true', help='Index full text instead of abstracts')
+    parser.add_argument('--state', type=str, default=None, help='Sync state file')
+    
+    args = parser.parse_args()
+    
+    sync_federal_register(vector_store_path=args.path, since=args.since,
+                          document_types=args.document_types, agencies=args.agencies,
+                          batch_size=args.batch_size, full_text=args.full_text,
+                          state_path=args.state)
@@ -0,0 +1,107 @@
+"""
+Append-only Vector Log for Policy Navigator Agent
+Write-ahead segment of raw embeddings backing FAISSVectorStore
+"""
+
+import os
+import numpy as np
+
+
+class VectorLog:
+    """
+    Append-only file of float32 embeddings, one row per stored chunk
+    
+    Row i of the log is the embedding of row i of the MetadataStore. New
+    batches are appended here first; the FAISS index on disk is only a
+    periodic checkpoint of the first rows, and the rows written after the
+    checkpoint are replayed into the index when the store is loaded.
+    """
+    
+    def __init__(self, path: str, dim: int):
+        """
+        Initialize vector log
+        
+        Args:
+            path: Path of the log file
+            dim: Embedding dimension
+        """
+        self.path = path
+        self.dim = dim
+        self.row_bytes = dim * np.dtype(np.float32).itemsize
+        
+        # Drop a partially written trailing row
+        self._count = 0
+        if os.path.exists(path):
+            self._count = os.path.getsize(path) // self.row_bytes
+            self.truncate(self._count)
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def append(self, vectors: np.ndarray) -> int:
+        """
+        Append embeddings to the log
+        
+        Args:
+            vectors: Array of shape [n, dim]
+            
+        Returns:
+            Row id of the first appended vector
+        """
+        first_row = self._count
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        with open(self.path, 'ab') as f:
+            f.write(vectors.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self._count += len(vectors)
+        return first_row
+    
+    def read(self, start: int = 0, end: int = None) -> np.ndarray:
+        """
+        Read a range of rows
+        
+        Args:
+            start: First row
+            end: End row (exclusive, defaults to the end of the log)
+            
+        Returns:
+            float32 array of shape [end - start, dim]
+        """
+        end = self._count if end is None else min(end, self._count)
+        if end <= start:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        
+        with open(self.path, 'rb') as f:
+            f.seek(start * self.row_bytes)
+            data = f.read((end - start) * self.row_bytes)
+        return np.frombuffer(data, dtype=np.float32).reshape(-1, self.dim).copy()
+    
+    def read_rows(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Read scattered rows
+        
+        Args:
+            rows: Row ids
+            
+        Returns:
+            float32 array of shape [len(rows), dim]
+        """
+        if self._count == 0 or len(rows) == 0:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        
+        data = np.memmap(self.path, dtype=np.float32, mode='r', shape=(self._count, self.dim))
+        return np.ascontiguousarray(data[np.asarray(rows, dtype=np.int64)])
+    
+    def truncate(self, rows: int):
+        """Drop every row from rows onwards"""
+        if os.path.exists(self.path) and os.path.getsize(self.path) > rows * self.row_bytes:
+            with open(self.path, 'r+b') as f:
+                f.truncate(rows * self.row_bytes)
+        self._count = min(self._count, rows)
+    
+    def clear(self):
+        """Remove all rows"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._count = 0
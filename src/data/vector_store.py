@@ -8,6 +8,12 @@ from chromadb.config import Settings
 from typing import List, Dict, Any, Optional
 import os
 import json
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data.content_hash_index import ContentHashIndex
 
 
 class VectorStore:
@@ -44,28 +50,24 @@ class VectorStore:
         """
         Add documents to the vector store
         
+        Documents are upserted under stable ids, and documents already
+        stored unchanged are skipped, so re-ingesting is idempotent.
+        
         Args:
             documents: List of document dictionaries with 'content' and 'metadata'
             
         Returns:
-            Number of documents added
+            Number of documents added (new or changed)
         """
         if not documents:
             return 0
         
-        # Prepare data for ChromaDB
-        ids = []
-        texts = []
-        metadatas = []
+        # Prepare data for ChromaDB (the last occurrence of an id wins)
+        records = {}
         
-        for i, doc in enumerate(documents):
-            # Generate unique ID
-            doc_id = self._generate_id(doc, i)
-            ids.append(doc_id)
-            
+        for doc in documents:
             # Get text content
             text = doc.get('content', doc.get('full_text', ''))
-            texts.append(text)
             
             # Prepare metadata
             metadata = {
@@ -81,25 +83,49 @@ class VectorStore:
                     if key not in metadata:
                         metadata[key] = str(value)
             
-            metadatas.append(metadata)
+            _, record_hash, _ = ContentHashIndex.fingerprint({'content': text, 'metadata': metadata})
+            metadata['record_hash'] = record_hash
+            
+            records[self._generate_id(doc, text)] = (text, metadata)
         
-        # Add to collection
         try:
-            self.collection.add(
-                ids=ids,
-                documents=texts,
-                metadatas=metadatas
+            # Skip documents stored with the same content and metadata
+            existing = self.collection.get(ids=list(records), include=['metadatas'])
+            for doc_id, metadata in zip(existing['ids'], existing['metadatas']):
+                if metadata and metadata.get('record_hash') == records[doc_id][1]['record_hash']:
+                    del records[doc_id]
+            
+            skipped = len(documents) - len(records)
+            if skipped:
+                print(f"Skipped {skipped} unchanged documents")
+            if not records:
+                return 0
+            
+            # Add new documents and replace changed ones
+            self.collection.upsert(
+                ids=list(records),
+                documents=[text for text, _ in records.values()],
+                metadatas=[metadata for _, metadata in records.values()]
             )
-            return len(documents)
+            return len(records)
         except Exception as e:
             print(f"Error adding documents to vector store: {str(e)}")
             return 0
     
-    def _generate_id(self, doc: Dict[str, Any], index: int) -> str:
-        """Generate a unique ID for a document"""
-        title = doc.get('title', 'unknown')
-        section = doc.get('section', 'unknown')
-        chunk_num = doc.get('chunk_num', index)
+    def _generate_id(self, doc: Dict[str, Any], text: str) -> str:
+        """
+        Generate a stable ID for a document
+        
+        Documents without a chunk number are told apart by a hash of their
+        content rather than their position in the batch, so ids do not
+        collide across batches or change between ingests.
+        """
+        metadata = doc.get('metadata') or {}
+        title = doc.get('title', metadata.get('title', 'unknown'))
+        section = doc.get('section', metadata.get('section_number', 'unknown'))
+        chunk_num = doc.get('chunk_num', metadata.get('chunk_num'))
+        if chunk_num is None:
+            chunk_num = ContentHashIndex.fingerprint({'content': text})[2]
         
         return f"{title}_{section}_{chunk_num}"
     
@@ -5,7 +5,7 @@ Processes CFR XML files, PDFs, and text documents for vector indexing
 
 import os
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 import re
 
 
@@ -26,26 +26,110 @@ class DocumentProcessor:
             List of dictionaries containing regulation sections with metadata
         """
         try:
-            tree = ET.parse(xml_path)
-            root = tree.getroot()
+            return list(self.iter_cfr_sections(xml_path))
+        except Exception as e:
+            print(f"Error processing CFR XML: {str(e)}")
+            return []
+    
+    def iter_cfr_sections(self, xml_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream regulation sections out of a CFR XML file
+        
+        Streaming counterpart of process_cfr_xml(): the file is read with
+        iterparse and every SECTION is yielded as soon as it closes, then
+        removed from the tree. Memory stays flat regardless of the file size,
+        and callers can start embedding before parsing finishes.
+        
+        Args:
+            xml_path: Path to CFR XML file
             
-            sections = []
+        Yields:
+            Dictionaries containing regulation sections with metadata
+            (same format as process_cfr_xml)
             
-            # Extract title information
-            title_num = self._extract_title_number(root)
+        Raises:
+            ET.ParseError: If the XML is malformed
+        """
+        title_num = None
+        stack = []
+        found_sections = False
+        # Part-level fallback records, kept only until the first SECTION shows
+        # up (same rule as process_cfr_xml: parts are used if there are no sections)
+        part_records = []
+        
+        for event, elem in ET.iterparse(xml_path, events=('start', 'end')):
+            if event == 'start':
+                stack.append(elem)
+                if elem.tag == 'TITLE' and title_num is None and elem.get('number'):
+                    title_num = elem.get('number')
+                continue
             
-            # Find all sections in the XML
-            for section in root.findall('.//SECTION'):
-                section_data = self._extract_section_data(section, title_num)
+            stack.pop()
+            parent = stack[-1] if stack else None
+            
+            if elem.tag == 'TITLENUM' and elem.text:
+                match = re.search(r'\d+', elem.text)
+                if match:
+                    title_num = match.group()
+            
+            elif elem.tag == 'SECTION':
+                found_sections = True
+                part_records = []
+                section_data = self._extract_section_data(elem, title_num or "Unknown")
                 if section_data:
-                    sections.append(section_data)
+                    yield section_data
+                # Drop the processed section from the tree
+                elem.clear()
+                if parent is not None:
+                    parent.remove(elem)
             
-            # If no SECTION tags, try alternative structure
-            if not sections:
-                sections = self._extract_alternative_structure(root, title_num)
+            elif elem.tag == 'PART':
+                if not found_sections:
+                    part_data = self._extract_part_data(elem, title_num or "Unknown")
+                    if part_data:
+                        part_records.append(part_data)
+                elem.clear()
+                if parent is not None:
+                    parent.remove(elem)
+        
+        if not found_sections:
+            for record in part_records:
+                yield record
+    
+    @staticmethod
+    def cfr_section_record(section: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a parsed CFR section into the record format used for indexing
+        
+        Args:
+            section: Section dictionary from process_cfr_xml/iter_cfr_sections
             
-            return sections
+        Returns:
+            Dictionary with 'content', 'title', 'section_number' and 'cfr_title'
+        """
+        heading = f"{section['title']} CFR {section['section']}"
+        if section.get('section_title'):
+            heading += f" - {section['section_title']}"
+        
+        return {
+            'content': section['content'],
+            'title': heading,
+            'section_number': section['section'],
+            'cfr_title': section['title']
+        }
+    
+    def extract_cfr_sections(self, xml_path: str) -> List[Dict[str, Any]]:
+        """
+        Parse CFR XML file into records ready for indexing
+        
+        Args:
+            xml_path: Path to CFR XML file
             
+        Returns:
+            List of dictionaries with 'content', 'title', 'section_number' and 'cfr_title'
+        """
+        try:
+            return [self.cfr_section_record(section) for section in self.iter_cfr_sections(xml_path)]
         except Exception as e:
             print(f"Error processing CFR XML: {str(e)}")
             return []
@@ -116,28 +200,36 @@ class DocumentProcessor:
         
         # Try to find PART elements
         for part in root.findall('.//PART'):
-            part_num = part.find('.//PARTNO')
-            part_num_text = part_num.text if part_num is not None else "Unknown"
-            
-            # Extract content from this part
-            content = self._get_all_text(part)
-            
-            if content.strip():
-                sections.append({
-                    'title': title_num,
-                    'section': part_num_text,
-                    'section_title': f"Part {part_num_text}",
-                    'content': content,
-                    'full_text': f"Part {part_num_text}\n\n{content}",
-                    'source': 'CFR',
-                    'metadata': {
-                        'title': title_num,
-                        'part': part_num_text
-                    }
-                })
+            part_data = self._extract_part_data(part, title_num)
+            if part_data:
+                sections.append(part_data)
         
         return sections
     
+    def _extract_part_data(self, part: ET.Element, title_num: str) -> Dict[str, Any]:
+        """Extract data from a PART element (None if it has no text)"""
+        part_num = part.find('.//PARTNO')
+        part_num_text = part_num.text if part_num is not None else "Unknown"
+        
+        # Extract content from this part
+        content = self._get_all_text(part)
+        
+        if not content.strip():
+            return None
+        
+        return {
+            'title': title_num,
+            'section': part_num_text,
+            'section_title': f"Part {part_num_text}",
+            'content': content,
+            'full_text': f"Part {part_num_text}\n\n{content}",
+            'source': 'CFR',
+            'metadata': {
+                'title': title_num,
+                'part': part_num_text
+            }
+        }
+    
     def _get_all_text(self, element: ET.Element) -> str:
         """Recursively extract all text from an XML element"""
         text_parts = []
@@ -268,15 +360,28 @@ class DocumentProcessor:
         
         # Optionally chunk documents
         if chunk:
-            chunked_docs = []
-            for doc in documents:
-                if len(doc['content']) > 1000:
-                    chunked_docs.extend(self.chunk_document(doc))
-                else:
-                    chunked_docs.append(doc)
-            return chunked_docs
+            return self.chunk_documents(documents)
         
         return documents
+    
+    def chunk_documents(self, documents: List[Dict[str, Any]], chunk_size: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Chunk every document longer than chunk_size characters
+        
+        Args:
+            documents: Document dictionaries
+            chunk_size: Maximum characters per chunk
+            
+        Returns:
+            List of documents and chunks
+        """
+        chunked_docs = []
+        for doc in documents:
+            if len(doc['content']) > chunk_size:
+                chunked_docs.extend(self.chunk_document(doc, chunk_size=chunk_size))
+            else:
+                chunked_docs.append(doc)
+        return chunked_docs
 
 
 def test_processor():
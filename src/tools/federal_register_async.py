@@ -0,0 +1,321 @@
+"""
+Async Federal Register API Client for Policy Navigator Agent
+asyncio client with pooled keep-alive connections and bounded concurrency
+"""
+
+import asyncio
+import os
+import sys
+import aiohttp
+from typing import Dict, List, Any, Optional, Tuple, AsyncIterator
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.tools.federal_register_tool import FederalRegisterTool, BASE_URL
+
+
+class AsyncFederalRegisterClient:
+    """
+    Async counterpart of FederalRegisterTool
+    
+    All requests share one aiohttp session, so TCP/TLS connections to the
+    Federal Register are pooled and kept alive between calls. A semaphore
+    bounds the number of requests in flight, which lets a single worker check
+    dozens of CFR parts concurrently without flooding the API.
+    
+    Use it as an async context manager (or call close() when done):
+    
+        async with AsyncFederalRegisterClient() as client:
+            updates = await client.check_many_cfr_parts([("40", "60"), ("40", "63")])
+    """
+    
+    def __init__(self, max_concurrency: int = 10, connection_limit: int = 20,
+                 timeout: float = 30, keepalive_timeout: float = 30):
+        """
+        Initialize async Federal Register client
+        
+        Args:
+            max_concurrency: Maximum number of requests in flight
+            connection_limit: Maximum number of pooled connections
+            timeout: Total timeout of a request in seconds
+            keepalive_timeout: Seconds an idle connection is kept open
+        """
+        self.base_url = BASE_URL
+        self.max_concurrency = max_concurrency
+        self.connection_limit = connection_limit
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        
+        # Created lazily inside the running event loop
+        self._session = None
+        self._semaphore = None
+    
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'User-Agent': 'PolicyNavigatorAgent/1.0'}
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+    
+    async def close(self):
+        """Close the session and its pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    @staticmethod
+    def _query_pairs(params: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """Expand list values into repeated keys (aiohttp does not do this like requests)"""
+        pairs = []
+        for key, value in params.items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            pairs.extend((key, str(v)) for v in values)
+        return pairs
+    
+    async def _get_json(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        GET an endpoint and decode the JSON response
+        
+        Raises:
+            aiohttp.ClientError: On connection errors or non-2xx responses
+        """
+        session = await self._get_session()
+        async with self._semaphore:
+            async with session.get(endpoint, params=self._query_pairs(params or {})) as response:
+                response.raise_for_status()
+                return await response.json()
+    
+    async def search_documents(self, query: str, page: int = 1, per_page: int = 20,
+                               document_types: Optional[List[str]] = None,
+                               agencies: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Search Federal Register documents
+        
+        Args:
+            query: Search query string
+            page: Page number
+            per_page: Results per page
+            document_types: Filter by document types (RULE, PRORULE, NOTICE, PRESDOCU)
+            agencies: Filter by agency slugs
+            
+        Returns:
+            Dictionary containing search results
+        """
+        endpoint = f"{self.base_url}/documents.json"
+        params = FederalRegisterTool.search_params(query, page, per_page, document_types, agencies)
+        
+        try:
+            return await self._get_json(endpoint, params)
+        except Exception as e:
+            print(f"Error searching Federal Register: {str(e)}")
+            return {'results': [], 'count': 0}
+    
+    async def get_document(self, document_number: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a specific Federal Register document by number
+        
+        Args:
+            document_number: Federal Register document number (e.g., "2024-12345")
+            
+        Returns:
+            Document data or None if not found
+        """
+        endpoint = f"{self.base_url}/documents/{document_number}.json"
+        
+        try:
+            return await self._get_json(endpoint)
+        except Exception as e:
+            print(f"Error getting document {document_number}: {str(e)}")
+            return None
+    
+    async def _get_page(self, url: str, params: Optional[Dict[str, Any]] = None) -> Tuple[str, Any]:
+        """Fetch one listing page as (page url, decoded JSON)"""
+        session = await self._get_session()
+        async with self._semaphore:
+            async with session.get(url, params=self._query_pairs(params or {})) as response:
+                response.raise_for_status()
+                return str(response.url), await response.json()
+    
+    async def iter_documents(self, query: Optional[str] = None, document_types: Optional[List[str]] = None,
+                             agencies: Optional[List[str]] = None, start_date: Optional[str] = None,
+                             end_date: Optional[str] = None, per_page: int = 100, order: str = 'newest',
+                             cursor: Optional[Dict[str, Any]] = None, with_cursor: bool = False,
+                             params: Optional[Dict[str, Any]] = None) -> AsyncIterator[Any]:
+        """
+        Iterate over every document matching a listing, following next_page_url
+        
+        Async counterpart of FederalRegisterTool.iter_documents: the next page
+        is requested while the caller processes the current one, and cursors
+        have the same format, so they can be shared between both clients.
+        
+        Args:
+            query: Optional search term
+            document_types: Filter by document types (RULE, PRORULE, NOTICE, PRESDOCU)
+            agencies: Filter by agency slugs
+            start_date: Earliest publication date (YYYY-MM-DD)
+            end_date: Latest publication date (YYYY-MM-DD)
+            per_page: Results per page
+            order: Listing order ('newest', 'oldest', 'relevance')
+            cursor: Cursor to resume from (the filters are then taken from it)
+            with_cursor: Yield (document, cursor) tuples instead of documents
+            params: Raw query parameters, used instead of the filter arguments
+            
+        Yields:
+            Documents, or (document, cursor) tuples
+            
+        Raises:
+            aiohttp.ClientError: If a page cannot be fetched
+        """
+        if cursor:
+            url, params, skip = cursor['url'], None, cursor.get('offset', 0)
+        else:
+            url, skip = f"{self.base_url}/documents.json", 0
+            if params is None:
+                params = FederalRegisterTool.listing_params(query, document_types, agencies, start_date,
+                                                            end_date, per_page, order)
+        
+        pending = asyncio.ensure_future(self._get_page(url, params))
+        try:
+            while pending is not None:
+                page_url, data = await pending
+                next_url = data.get('next_page_url')
+                # Prefetch the next page while this one is consumed
+                pending = asyncio.ensure_future(self._get_page(next_url)) if next_url else None
+                
+                results = data.get('results') or []
+                for offset in range(skip, len(results)):
+                    if with_cursor:
+                        yield results[offset], {'url': page_url, 'offset': offset + 1}
+                    else:
+                        yield results[offset]
+                skip = 0
+        finally:
+            if pending is not None:
+                pending.cancel()
+    
+    async def get_recent_rules(self, days: int = 30, agency: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get recent final rules from the last N days
+        
+        All result pages are fetched, so busy periods are not truncated.
+        
+        Args:
+            days: Number of days to look back
+            agency: Optional agency slug to filter by
+            
+        Returns:
+            List of recent rules
+        """
+        rules = []
+        try:
+            async for rule in self.iter_documents(params=FederalRegisterTool.recent_rules_params(days, agency)):
+                rules.append(rule)
+        except Exception as e:
+            print(f"Error getting recent rules: {str(e)}")
+        return rules
+    
+    async def check_cfr_updates(self, title: str, part: str) -> List[Dict[str, Any]]:
+        """
+        Check for recent updates to a specific CFR title and part
+        
+        Args:
+            title: CFR title number (e.g., "40")
+            part: CFR part number (e.g., "60")
+            
+        Returns:
+            List of documents affecting this CFR section
+        """
+        endpoint = f"{self.base_url}/documents.json"
+        params = FederalRegisterTool.cfr_updates_params(title, part)
+        
+        try:
+            data = await self._get_json(endpoint, params)
+            return data.get('results', [])
+        except Exception as e:
+            print(f"Error checking CFR updates: {str(e)}")
+            return []
+    
+    async def check_many_cfr_parts(self, parts: List[Tuple[str, str]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Check many CFR title/part pairs concurrently
+        
+        Args:
+            parts: List of (title, part) tuples, e.g. [("40", "60"), ("40", "63")]
+            
+        Returns:
+            Dictionary mapping "<title> CFR <part>" to the documents affecting it
+        """
+        results = await asyncio.gather(*[
+            self.check_cfr_updates(title, part) for title, part in parts
+        ])
+        return {
+            f"{title} CFR {part}": documents
+            for (title, part), documents in zip(parts, results)
+        }
+
+
+def check_cfr_parts(parts: List[Tuple[str, str]], max_concurrency: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Synchronous wrapper around AsyncFederalRegisterClient.check_many_cfr_parts
+    
+    Args:
+        parts: List of (title, part) tuples
+        max_concurrency: Maximum number of requests in flight
+        
+    Returns:
+        Dictionary mapping "<title> CFR <part>" to the documents affecting it
+    """
+    async def run():
+        async with AsyncFederalRegisterClient(max_concurrency=max_concurrency) as client:
+            return await client.check_many_cfr_parts(parts)
+    
+    return asyncio.run(run())
+
+
+def test_async_federal_register_client():
+    """Test the async Federal Register client"""
+    import time
+    
+    print("=== Testing Async Federal Register Client ===\n")
+    
+    async def run():
+        async with AsyncFederalRegisterClient() as client:
+            # Test 1: Search
+            print("1. Searching for EPA environmental regulations...")
+            results = await client.search_documents("environmental protection", per_page=5,
+                                                    agencies=['environmental-protection-agency'])
+            print(f"Found {results.get('count', 0)} total documents")
+            
+            # Test 2: Check many CFR parts concurrently
+            parts = [("40", str(part)) for part in range(50, 80)]
+            print(f"\n2. Checking {len(parts)} parts of 40 CFR concurrently...")
+            start = time.time()
+            updates = await client.check_many_cfr_parts(parts)
+            elapsed = time.time() - start
+            total = sum(len(docs) for docs in updates.values())
+            print(f"Found {total} documents in {elapsed:.2f}s")
+    
+    asyncio.run(run())
+    
+    print("\n=== Test Complete ===")
+
+
+if __name__ == "__main__":
+    test_async_federal_register_client()
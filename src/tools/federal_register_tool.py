@@ -3,39 +3,91 @@ Federal Register API Tool for Policy Navigator Agent
 Checks latest policy status, amendments, and executive orders
 """
 
+import queue
+import threading
+import os
+import sys
 import requests
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator
 from datetime import datetime, timedelta
 
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.tools.http_cache import HTTPResponseCache
+
+
+BASE_URL = "https://www.federalregister.gov/api/v1"
+
+# Response cache in the project data directory, independent of the working directory
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "data", "http_cache", "federal_register.sqlite"
+)
+
 
 class FederalRegisterTool:
     """Tool to interact with Federal Register API"""
     
-    def __init__(self):
-        self.base_url = "https://www.federalregister.gov/api/v1"
+    # Response cache time-to-live per endpoint, in seconds
+    CACHE_TTLS = {
+        'document': 7 * 24 * 3600,
+        'executive_orders': 6 * 3600,
+        'executive_orders_past': 30 * 24 * 3600,
+        'search': 3600,
+        'listing': 900,
+        'cfr_updates': 3600,
+        'agency_documents': 3600,
+    }
+    
+    def __init__(self, cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+                 cache_ttls: Optional[Dict[str, float]] = None):
+        """
+        Initialize Federal Register tool
+        
+        Args:
+            cache_path: SQLite file of the response cache (None disables caching)
+            cache_ttls: Per-endpoint TTL overrides (merged with CACHE_TTLS)
+        """
+        self.base_url = BASE_URL
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'PolicyNavigatorAgent/1.0'
         })
+        
+        self.cache_ttls = {**self.CACHE_TTLS, **(cache_ttls or {})}
+        self.cache = None
+        if cache_path:
+            try:
+                self.cache = HTTPResponseCache(cache_path)
+            except Exception as e:
+                print(f"⚠ Federal Register response cache disabled: {str(e)}")
     
-    def search_documents(self, query: str, page: int = 1, per_page: int = 20,
-                        document_types: Optional[List[str]] = None,
-                        agencies: Optional[List[str]] = None) -> Dict[str, Any]:
+    def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                  endpoint: str = 'search') -> tuple:
         """
-        Search Federal Register documents
+        GET a JSON resource, through the response cache when enabled
         
         Args:
-            query: Search query string
-            page: Page number
-            per_page: Results per page
-            document_types: Filter by document types (RULE, PRORULE, NOTICE, PRESDOCU)
-            agencies: Filter by agency slugs
+            url: Resource URL
+            params: Query parameters
+            endpoint: Endpoint kind selecting the cache TTL (key of CACHE_TTLS)
             
         Returns:
-            Dictionary containing search results
+            Tuple of (full request URL, decoded JSON)
         """
-        endpoint = f"{self.base_url}/documents.json"
+        if self.cache is not None:
+            return self.cache.get_json(self.session, url, params, ttl=self.cache_ttls.get(endpoint))
         
+        response = self.session.get(url, params=params, timeout=30)
+        response.raise_for_status()
+        return response.url, response.json()
+    
+    @staticmethod
+    def search_params(query: str, page: int = 1, per_page: int = 20,
+                      document_types: Optional[List[str]] = None,
+                      agencies: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Query parameters of a document search (shared with the async client)"""
         params = {
             'conditions[term]': query,
             'page': page,
@@ -48,10 +100,81 @@ class FederalRegisterTool:
         if agencies:
             params['conditions[agencies][]'] = agencies
         
+        return params
+    
+    @staticmethod
+    def listing_params(query: Optional[str] = None, document_types: Optional[List[str]] = None,
+                       agencies: Optional[List[str]] = None, start_date: Optional[str] = None,
+                       end_date: Optional[str] = None, per_page: int = 100,
+                       order: str = 'newest') -> Dict[str, Any]:
+        """Query parameters of a paginated document listing (shared with the async client)"""
+        params = {
+            'per_page': per_page,
+            'order': order
+        }
+        
+        if query:
+            params['conditions[term]'] = query
+        
+        if document_types:
+            params['conditions[type][]'] = document_types
+        
+        if agencies:
+            params['conditions[agencies][]'] = agencies
+        
+        if start_date:
+            params['conditions[publication_date][gte]'] = start_date
+        
+        if end_date:
+            params['conditions[publication_date][lte]'] = end_date
+        
+        return params
+    
+    @staticmethod
+    def recent_rules_params(days: int = 30, agency: Optional[str] = None) -> Dict[str, Any]:
+        """Query parameters of a recent final rules lookup (shared with the async client)"""
+        start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        end_date = datetime.now().strftime('%Y-%m-%d')
+        
+        return FederalRegisterTool.listing_params(
+            document_types=['RULE'],
+            agencies=[agency] if agency else None,
+            start_date=start_date,
+            end_date=end_date
+        )
+    
+    @staticmethod
+    def cfr_updates_params(title: str, part: str) -> Dict[str, Any]:
+        """Query parameters of a CFR title/part update check (shared with the async client)"""
+        return {
+            'conditions[term]': f"{title} CFR {part}",
+            'conditions[type][]': ['RULE', 'PRORULE'],
+            'per_page': 50,
+            'order': 'newest'
+        }
+    
+    def search_documents(self, query: str, page: int = 1, per_page: int = 20,
+                        document_types: Optional[List[str]] = None,
+                        agencies: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Search Federal Register documents
+        
+        Args:
+            query: Search query string
+            page: Page number
+            per_page: Results per page
+            document_types: Filter by document types (RULE, PRORULE, NOTICE, PRESDOCU)
+            agencies: Filter by agency slugs
+            
+        Returns:
+            Dictionary containing search results
+        """
+        endpoint = f"{self.base_url}/documents.json"
+        params = self.search_params(query, page, per_page, document_types, agencies)
+        
         try:
-            response = self.session.get(endpoint, params=params, timeout=30)
-            response.raise_for_status()
-            return response.json()
+            _, data = self._get_json(endpoint, params, 'search')
+            return data
         except Exception as e:
             print(f"Error searching Federal Register: {str(e)}")
             return {'results': [], 'count': 0}
@@ -69,17 +192,126 @@ class FederalRegisterTool:
         endpoint = f"{self.base_url}/documents/{document_number}.json"
         
         try:
-            response = self.session.get(endpoint, timeout=30)
-            response.raise_for_status()
-            return response.json()
+            _, data = self._get_json(endpoint, endpoint='document')
+            return data
         except Exception as e:
             print(f"Error getting document {document_number}: {str(e)}")
             return None
     
+    def iter_documents(self, query: Optional[str] = None, document_types: Optional[List[str]] = None,
+                       agencies: Optional[List[str]] = None, start_date: Optional[str] = None,
+                       end_date: Optional[str] = None, per_page: int = 100, order: str = 'newest',
+                       cursor: Optional[Dict[str, Any]] = None, prefetch_pages: int = 1,
+                       with_cursor: bool = False, params: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """
+        Iterate over every document matching a listing, following next_page_url
+        
+        The next page is fetched in a background thread while the caller
+        processes the current one. At most prefetch_pages pages are buffered,
+        so memory stays bounded however many pages the listing has.
+        
+        With with_cursor=True every document is yielded together with a cursor
+        ({'url': page url, 'offset': position in page}) pointing just past it;
+        passing that cursor back resumes the iteration at the next document.
+        Cursors are stable for order='oldest', where new publications are
+        appended to the end of the listing.
+        
+        Args:
+            query: Optional search term
+            document_types: Filter by document types (RULE, PRORULE, NOTICE, PRESDOCU)
+            agencies: Filter by agency slugs
+            start_date: Earliest publication date (YYYY-MM-DD)
+            end_date: Latest publication date (YYYY-MM-DD)
+            per_page: Results per page
+            order: Listing order ('newest', 'oldest', 'relevance')
+            cursor: Cursor to resume from (the filters are then taken from it)
+            prefetch_pages: Number of pages fetched ahead (0 disables prefetching)
+            with_cursor: Yield (document, cursor) tuples instead of documents
+            params: Raw query parameters, used instead of the filter arguments
+            
+        Yields:
+            Documents, or (document, cursor) tuples
+            
+        Raises:
+            requests.RequestException: If a page cannot be fetched
+        """
+        if cursor:
+            url, params, skip = cursor['url'], None, cursor.get('offset', 0)
+        else:
+            url, skip = f"{self.base_url}/documents.json", 0
+            if params is None:
+                params = self.listing_params(query, document_types, agencies, start_date,
+                                             end_date, per_page, order)
+        
+        for page_url, data in self._iter_pages(url, params, prefetch_pages):
+            results = data.get('results') or []
+            for offset in range(skip, len(results)):
+                if with_cursor:
+                    yield results[offset], {'url': page_url, 'offset': offset + 1}
+                else:
+                    yield results[offset]
+            skip = 0
+    
+    def _get_page(self, url: str, params: Optional[Dict[str, Any]] = None) -> tuple:
+        """Fetch one listing page as (page url, decoded JSON)"""
+        return self._get_json(url, params, 'listing')
+    
+    def _iter_pages(self, url: str, params: Optional[Dict[str, Any]], prefetch_pages: int) -> Iterator[tuple]:
+        """Iterate over listing pages, fetching up to prefetch_pages pages ahead"""
+        if prefetch_pages <= 0:
+            while url:
+                page_url, data = self._get_page(url, params)
+                params = None
+                url = data.get('next_page_url')
+                yield page_url, data
+            return
+        
+        pages = queue.Queue(maxsize=prefetch_pages)
+        stop = threading.Event()
+        
+        def put(item):
+            # Block while the buffer is full, unless the consumer went away
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+        
+        def fetch_pages():
+            next_url, next_params = url, params
+            try:
+                while next_url and not stop.is_set():
+                    page_url, data = self._get_page(next_url, next_params)
+                    next_params = None
+                    next_url = data.get('next_page_url')
+                    put(('page', (page_url, data)))
+            except Exception as e:
+                put(('error', e))
+            finally:
+                put(('done', None))
+        
+        fetcher = threading.Thread(target=fetch_pages, daemon=True)
+        fetcher.start()
+        
+        try:
+            while True:
+                kind, item = pages.get()
+                if kind == 'done':
+                    return
+                if kind == 'error':
+                    print(f"Error fetching Federal Register page: {str(item)}")
+                    raise item
+                yield item
+        finally:
+            stop.set()
+    
     def get_recent_rules(self, days: int = 30, agency: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Get recent final rules from the last N days
         
+        All result pages are fetched, so busy periods are not truncated.
+        
         Args:
             days: Number of days to look back
             agency: Optional agency slug to filter by
@@ -87,30 +319,13 @@ class FederalRegisterTool:
         Returns:
             List of recent rules
         """
-        start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        
-        endpoint = f"{self.base_url}/documents.json"
-        
-        params = {
-            'conditions[type][]': 'RULE',
-            'conditions[publication_date][gte]': start_date,
-            'conditions[publication_date][lte]': end_date,
-            'per_page': 100,
-            'order': 'newest'
-        }
-        
-        if agency:
-            params['conditions[agencies][]'] = agency
-        
+        rules = []
         try:
-            response = self.session.get(endpoint, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            return data.get('results', [])
+            for rule in self.iter_documents(params=self.recent_rules_params(days, agency)):
+                rules.append(rule)
         except Exception as e:
             print(f"Error getting recent rules: {str(e)}")
-            return []
+        return rules
     
     def get_executive_orders(self, year: Optional[int] = None) -> List[Dict[str, Any]]:
         """
@@ -134,10 +349,11 @@ class FederalRegisterTool:
         if year:
             params['conditions[publication_date][year]'] = year
         
+        # Orders of a past year no longer change
+        kind = 'executive_orders_past' if year and int(year) < datetime.now().year else 'executive_orders'
+        
         try:
-            response = self.session.get(endpoint, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            _, data = self._get_json(endpoint, params, kind)
             return data.get('results', [])
         except Exception as e:
             print(f"Error getting executive orders: {str(e)}")
@@ -154,21 +370,11 @@ class FederalRegisterTool:
         Returns:
             List of documents affecting this CFR section
         """
-        query = f"{title} CFR {part}"
-        
         endpoint = f"{self.base_url}/documents.json"
-        
-        params = {
-            'conditions[term]': query,
-            'conditions[type][]': ['RULE', 'PRORULE'],
-            'per_page': 50,
-            'order': 'newest'
-        }
+        params = self.cfr_updates_params(title, part)
         
         try:
-            response = self.session.get(endpoint, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            _, data = self._get_json(endpoint, params, 'cfr_updates')
             return data.get('results', [])
         except Exception as e:
             print(f"Error checking CFR updates: {str(e)}")
@@ -197,9 +403,7 @@ class FederalRegisterTool:
         }
         
         try:
-            response = self.session.get(endpoint, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
+            _, data = self._get_json(endpoint, params, 'agency_documents')
             return data.get('results', [])
         except Exception as e:
             print(f"Error getting agency documents: {str(e)}")
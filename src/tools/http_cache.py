@@ -0,0 +1,282 @@
+"""
+HTTP Response Cache for Policy Navigator Agent
+SQLite-backed cache of JSON API responses with TTLs and conditional GETs
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import requests
+from typing import Dict, Any, Optional, Tuple
+
+
+class HTTPResponseCache:
+    """
+    On-disk cache of JSON GET responses
+    
+    A response is served from disk while it is fresh (validated less than the
+    TTL passed by the caller ago).
+    Once it expires, the next request is a conditional GET using the stored
+    ETag / Last-Modified validators; a 304 Not Modified refreshes the entry
+    without transferring the body again. If the server cannot be reached, a
+    stale entry is served instead of failing.
+    """
+    
+    def __init__(self, path: str, default_ttl: float = 3600):
+        """
+        Initialize response cache
+        
+        Args:
+            path: SQLite database file
+            default_ttl: Time-to-live of a response in seconds
+        """
+        self.path = path
+        self.default_ttl = default_ttl
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.stale_served = 0
+    
+    @staticmethod
+    def cache_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Full request URL, used as the cache key"""
+        return requests.Request('GET', url, params=params).prepare().url
+    
+    def _lookup(self, key: str) -> Optional[tuple]:
+        """Stored (body, etag, last_modified, fetched_at) of a URL"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?", (key,)
+            ).fetchone()
+    
+    def _store(self, key: str, body: str, etag: Optional[str], last_modified: Optional[str]):
+        """Insert or replace a response"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, time.time())
+            )
+            self._conn.commit()
+    
+    def _touch(self, key: str, fetched_at: Optional[float] = None):
+        """Mark a response as (re)validated at the given time (now by default)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ? WHERE url = ?",
+                (time.time() if fetched_at is None else fetched_at, key)
+            )
+            self._conn.commit()
+    
+    def get_json(self, session: requests.Session, url: str, params: Optional[Dict[str, Any]] = None,
+                 ttl: Optional[float] = None, timeout: float = 30) -> Tuple[str, Any]:
+        """
+        GET a JSON resource through the cache
+        
+        Args:
+            session: requests session used for network calls
+            url: Resource URL
+            params: Query parameters
+            ttl: Time-to-live of the response (default_ttl if None)
+            timeout: Request timeout in seconds
+            
+        Returns:
+            Tuple of (full request URL, decoded JSON)
+            
+        Raises:
+            requests.RequestException: If the request fails and nothing is cached
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        key = self.cache_key(url, params)
+        cached = self._lookup(key)
+        
+        if cached is not None and time.time() - cached[3] < ttl:
+            self.hits += 1
+            return key, json.loads(cached[0])
+        
+        headers = {}
+        if cached is not None:
+            if cached[1]:
+                headers['If-None-Match'] = cached[1]
+            if cached[2]:
+                headers['If-Modified-Since'] = cached[2]
+        
+        try:
+            response = session.get(key, headers=headers, timeout=timeout)
+            if response.status_code == 304 and cached is not None:
+                self.revalidated += 1
+                self._touch(key)
+                return key, json.loads(cached[0])
+            response.raise_for_status()
+        except requests.RequestException as e:
+            if cached is None:
+                raise
+            print(f"⚠ Serving stale response for {key}: {str(e)}")
+            self.stale_served += 1
+            return key, json.loads(cached[0])
+        
+        self.misses += 1
+        data = response.json()
+        self._store(key, json.dumps(data), response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'))
+        return key, data
+    
+    def purge(self, max_age: float = 30 * 24 * 3600) -> int:
+        """
+        Remove responses not validated for more than max_age seconds
+        
+        Args:
+            max_age: Seconds a response is kept for revalidation
+            
+        Returns:
+            Number of removed responses
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE fetched_at < ?", (time.time() - max_age,)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+    
+    def clear(self):
+        """Remove all cached responses"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hit/miss counters and size
+        """
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated,
+            'stale_served': self.stale_served,
+            'size': size,
+            'path': self.path
+        }
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+def stub_server(documents: Dict[str, Dict[str, Any]], port: int = 0):
+    """
+    Start a local stub of the Federal Register documents API
+    
+    Serves /documents/<number>.json with an ETag and answers conditional
+    requests with 304 Not Modified. The handler counts requests in
+    server.requests (full responses) and server.not_modified (304s).
+    
+    Args:
+        documents: Mapping of document number to document data
+        port: Port to listen on (0 picks a free port)
+        
+    Returns:
+        Running ThreadingHTTPServer; its base URL is
+        f"http://127.0.0.1:{server.server_address[1]}"
+    """
+    import hashlib
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+        
+        def do_GET(self):
+            number = self.path.split('?')[0].rsplit('/', 1)[-1].replace('.json', '')
+            if number not in documents:
+                self.send_response(404)
+                self.end_headers()
+                return
+            
+            body = json.dumps(documents[number]).encode('utf-8')
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self.server.not_modified += 1
+                self.send_response(304)
+                self.end_headers()
+                return
+            
+            self.server.requests += 1
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+    
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.requests = 0
+    server.not_modified = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_http_cache():
+    """Test the response cache against a local stub server"""
+    import tempfile
+    
+    print("=== Testing HTTP Response Cache ===\n")
+    
+    server = stub_server({'2024-00001': {'document_number': '2024-00001', 'title': 'Test Rule'}})
+    url = f"http://127.0.0.1:{server.server_address[1]}/documents/2024-00001.json"
+    session = requests.Session()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HTTPResponseCache(os.path.join(tmp, 'responses.sqlite'))
+        
+        # 1. First call goes to the server, second is served from disk
+        _, data = cache.get_json(session, url, ttl=60)
+        _, data = cache.get_json(session, url, ttl=60)
+        assert data['title'] == 'Test Rule'
+        assert server.requests == 1 and cache.hits == 1
+        print("1. Fresh responses served from cache ✓")
+        
+        # 2. Expired entry is revalidated with a conditional GET (304)
+        _, data = cache.get_json(session, url, ttl=0)
+        assert server.requests == 1 and server.not_modified == 1
+        assert data['title'] == 'Test Rule'
+        print("2. Expired response revalidated with If-None-Match ✓")
+        
+        # 3. Server unreachable: stale entry is served
+        server.shutdown()
+        server.server_close()
+        cache._touch(cache.cache_key(url), 0)
+        _, data = cache.get_json(session, url, ttl=60, timeout=2)
+        assert data['title'] == 'Test Rule' and cache.stale_served == 1
+        print("3. Stale response served when the server is down ✓")
+        
+        cache.close()
+    
+    print("\n=== Test Complete ===")
+
+
+if __name__ == "__main__":
+    test_http_cache()